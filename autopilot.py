@@ -0,0 +1,205 @@
+import math
+from storm_simulation import (GROUND_Y, INPUT_JUMP, INPUT_RESTART, PLAYER_X, PLAYER_WIDTH, PLAYER_HEIGHT,
+                              JUMP_VELOCITY, DOUBLE_JUMP_VELOCITY, GRAVITY, depth_scale)
+
+# Bot that presses jump for unattended soak and benchmark runs.
+#
+# Obstacles move on rails (constant scroll, flying ones on a sine), so the
+# boxes they will occupy over the next second or so can be predicted from
+# their current state. The player's own path is just as predictable: a jump
+# from the ground is always the same curve, so those curves are computed
+# once, and only mid-air paths are stepped on demand. Each step the bot
+# checks whether carrying on hits anything; if it does, it picks the jump
+# or double jump that stays clear, or failing that, the one that survives
+# longest. When nothing is in the way it hops anyway once the storm gets
+# close, since the player outruns the storm while airborne.
+
+PLAYER_GROUND_TOP = GROUND_Y - PLAYER_HEIGHT
+BOULDER_REACH = math.sqrt(2)  # A rotating square never exceeds this times its side
+
+def player_path(y, velocity_y, steps, dt, double_at=None):
+    """Player top y after each of the next steps, with an optional double jump before step double_at"""
+    path = []
+    for step in range(steps):
+        if step == double_at:
+            velocity_y = DOUBLE_JUMP_VELOCITY
+        velocity_y += GRAVITY * dt
+        y += velocity_y * dt
+        if y + PLAYER_HEIGHT >= GROUND_Y:
+            y = PLAYER_GROUND_TOP
+            velocity_y = 0
+        path.append(y)
+    return path
+
+class Autopilot:
+    """Decides, once per simulation step, whether to press jump"""
+    def __init__(self, simulation, horizon_seconds=1.5, storm_threshold=50, restart=True):
+        self.simulation = simulation
+        self.horizon = int(horizon_seconds * simulation.step_rate)
+        self.storm_threshold = storm_threshold  # Hop for airtime once the storm is this close
+        self.restart = restart  # Leave the title and game over screens by itself, for endless soaks
+        dt = simulation.dt
+
+        # Paths from the ground: a single jump, and double jumps at a few delays
+        single = player_path(PLAYER_GROUND_TOP, JUMP_VELOCITY, self.horizon, dt)
+        self.jump_paths = [single]
+        apex = int(-JUMP_VELOCITY / GRAVITY / dt)  # Steps to the top of a single jump
+        self.commit_steps = apex
+        for delay in range(max(1, apex // 6), apex + 1, max(1, apex // 6)):
+            self.jump_paths.append(player_path(PLAYER_GROUND_TOP, JUMP_VELOCITY, self.horizon, dt, delay))
+
+        # Predicted boxes, stamped with the frame they occur on, stay valid
+        # until an obstacle spawns or despawns; they reach refresh steps past
+        # the horizon so the view ahead never shrinks in between
+        self.refresh = self.horizon // 2
+        self.boxes = []
+        self.boxes_frame = None
+        simulation.add_listener(self.on_simulation_event)
+
+        # Mid-air path, reused while the player stays on it
+        self.air_path = []
+        self.air_frame = None
+
+    def on_simulation_event(self, event, data=None):
+        if event == "reset" or (event in ("spawn", "despawn") and data.kind == "obstacle"):
+            self.boxes_frame = None
+
+    def predict(self):
+        """(frame, top, bottom) of every obstacle box crossing the player's column within the horizon"""
+        simulation = self.simulation
+        dt = simulation.dt
+        frame = simulation.frame
+        boxes = []
+        for entity in simulation.entities:
+            if entity.kind != "obstacle" or not entity.alive:
+                continue
+            travel = entity.speed * depth_scale(entity.z_position) * dt  # Pixels per step
+            left, width, top, height = entity.x, entity.width, entity.y, entity.height
+            flying = entity.obstacle_type == "flying"
+            if entity.obstacle_type == "boulder":
+                # Its box swells and shrinks as it turns; use the largest it can be
+                reach = entity.size * BOULDER_REACH
+                left += (width - reach) / 2
+                top += (height - reach) / 2
+                width = height = reach
+            lowest_top = entity.original_y - entity.y_range if flying else top
+            if lowest_top >= GROUND_Y:
+                continue  # Too deep in the scene to ever reach the player
+            # Steps while the obstacle overlaps the player's column (collides() is strict)
+            first = max(1, int((left - PLAYER_X - PLAYER_WIDTH) / travel))
+            for step in range(first, self.horizon + self.refresh + 1):
+                x = left - travel * step
+                if x + width <= PLAYER_X:
+                    break
+                if x >= PLAYER_X + PLAYER_WIDTH:
+                    continue
+                if flying:
+                    time_ms = (frame + step) * simulation.step_ms
+                    top = entity.original_y + entity.y_range * math.sin(time_ms * 0.005)
+                boxes.append((frame + step, top, top + height))
+        self.boxes = boxes
+        self.boxes_frame = frame
+
+    def first_hit(self, path, start, boxes):
+        """
+        Earliest frame at which a path meets an obstacle box, or None.
+        path[i] is the player's top on frame start + 1 + i; past its end the
+        player is on the ground.
+        """
+        hit = None
+        end = start + len(path)
+        for frame, top, bottom in boxes:
+            if hit is not None and frame >= hit:
+                continue
+            y = path[frame - start - 1] if frame <= end else PLAYER_GROUND_TOP
+            if y < bottom and top < y + PLAYER_HEIGHT:
+                hit = frame
+        return hit
+
+    def decide(self):
+        """True when the bot wants jump pressed before the next step"""
+        simulation = self.simulation
+        if simulation.game_state != "playing":
+            return False
+        player = simulation.player
+        frame = simulation.frame
+        dt = simulation.dt
+        if self.boxes_frame is None or frame - self.boxes_frame >= self.refresh:
+            self.predict()
+        end = frame + self.horizon
+        boxes = [box for box in self.boxes if frame < box[0] <= end]
+        if player.invincible:
+            # Hits while still invincible cost nothing
+            boxes = [box for box in boxes if box[0] >= player.invincible_until]
+
+        if player.jumping:
+            offset = frame - self.air_frame if self.air_frame is not None else 0
+            if self.air_frame is None or not 0 < offset <= len(self.air_path) or \
+                    self.air_path[offset - 1] != player.y:
+                self.air_path = player_path(player.y, player.velocity_y, self.horizon, dt)
+                self.air_frame = frame
+                offset = 0
+            carry_on = (self.air_path, self.air_frame)
+        else:
+            carry_on = ((), frame)
+            self.air_frame = None
+
+        hit = self.first_hit(carry_on[0], carry_on[1], boxes) if boxes else None
+        if hit is None:
+            # Nothing in the way; hop to slow the storm if the landing is clear too
+            return (not player.jumping and simulation.storm.progress >= self.storm_threshold
+                    and (not boxes or self.first_hit(self.jump_paths[0], frame, boxes) is None))
+
+        if not player.jumping:
+            options = self.jump_paths
+        elif player.double_jump_available:
+            options = [player_path(player.y, player.velocity_y, self.horizon, dt, 0)]
+        else:
+            options = []
+        latest = hit
+        for path in options:
+            option_hit = self.first_hit(path, frame, boxes)
+            if option_hit is None:
+                return True
+            latest = max(latest, option_hit)
+        # Nothing clears everything. While the hit is further off than a
+        # jump lasts, waiting keeps every option open; after that, take the
+        # option that puts the hit off longest.
+        return hit - frame <= self.commit_steps and latest > hit
+
+    def play(self):
+        """Press whatever this step needs; call before every Simulation.step()"""
+        simulation = self.simulation
+        if simulation.game_state in ("title", "game_over") and self.restart:
+            simulation.apply_input(INPUT_RESTART)
+        elif self.decide():
+            simulation.apply_input(INPUT_JUMP)
+
+def run_autopilot(steps, seed=None, **options):
+    """Headless session of steps steps driven by the autopilot"""
+    from storm_simulation import Simulation
+
+    simulation = Simulation(seed)
+    autopilot = Autopilot(simulation, **options)
+    simulation.start()
+    games = []
+    for _ in range(steps):
+        if simulation.game_state == "game_over":
+            games.append(simulation.score)
+        autopilot.play()
+        simulation.step()
+    return simulation, games
+
+if __name__ == "__main__":
+    import sys
+    import time
+    from storm_simulation import STEP_RATE
+
+    steps = int(sys.argv[1]) if len(sys.argv) > 1 else 100000
+    start_time = time.perf_counter()
+    simulation, games = run_autopilot(steps, seed=0)
+    elapsed = time.perf_counter() - start_time
+    print(f"Simulated {steps} steps in {elapsed:.2f}s "
+          f"({steps / elapsed:.0f} steps/s, {steps / STEP_RATE / elapsed:.0f}x real time)")
+    print(f"Games finished: {len(games)} | Scores: {games} | Current score: {simulation.score} | "
+          f"Level: {simulation.difficulty_level} | Entities: {len(simulation.entities)}")
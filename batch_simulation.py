@@ -0,0 +1,491 @@
+import numpy as np
+from storm_simulation import (SCREEN_WIDTH, GROUND_Y, FPS, STEP_RATE, DEFAULT_RULES,
+                              PLAYER_X, PLAYER_WIDTH, PLAYER_HEIGHT, JUMP_VELOCITY,
+                              DOUBLE_JUMP_VELOCITY, GRAVITY, depth_scale, depth_ground_y)
+from jump_reach import jump_reach
+
+# Vectorized Storm Runner 3D rules: N independent sessions stepped in
+# lockstep, one NumPy array per field (struct of arrays). Each step follows
+# Simulation.step - player physics, entity movement, difficulty, storm,
+# spawns, collisions and score - in the same order. Sessions only differ
+# from storm_simulation in where their random numbers come from.
+
+PLAYER_GROUND_TOP = GROUND_Y - PLAYER_HEIGHT
+
+# Obstacle type codes
+STANDARD = 0
+FLYING = 1
+BOULDER = 2
+
+SPAWN_KINDS = ("obstacle", "powerup", "coin")
+
+# Power-up type codes
+INVINCIBILITY = 0
+SCORE_BOOST = 1
+EXTRA_LIFE = 2
+
+def rotated_size(size, angle):
+    """Bounding box of a rotated square, as pygame.transform.rotate sizes it"""
+    radians = np.radians(angle)
+    extent = size * (np.abs(np.cos(radians)) + np.abs(np.sin(radians)))
+    return np.floor(extent)
+
+class EntitySlots:
+    """Fixed-capacity entity storage, shape (sessions, capacity) per field"""
+    def __init__(self, count, capacity, fields):
+        self.capacity = capacity
+        self.active = np.zeros((count, capacity), dtype=bool)
+        self.x = np.zeros((count, capacity))
+        self.y = np.zeros((count, capacity))
+        self.width = np.zeros((count, capacity))
+        self.height = np.zeros((count, capacity))
+        self.speed = np.zeros((count, capacity))
+        self.z_position = np.zeros((count, capacity))
+        self.velocity_x = np.zeros((count, capacity))  # speed * depth_scale, fixed at spawn
+        for name, dtype in fields:
+            setattr(self, name, np.zeros((count, capacity), dtype=dtype))
+        self.dropped = 0  # Spawns lost because a session was full
+
+    def clear(self, sessions):
+        self.active[sessions] = False
+
+    def allocate(self, sessions):
+        """Claim the first free slot in each session; returns (sessions, slots) that got one"""
+        free = ~self.active[sessions]
+        has_room = free.any(axis=1)
+        self.dropped += int((~has_room).sum())
+        sessions = sessions[has_room]
+        slots = free[has_room].argmax(axis=1)
+        self.active[sessions, slots] = True
+        return sessions, slots
+
+    def place(self, sessions, slots, x, y, width, height, speed, z_position):
+        self.x[sessions, slots] = x
+        self.y[sessions, slots] = y
+        self.width[sessions, slots] = width
+        self.height[sessions, slots] = height
+        self.speed[sessions, slots] = speed
+        self.z_position[sessions, slots] = z_position
+        self.velocity_x[sessions, slots] = speed * depth_scale(z_position)
+
+    def scroll(self, moving, dt):
+        """Move every slot of the sessions in moving (an (N, 1) float mask) left"""
+        self.x -= self.velocity_x * (moving * dt)
+
+    def resize_about_center(self, index, size):
+        """Resize the square slots at index (from np.nonzero) keeping their centers"""
+        half_change = (size - self.width[index]) / 2
+        self.x[index] -= half_change
+        self.y[index] -= (size - self.height[index]) / 2
+        self.width[index] = size
+        self.height[index] = size
+
+    def overlaps_player(self, player_y):
+        """Same test as Body.collides against each session's player"""
+        top = player_y[:, None]
+        return (self.active &
+                (self.x < PLAYER_X + PLAYER_WIDTH) & (PLAYER_X < self.x + self.width) &
+                (self.y < top + PLAYER_HEIGHT) & (top < self.y + self.height))
+
+class BatchSimulation:
+    """N Storm Runner 3D sessions that start playing at once and step together"""
+    def __init__(self, count, seed=None, step_rate=STEP_RATE, rules=DEFAULT_RULES,
+                 obstacle_capacity=16, powerup_capacity=16, coin_capacity=32):
+        self.count = count
+        self.rules = rules
+        self.rng = np.random.default_rng(seed)
+        self.step_rate = step_rate
+        self.dt = FPS / step_rate
+        self.step_ms = 1000.0 / step_rate
+        self.reach = jump_reach(jump_velocity=JUMP_VELOCITY, double_jump_velocity=DOUBLE_JUMP_VELOCITY,
+                                gravity=GRAVITY, ground_y=GROUND_Y, player_x=PLAYER_X,
+                                player_width=PLAYER_WIDTH, player_height=PLAYER_HEIGHT, dt=self.dt)
+
+        # Player
+        self.player_y = np.zeros(count)
+        self.velocity_y = np.zeros(count)
+        self.jumping = np.zeros(count, dtype=bool)
+        self.double_jump_available = np.zeros(count, dtype=bool)
+        self.invincible = np.zeros(count, dtype=bool)
+        self.invincible_timer = np.zeros(count)
+        self.lives = np.zeros(count, dtype=np.int64)
+
+        # Session
+        self.storm_progress = np.zeros(count)
+        self.score = np.zeros(count, dtype=np.int64)
+        self.score_carry = np.zeros(count)
+        self.coins_collected = np.zeros(count, dtype=np.int64)
+        self.game_speed = np.zeros(count)
+        self.difficulty_level = np.zeros(count, dtype=np.int64)
+
+        # Level chunks, as LevelStream: the difficulty of the current chunk
+        # and the next one, fixed when the chunk before it began
+        self.chunk_end = np.zeros(count)
+        self.chunk_speed = np.zeros(count)
+        self.chunk_level = np.zeros(count, dtype=np.int64)
+        self.next_chunk_speed = np.zeros(count)
+        self.next_chunk_level = np.zeros(count, dtype=np.int64)
+        # Per kind, the stretch of the chunk being filled and when its entity is due
+        self.stratum = {kind: np.zeros(count, dtype=np.int64) for kind in SPAWN_KINDS}
+        self.due = {kind: np.zeros(count) for kind in SPAWN_KINDS}
+        self.frame = np.zeros(count, dtype=np.int64)
+        self.game_over = np.zeros(count, dtype=bool)
+
+        self.obstacles = EntitySlots(count, obstacle_capacity, [
+            ("obstacle_type", np.int8), ("original_y", float), ("y_range", float),
+            ("size", float), ("rotation", float), ("rotation_speed", float)])
+        self.powerups = EntitySlots(count, powerup_capacity, [("powerup_type", np.int8)])
+        self.coins = EntitySlots(count, coin_capacity, [
+            ("original_size", float), ("animation_frame", float)])
+
+        self.reset()
+
+    def reset(self, sessions=None):
+        """Start selected sessions (default all) from a fresh game"""
+        if sessions is None:
+            sessions = np.arange(self.count)
+        elif sessions.dtype == bool:
+            sessions = np.flatnonzero(sessions)
+        self.player_y[sessions] = PLAYER_GROUND_TOP
+        self.velocity_y[sessions] = 0
+        self.jumping[sessions] = False
+        self.double_jump_available[sessions] = True
+        self.invincible[sessions] = False
+        self.invincible_timer[sessions] = 0
+        self.lives[sessions] = 5
+        self.storm_progress[sessions] = 0
+        self.score[sessions] = 0
+        self.score_carry[sessions] = 0
+        self.coins_collected[sessions] = 0
+        self.game_speed[sessions] = 1
+        self.difficulty_level[sessions] = 1
+        self.frame[sessions] = 0
+        self.chunk_end[sessions] = 0
+        self.next_chunk_speed[sessions] = 1
+        self.next_chunk_level[sessions] = 1
+        self.next_chunk(sessions)
+        self.game_over[sessions] = False
+        for slots in (self.obstacles, self.powerups, self.coins):
+            slots.clear(sessions)
+
+    def jump(self, mask):
+        """Player.jump for every session in mask that is still playing"""
+        mask = mask & ~self.game_over
+        first = mask & ~self.jumping
+        double = mask & self.jumping & self.double_jump_available
+        self.velocity_y[first] = JUMP_VELOCITY
+        self.jumping[first] = True
+        self.velocity_y[double] = DOUBLE_JUMP_VELOCITY
+        self.double_jump_available[double] = False
+
+    def lose_life(self, mask):
+        """Player.lose_life for sessions in mask; returns the sessions whose game ended"""
+        hit = mask & ~self.invincible
+        self.lives[hit] -= 1
+        self.invincible[hit] = True
+        self.invincible_timer[hit] = 180
+        return hit & (self.lives <= 0)
+
+    def step(self, jump=None):
+        """Advance every playing session by one fixed step; jump is an optional bool mask"""
+        if jump is not None:
+            self.jump(jump)
+        playing = ~self.game_over
+        dt = self.dt
+        rng = self.rng
+        rules = self.rules
+        self.frame[playing] += 1
+
+        # Player physics
+        self.velocity_y = np.where(playing, self.velocity_y + GRAVITY * dt, self.velocity_y)
+        self.player_y = np.where(playing, self.player_y + self.velocity_y * dt, self.player_y)
+        landed = playing & (self.player_y + PLAYER_HEIGHT >= GROUND_Y)
+        self.player_y[landed] = PLAYER_GROUND_TOP
+        self.velocity_y[landed] = 0
+        self.jumping[landed] = False
+        self.double_jump_available[landed] = True
+        counting = playing & self.invincible
+        self.invincible_timer[counting] -= dt
+        self.invincible[counting & (self.invincible_timer <= 0)] = False
+
+        # Entity movement, frozen for finished sessions. Only the few active
+        # flying obstacles, boulders and coins are animated, by index.
+        moving = playing[:, None]
+        moving_scale = moving.astype(float)
+        obstacles = self.obstacles
+        coins = self.coins
+        for slots in (obstacles, self.powerups, coins):
+            slots.scroll(moving_scale, dt)
+
+        live_obstacles = moving & obstacles.active
+        flying = np.nonzero(live_obstacles & (obstacles.obstacle_type == FLYING))
+        time_ms = self.frame[flying[0]] * self.step_ms
+        obstacles.y[flying] = obstacles.original_y[flying] + obstacles.y_range[flying] * np.sin(time_ms * 0.005)
+
+        rolling = np.nonzero(live_obstacles & (obstacles.obstacle_type == BOULDER))
+        rotation = obstacles.rotation[rolling] + obstacles.rotation_speed[rolling] * dt
+        rotation[rotation >= 360] = 0
+        obstacles.rotation[rolling] = rotation
+        obstacles.resize_about_center(rolling, rotated_size(obstacles.size[rolling], rotation))
+
+        animating = np.nonzero(moving & coins.active)
+        animation_frame = coins.animation_frame[animating] + 0.2 * dt
+        coins.animation_frame[animating] = animation_frame
+        pulse_size = np.floor(coins.original_size[animating] * (1.0 + 0.1 * np.sin(animation_frame)))
+        shown = pulse_size > 0  # Prevent zero size
+        animating = (animating[0][shown], animating[1][shown])
+        coins.resize_about_center(animating, rotated_size(pulse_size[shown], animation_frame[shown] * 10 % 360))
+
+        for slots in (obstacles, self.powerups, coins):
+            slots.active &= (slots.x + slots.width >= 0) | ~moving
+
+        # Check for difficulty increase
+        new_level = 1 + self.score // rules.level_score
+        level_up = playing & (new_level > self.difficulty_level)
+        self.difficulty_level[level_up] = new_level[level_up]
+        self.game_speed[level_up] += rules.level_speed_step
+        self.game_speed[playing & ~level_up] += rules.speed_creep * dt
+
+        # Update storm progress
+        storm_speed = self.game_speed * rules.storm_multiplier
+        player_speed = np.where(self.jumping, self.game_speed, self.game_speed * 0.9)
+        speed_diff = storm_speed - player_speed
+        progress = np.where(speed_diff > 0, self.storm_progress + speed_diff * rules.storm_gain * dt,
+                            np.maximum(0, self.storm_progress + speed_diff * rules.storm_recovery * dt))
+        self.storm_progress = np.where(playing, np.minimum(100, progress), self.storm_progress)
+
+        # Check if storm caught up with player
+        caught = playing & (self.storm_progress >= 100)
+        ended = self.lose_life(caught)
+        self.storm_progress[caught & ~ended] = rules.storm_reset
+        self.game_over |= ended
+
+        # Spawn from the level chunks; a session entering a new chunk
+        # still gets anything due at the end of the old one first
+        time = self.frame * dt
+        self.spawn_due(playing, time)
+        entering = np.flatnonzero(playing & (time >= self.chunk_end))
+        if len(entering):
+            self.next_chunk(entering)
+            self.spawn_due(playing, time)
+
+        # Check for collisions with obstacles
+        hit = playing & ~self.invincible & obstacles.overlaps_player(self.player_y).any(axis=1)
+        self.game_over |= self.lose_life(hit)
+
+        # Check for collisions with powerups
+        powerups = self.powerups
+        taken = powerups.overlaps_player(self.player_y) & playing[:, None]
+        powerups.active &= ~taken
+        kinds = powerups.powerup_type
+        shielded = (taken & (kinds == INVINCIBILITY)).any(axis=1)
+        self.invincible[shielded] = True
+        self.invincible_timer[shielded] = 240
+        self.score += 100 * (taken & (kinds == SCORE_BOOST)).sum(axis=1)
+        self.lives = np.where(self.lives < 5,
+                              np.minimum(5, self.lives + (taken & (kinds == EXTRA_LIFE)).sum(axis=1)),
+                              self.lives)
+
+        # Check for collisions with coins
+        taken = coins.overlaps_player(self.player_y) & playing[:, None]
+        coins.active &= ~taken
+        collected = taken.sum(axis=1)
+        self.coins_collected += collected
+        self.score += 10 * collected
+
+        # Update score - one point per 60 FPS frame survived
+        self.score_carry[playing] += dt
+        whole_frames = np.floor(self.score_carry)
+        self.score += whole_frames.astype(np.int64)
+        self.score_carry -= whole_frames
+
+    def next_chunk(self, sessions):
+        """Move sessions on to their next chunk and fix the difficulty of the one after"""
+        self.chunk_end[sessions] += self.rules.chunk_frames
+        self.chunk_speed[sessions] = self.next_chunk_speed[sessions]
+        self.chunk_level[sessions] = self.next_chunk_level[sessions]
+        self.next_chunk_speed[sessions] = self.game_speed[sessions]
+        self.next_chunk_level[sessions] = self.difficulty_level[sessions]
+        for kind in SPAWN_KINDS:
+            self.stratum[kind][sessions] = 0
+            self.schedule(kind, sessions)
+
+    def spacing(self, kind, sessions):
+        """Stretch of the chunk that holds one entity of kind, on average"""
+        rules = self.rules
+        speed = self.chunk_speed[sessions]
+        if kind == "obstacle":
+            level = self.chunk_level[sessions]
+            interval = np.maximum(rules.obstacle_min_interval,
+                                  rules.obstacle_interval // (speed * (1 + (level * rules.obstacle_level_factor))))
+            spacing = interval / rules.obstacle_chance
+        elif kind == "powerup":
+            spacing = (rules.powerup_interval // speed) / rules.powerup_chance
+        else:
+            spacing = (rules.coin_interval // speed) / rules.coin_chance
+        return np.maximum(1.0, spacing)
+
+    def schedule(self, kind, sessions):
+        """When the entity of each session's current stretch is due, as LevelChunk.times"""
+        rng = self.rng
+        length = self.rules.chunk_frames
+        spacing = self.spacing(kind, sessions)
+        strata = np.floor(length / spacing)
+        remainder = length - strata * spacing
+        stratum = self.stratum[kind][sessions]
+        start = self.chunk_end[sessions] - length + stratum * spacing
+        jitter = rng.uniform(0.25, 0.75, len(sessions))
+        due = np.where(stratum < strata, start + jitter * spacing, start + jitter * remainder)
+        last = (stratum == strata) & (rng.random(len(sessions)) < remainder / spacing)
+        self.due[kind][sessions] = np.where((stratum < strata) | last, due, np.inf)
+
+    def spawn_due(self, playing, time):
+        for kind, spawn in (("obstacle", self.spawn_obstacles), ("powerup", self.spawn_powerups),
+                            ("coin", self.spawn_coins)):
+            sessions = np.flatnonzero(playing & (time >= self.due[kind]))
+            if len(sessions):
+                spawn(sessions)
+                self.stratum[kind][sessions] += 1
+                self.schedule(kind, sessions)
+
+    def spawn_obstacles(self, sessions):
+        if not len(sessions):
+            return
+        rng = self.rng
+        sessions, slots = self.obstacles.allocate(sessions)
+        count = len(sessions)
+
+        # Choose obstacle type based on the chunk's difficulty
+        level = self.chunk_level[sessions]
+        choices = np.where(level >= 3, 3, np.where(level >= 2, 2, 1))
+        kinds = np.floor(rng.random(count) * choices).astype(np.int8)
+
+        standard_width = rng.integers(30, 51, count)
+        standard_height = rng.integers(30, 61, count)
+        flying_width = rng.integers(40, 61, count)
+        flying_height = rng.integers(20, 41, count)
+        boulder_size = rng.integers(40, 61, count)
+        z_position = np.select([kinds == STANDARD, kinds == FLYING],
+                               [rng.uniform(0.1, 0.5, count), rng.uniform(0.2, 0.7, count)],
+                               rng.uniform(0.1, 0.4, count))
+        height_offset = rng.integers(50, 151, count)
+        y_range = rng.integers(10, 31, count)
+        rotation_speed = rng.uniform(2, 5, count)
+
+        scale = depth_scale(z_position)
+        original_width = np.select([kinds == STANDARD, kinds == FLYING],
+                                   [standard_width, flying_width], boulder_size)
+        original_height = np.select([kinds == STANDARD, kinds == FLYING],
+                                    [standard_height, flying_height], boulder_size)
+        width = np.floor(original_width * scale)
+        height = np.floor(original_height * scale)
+        lift = np.where(kinds == FLYING, height_offset * scale, 0)
+
+        obstacles = self.obstacles
+        top = depth_ground_y(z_position) - lift - height
+        obstacles.place(sessions, slots, SCREEN_WIDTH, top, width, height,
+                        5 + self.chunk_speed[sessions], z_position)
+        obstacles.obstacle_type[sessions, slots] = kinds
+        obstacles.size[sessions, slots] = width
+        obstacles.original_y[sessions, slots] = top
+        obstacles.y_range[sessions, slots] = y_range * scale
+        obstacles.rotation[sessions, slots] = 0
+        obstacles.rotation_speed[sessions, slots] = rotation_speed
+
+        # Take back the ones that would leave no way through, as Simulation.spawn_possible
+        possible = self.spawn_possible(sessions, slots)
+        obstacles.active[sessions[~possible], slots[~possible]] = False
+
+    def spawn_possible(self, sessions, slots):
+        """Per new obstacle at (sessions, slots), whether the session's pattern stays passable"""
+        obstacles = self.obstacles
+        # Boxes bounded over the whole motion: flying ones over their sine,
+        # boulders over every rotation
+        kinds = obstacles.obstacle_type[sessions]
+        size = obstacles.size[sessions]
+        flying = kinds == FLYING
+        boulder = kinds == BOULDER
+        reach = size * np.sqrt(2)
+        center_x = obstacles.x[sessions] + obstacles.width[sessions] / 2
+        center_y = obstacles.y[sessions] + obstacles.height[sessions] / 2
+        width = np.where(boulder, reach, obstacles.width[sessions])
+        left = np.where(boulder, center_x - reach / 2, obstacles.x[sessions])
+        y_range = obstacles.y_range[sessions]
+        top = np.select([flying, boulder], [obstacles.original_y[sessions] - y_range, center_y - reach / 2],
+                        obstacles.y[sessions])
+        bottom = np.select([flying, boulder],
+                           [obstacles.original_y[sessions] + y_range + obstacles.height[sessions],
+                            center_y + reach / 2],
+                           obstacles.y[sessions] + obstacles.height[sessions])
+        boxes = zip(slots.tolist(), obstacles.active[sessions].tolist(), left.tolist(), width.tolist(),
+                    top.tolist(), bottom.tolist(), obstacles.velocity_x[sessions].tolist())
+
+        # Plain floats from here on; these loops are short but NumPy scalars are slow
+        possible = np.ones(len(sessions), dtype=bool)
+        window = self.reach.window
+        for n, (slot, active, left, width, top, bottom, travel) in enumerate(boxes):
+            if window(left[slot], width[slot], top[slot], bottom[slot], travel[slot]) is None:
+                continue
+            windows = []
+            for other, live in enumerate(active):
+                if live:
+                    other_window = window(left[other], width[other], top[other], bottom[other], travel[other])
+                    if other_window is not None:
+                        windows.append(other_window)
+            possible[n] = self.reach.pattern_possible(windows)
+        return possible
+
+    def spawn_powerups(self, sessions):
+        if not len(sessions):
+            return
+        rng = self.rng
+        sessions, slots = self.powerups.allocate(sessions)
+        count = len(sessions)
+        z_position = rng.uniform(0.2, 0.6, count)
+        scale = depth_scale(z_position)
+        size = np.floor(25 * scale)
+        height_offset = rng.integers(0, 101, count) * scale
+
+        powerups = self.powerups
+        powerups.place(sessions, slots, SCREEN_WIDTH, depth_ground_y(z_position) - height_offset - size,
+                       size, size, 5 + self.chunk_speed[sessions], z_position)
+        powerups.powerup_type[sessions, slots] = rng.integers(0, 3, count)
+
+    def spawn_coins(self, sessions):
+        if not len(sessions):
+            return
+        rng = self.rng
+        sessions, slots = self.coins.allocate(sessions)
+        count = len(sessions)
+        z_position = rng.uniform(0.2, 0.7, count)
+        scale = depth_scale(z_position)
+        size = np.floor(15 * scale)
+        height_offset = rng.integers(20, 121, count) * scale
+
+        coins = self.coins
+        coins.place(sessions, slots, SCREEN_WIDTH, depth_ground_y(z_position) - height_offset - size,
+                    size, size, 5 + self.chunk_speed[sessions], z_position)
+        coins.original_size[sessions, slots] = size
+        coins.animation_frame[sessions, slots] = 0
+
+def run_batch(count, steps, seed=None, jump_every=90):
+    """Benchmark helper: every session jumps on the same metronome"""
+    batch = BatchSimulation(count, seed)
+    jump = np.ones(count, dtype=bool)
+    for step in range(steps):
+        batch.step(jump if jump_every and step % jump_every == 0 else None)
+    return batch
+
+if __name__ == "__main__":
+    import sys
+    import time
+
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 4096
+    steps = int(sys.argv[2]) if len(sys.argv) > 2 else 2000
+    start_time = time.perf_counter()
+    batch = run_batch(count, steps, seed=0)
+    elapsed = time.perf_counter() - start_time
+    total = count * steps
+    print(f"Simulated {count} sessions x {steps} steps in {elapsed:.2f}s ({total / elapsed:.0f} session-steps/s)")
+    print(f"Mean score: {batch.score.mean():.0f} | Finished: {batch.game_over.sum()} | "
+          f"Dropped spawns: {batch.obstacles.dropped + batch.powerups.dropped + batch.coins.dropped}")
@@ -0,0 +1,189 @@
+import argparse
+import itertools
+import multiprocessing
+import os
+import random
+import time
+from storm_simulation import Simulation, Rules, STEP_RATE
+from rng_streams import derive_seed
+
+# Monte Carlo sweep over the difficulty rules. Every configuration plays the
+# same session seeds with a scripted agent, so the only difference between
+# two rows of the report is the rules. Sessions are split into chunks and
+# spread over a process pool; chunks share nothing, so throughput grows with
+# the number of cores.
+
+AGENTS = ("random", "metronome")
+SESSION_SECONDS = 600  # A session still running after this is counted as survived
+
+class RandomAgent:
+    """Presses jump with a fixed chance per 60 FPS frame"""
+    def __init__(self, seed, jump_chance=0.02):
+        self.rng = random.Random(derive_seed(seed, "agent"))
+        self.jump_chance = jump_chance
+
+    def wants_jump(self, simulation):
+        return self.rng.random() < self.jump_chance * simulation.dt
+
+class MetronomeAgent:
+    """Presses jump every interval steps, like run_headless"""
+    def __init__(self, seed, interval=90):
+        self.interval = interval
+
+    def wants_jump(self, simulation):
+        return simulation.frame % self.interval == 0
+
+AGENT_CLASSES = {"random": RandomAgent, "metronome": MetronomeAgent}
+
+def run_session(rules, seed, agent="random", agent_setting=None, max_steps=SESSION_SECONDS * STEP_RATE):
+    """Play one session until game over; returns (steps survived, score, finished)"""
+    simulation = Simulation(seed, rules=rules)
+    player = AGENT_CLASSES[agent](seed) if agent_setting is None else AGENT_CLASSES[agent](seed, agent_setting)
+    simulation.start()
+    while simulation.game_state == "playing" and simulation.frame < max_steps:
+        if player.wants_jump(simulation):
+            simulation.jump()
+        simulation.step()
+    return simulation.frame, simulation.score, simulation.game_state == "game_over"
+
+def run_chunk(job):
+    """Pool worker: play one chunk of seeds for one configuration"""
+    index, overrides, seeds, agent, agent_setting, max_steps, batch = job
+    rules = Rules(**overrides)
+    if batch:
+        return index, run_batch_chunk(rules, seeds, agent, agent_setting, max_steps)
+    return index, [run_session(rules, seed, agent, agent_setting, max_steps) for seed in seeds]
+
+def run_batch_chunk(rules, seeds, agent, agent_setting, max_steps):
+    """Same as run_chunk, with the whole chunk in one NumPy BatchSimulation"""
+    import numpy as np
+    from batch_simulation import BatchSimulation
+
+    batch = BatchSimulation(len(seeds), seed=derive_seed(seeds[0], "batch"), rules=rules)
+    agent_rng = np.random.default_rng(derive_seed(seeds[0], "agent"))
+    if agent == "random":
+        jump_chance = (0.02 if agent_setting is None else agent_setting) * batch.dt
+    else:
+        interval = 90 if agent_setting is None else int(agent_setting)
+        everyone = np.ones(len(seeds), dtype=bool)
+    for step in range(max_steps):
+        if batch.game_over.all():
+            break
+        if agent == "random":
+            jump = agent_rng.random(len(seeds)) < jump_chance
+        else:
+            jump = everyone if step % interval == 0 else None
+        batch.step(jump)
+    return list(zip(batch.frame.tolist(), batch.score.tolist(), batch.game_over.tolist()))
+
+def parse_param(text):
+    """'name=v1,v2,v3' -> (name, [values])"""
+    name, _, values = text.partition("=")
+    name = name.strip()
+    if name not in Rules.names():
+        raise argparse.ArgumentTypeError(f"Unknown rule {name!r}, expected one of: {', '.join(Rules.names())}")
+    try:
+        numbers = [float(value) for value in values.split(",") if value.strip()]
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"Bad values for {name}: {values!r}")
+    # Whole numbers stay ints so integer rules keep their floor-division behaviour
+    return name, [int(number) if number.is_integer() else number for number in numbers]
+
+def build_grid(params):
+    """Every combination of the swept values, as rule override dicts"""
+    if not params:
+        return [{}]
+    names = [name for name, _ in params]
+    return [dict(zip(names, values)) for values in itertools.product(*(values for _, values in params))]
+
+def percentile(sorted_values, fraction):
+    """Nearest-rank percentile of an already sorted list"""
+    if not sorted_values:
+        return 0
+    rank = min(len(sorted_values) - 1, max(0, int(round(fraction * (len(sorted_values) - 1)))))
+    return sorted_values[rank]
+
+def summarize(results, step_rate=STEP_RATE):
+    survival = sorted(steps / step_rate for steps, _, _ in results)
+    scores = sorted(score for _, score, _ in results)
+    finished = sum(1 for _, _, ended in results if ended)
+    return {
+        "sessions": len(results),
+        "survived": 1 - finished / max(1, len(results)),
+        "survival": [percentile(survival, q) for q in (0.1, 0.5, 0.9)],
+        "score": [percentile(scores, q) for q in (0.1, 0.5, 0.9)],
+        "mean_score": sum(scores) / max(1, len(scores)),
+    }
+
+def build_jobs(grid, sessions, agent="random", agent_setting=None, max_steps=SESSION_SECONDS * STEP_RATE,
+               chunk_size=32, batch=False, base_seed=0):
+    """Split every configuration's sessions into run_chunk jobs"""
+    seeds = [f"{base_seed}:{n}" for n in range(sessions)]
+    return [(index, overrides, seeds[start:start + chunk_size], agent, agent_setting, max_steps, batch)
+            for index, overrides in enumerate(grid)
+            for start in range(0, sessions, chunk_size)]
+
+def sweep(grid, sessions, agent="random", agent_setting=None, max_steps=SESSION_SECONDS * STEP_RATE,
+          processes=None, chunk_size=32, batch=False, base_seed=0):
+    """Run every configuration in the grid; returns a list of (overrides, results)"""
+    jobs = build_jobs(grid, sessions, agent, agent_setting, max_steps, chunk_size, batch, base_seed)
+    return run_jobs(grid, jobs, processes)
+
+def run_jobs(grid, jobs, processes=None):
+    results = [[] for _ in grid]
+    with multiprocessing.Pool(processes) as pool:
+        # Unordered, one chunk at a time, so an idle core always grabs the next chunk
+        for index, chunk in pool.imap_unordered(run_chunk, jobs, chunksize=1):
+            results[index].extend(chunk)
+    return list(zip(grid, results))
+
+def print_report(rows):
+    print(f"{'configuration':<40} {'survived':>8} {'time p10/p50/p90 (s)':>22} {'score p10/p50/p90':>22} {'mean':>8}")
+    for overrides, results in rows:
+        summary = summarize(results)
+        label = ", ".join(f"{name}={value}" for name, value in overrides.items()) or "defaults"
+        times = "/".join(f"{value:.1f}" for value in summary["survival"])
+        scores = "/".join(str(int(value)) for value in summary["score"])
+        print(f"{label:<40} {summary['survived']:>8.1%} {times:>22} {scores:>22} {summary['mean_score']:>8.0f}")
+
+def add_sweep_arguments(parser):
+    """Sweep options shared with the distributed coordinator"""
+    parser.add_argument("--param", action="append", type=parse_param, default=[],
+                        help="Rule to sweep, as name=v1,v2,... (repeat for a grid)")
+    parser.add_argument("--sessions", type=int, default=256, help="Sessions per configuration")
+    parser.add_argument("--agent", choices=AGENTS, default="random")
+    parser.add_argument("--agent-setting", type=float,
+                        help="Jump chance per frame (random) or jump interval in steps (metronome)")
+    parser.add_argument("--max-seconds", type=float, default=SESSION_SECONDS,
+                        help="Simulated seconds before a session counts as survived")
+    parser.add_argument("--chunk-size", type=int, default=32, help="Sessions per job")
+    parser.add_argument("--batch", action="store_true", help="Play each chunk in a NumPy BatchSimulation")
+    parser.add_argument("--seed", default=0, help="Base seed; every configuration plays the same sessions")
+    parser.add_argument("--list", action="store_true", help="List the tunable rules and exit")
+
+def jobs_from_arguments(args):
+    """Handle --list, then turn parsed sweep options into (grid, jobs)"""
+    if args.list:
+        for name, value in Rules().as_dict().items():
+            print(f"{name} = {value}")
+        raise SystemExit
+    if args.agent == "metronome" and args.agent_setting is not None:
+        args.agent_setting = int(args.agent_setting)
+    grid = build_grid(args.param)
+    return grid, build_jobs(grid, args.sessions, args.agent, args.agent_setting, int(args.max_seconds * STEP_RATE),
+                            args.chunk_size, args.batch, args.seed)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Monte Carlo sweep over Storm Runner difficulty rules")
+    add_sweep_arguments(parser)
+    parser.add_argument("--processes", type=int, default=os.cpu_count())
+    args = parser.parse_args()
+
+    grid, jobs = jobs_from_arguments(args)
+    start_time = time.perf_counter()
+    rows = run_jobs(grid, jobs, args.processes)
+    elapsed = time.perf_counter() - start_time
+    print_report(rows)
+    steps = sum(steps for _, results in rows for steps, _, _ in results)
+    print(f"{len(grid)} configurations x {args.sessions} sessions in {elapsed:.1f}s "
+          f"on {args.processes} processes ({steps / elapsed:.0f} steps/s)")
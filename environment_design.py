@@ -1,8 +1,11 @@
 import pygame
 import os
-import random
 import math
+import random
 from sprite_utils import load_image
+from rng_streams import gameplay, cosmetic, procedural
+from scheduler import Scheduler
+from rotation_atlas import rotation_atlas
 
 class ParallaxBackground:
     """Enhanced parallax background with multiple layers"""
@@ -81,9 +84,9 @@ class ParallaxBackground:
         
         # Add some random shapes for texture
         for _ in range(50):
-            shape_x = random.randint(0, surface.get_width() - 1)
-            shape_y = random.randint(0, surface.get_height() - 1)
-            shape_size = random.randint(5, 20)
+            shape_x = procedural.randint(0, surface.get_width() - 1)
+            shape_y = procedural.randint(0, surface.get_height() - 1)
+            shape_size = procedural.randint(5, 20)
             
             if scroll_speed < 0.3:
                 # Cloud-like shapes for sky
@@ -161,7 +164,7 @@ class Ground:
         # Add noise for texture
         for x in range(texture.get_width()):
             for y in range(texture.get_height()):
-                noise = random.randint(-10, 10)
+                noise = procedural.randint(-10, 10)
                 color = (
                     max(0, min(255, base_color[0] + noise)),
                     max(0, min(255, base_color[1] + noise)),
@@ -184,19 +187,19 @@ class Ground:
     def generate_details(self):
         """Generate ground details like rocks and grass"""
         for _ in range(30):
-            detail_type = random.choice(['rock', 'grass', 'pebble'])
-            x_pos = random.randint(0, self.screen_width * 2)
+            detail_type = procedural.choice(['rock', 'grass', 'pebble'])
+            x_pos = procedural.randint(0, self.screen_width * 2)
             
             if detail_type == 'rock':
-                size = random.randint(5, 10)
+                size = procedural.randint(5, 10)
                 y_pos = self.screen_height - self.ground_height + 5
                 color = (80, 80, 80)
             elif detail_type == 'grass':
-                size = random.randint(3, 8)
+                size = procedural.randint(3, 8)
                 y_pos = self.screen_height - self.ground_height + 2
                 color = (70, 140, 50)
             else:  # pebble
-                size = random.randint(2, 4)
+                size = procedural.randint(2, 4)
                 y_pos = self.screen_height - self.ground_height + 10
                 color = (120, 100, 80)
                 
@@ -218,7 +221,7 @@ class Ground:
         for detail in self.details:
             detail['x'] -= game_speed
             if detail['x'] < -20:
-                detail['x'] = self.screen_width + random.randint(0, 100)
+                detail['x'] = self.screen_width + procedural.randint(0, 100)
     
     def draw(self, surface):
         """Draw the ground with texture and details"""
@@ -237,7 +240,7 @@ class Ground:
             elif detail['type'] == 'grass':
                 # Draw a few blades of grass
                 for i in range(3):
-                    offset = random.randint(-2, 2)
+                    offset = cosmetic.randint(-2, 2)
                     pygame.draw.line(surface, detail['color'],
                                    (detail['x'] + offset, detail['y']),
                                    (detail['x'] + offset, detail['y'] - detail['size']),
@@ -259,10 +262,11 @@ class WeatherSystem:
         
         # Lightning properties
         self.lightning_active = False
-        self.lightning_timer = 0
         self.lightning_duration = 0
         self.lightning_alpha = 0
-        self.next_lightning = random.randint(300, 600)
+        # Lightning runs on its own clock, only advanced in heavy rain
+        self.lightning_clock = Scheduler()
+        self.lightning_clock.schedule(0, self.trigger_lightning)
         
         # Fog properties
         self.fog_surfaces = self.create_fog_surfaces()
@@ -283,9 +287,9 @@ class WeatherSystem:
             
             # Create a cloudy pattern
             for _ in range(100):
-                x = random.randint(0, size[0] - 1)
-                y = random.randint(0, size[1] - 1)
-                radius = random.randint(20, 40)
+                x = procedural.randint(0, size[0] - 1)
+                y = procedural.randint(0, size[1] - 1)
+                radius = procedural.randint(20, 40)
                 
                 # Draw a semi-transparent white circle
                 pygame.draw.circle(fog, (255, 255, 255, 30), (x, y), radius)
@@ -314,11 +318,11 @@ class WeatherSystem:
     def add_raindrop(self):
         """Add a new raindrop"""
         self.raindrops.append({
-            'x': random.randint(0, self.screen_width),
-            'y': random.randint(-100, 0),
-            'speed': random.randint(10, 20),
-            'length': random.randint(10, 20),
-            'thickness': random.randint(1, 2)
+            'x': cosmetic.randint(0, self.screen_width),
+            'y': cosmetic.randint(-100, 0),
+            'speed': cosmetic.randint(10, 20),
+            'length': cosmetic.randint(10, 20),
+            'thickness': cosmetic.randint(1, 2)
         })
     
     def update(self, game_speed=1.0):
@@ -329,24 +333,12 @@ class WeatherSystem:
             drop['x'] -= 3 * game_speed  # Angle the rain
             
             if drop['y'] > self.screen_height:
-                drop['y'] = random.randint(-100, -10)
-                drop['x'] = random.randint(0, self.screen_width)
+                drop['y'] = cosmetic.randint(-100, -10)
+                drop['x'] = cosmetic.randint(0, self.screen_width)
         
         # Update lightning
         if self.rain_intensity > 60:  # Only show lightning in heavy rain
-            if not self.lightning_active:
-                self.lightning_timer -= 1
-                if self.lightning_timer <= 0:
-                    self.trigger_lightning()
-            else:
-                self.lightning_duration -= 1
-                if self.lightning_duration <= 0:
-                    self.lightning_active = False
-                    self.lightning_timer = random.randint(100, 300)
-                    
-                # Flash effect fading
-                if self.lightning_duration < 5:
-                    self.lightning_alpha = max(0, self.lightning_alpha - 51)
+            self.lightning_clock.advance()
         
         # Update fog
         for fog in self.fog_positions:
@@ -357,8 +349,20 @@ class WeatherSystem:
     def trigger_lightning(self):
         """Trigger a lightning flash"""
         self.lightning_active = True
-        self.lightning_duration = random.randint(5, 10)
+        self.lightning_duration = cosmetic.randint(5, 10)
         self.lightning_alpha = 100
+        
+        # Flash effect fading over the last frames
+        for delay in range(self.lightning_duration - 4, self.lightning_duration):
+            self.lightning_clock.schedule(delay, self.fade_lightning)
+        self.lightning_clock.schedule(self.lightning_duration, self.end_lightning)
+    
+    def fade_lightning(self):
+        self.lightning_alpha = max(0, self.lightning_alpha - 51)
+    
+    def end_lightning(self):
+        self.lightning_active = False
+        self.lightning_clock.schedule(cosmetic.randint(100, 300), self.trigger_lightning)
     
     def draw(self, surface):
         """Draw all weather effects"""
@@ -410,8 +414,8 @@ class EnhancedObstacle(pygame.sprite.Sprite):
     def create_standard_triangle(self):
         """Create a standard ground triangle obstacle"""
         # Create a triangular shape
-        height = random.randint(30, 60)
-        width = random.randint(30, 50)
+        height = gameplay.randint(30, 60)
+        width = gameplay.randint(30, 50)
         self.image = pygame.Surface((width, height), pygame.SRCALPHA)
         
         # Draw a triangle
@@ -423,7 +427,7 @@ class EnhancedObstacle(pygame.sprite.Sprite):
         
         # Add some texture/detail
         for _ in range(3):
-            y = random.randint(height // 3, height - 5)
+            y = cosmetic.randint(height // 3, height - 5)
             pygame.draw.line(self.image, (150, 30, 30),
                            (5, y), (width - 5, y), 2)
         
@@ -435,8 +439,8 @@ class EnhancedObstacle(pygame.sprite.Sprite):
     def create_flying_triangle(self):
         """Create a flying triangle obstacle"""
         # Create a flying triangular shape
-        height = random.randint(20, 40)
-        width = random.randint(40, 60)
+        height = gameplay.randint(20, 40)
+        width = gameplay.randint(40, 60)
         self.image = pygame.Surface((width, height), pygame.SRCALPHA)
         
         # Draw a triangle pointing right (like an arrow)
@@ -455,23 +459,41 @@ class EnhancedObstacle(pygame.sprite.Sprite):
         self.rect = self.image.get_rect()
         
         # Position in air
-        height_offset = random.randint(70, 200)
+        height_offset = gameplay.randint(70, 200)
         self.rect.bottomleft = (self.screen_width, self.screen_height - self.ground_height - height_offset)
         
         # Movement pattern
-        self.y_movement = random.choice([-1, 1])
-        self.y_range = random.randint(20, 40)
+        self.y_movement = gameplay.choice([-1, 1])
+        self.y_range = gameplay.randint(20, 40)
         self.original_y = self.rect.y
-        self.movement_speed = random.uniform(0.05, 0.1)
+        self.movement_speed = gameplay.uniform(0.05, 0.1)
     
     def create_boulder_triangle(self):
         """Create a rolling triangle obstacle"""
-        # Create a triangular boulder (pyramid)
-        size = random.randint(40, 60)
-        self.original_image = pygame.Surface((size, size), pygame.SRCALPHA)
+        # Every boulder has its own cracks, drawn from its crack seed; the seed
+        # keys its atlas, so its rotated frames are made once and kept
+        size = gameplay.randint(40, 60)
+        cracks = cosmetic.getrandbits(32)
+        self.atlas = rotation_atlas(("environment_design", "boulder", size, cracks),
+                                    lambda: self.draw_boulder(size, random.Random(cracks)))
+        self.original_image = self.atlas.image
+        self.image = self.original_image
+        self.rect = self.image.get_rect()
+        
+        # Position at ground level
+        self.rect.bottomleft = (self.screen_width, self.screen_height - self.ground_height)
+        
+        # Rotation properties
+        self.rotation = 0
+        self.rotation_speed = gameplay.uniform(3, 7)
+    
+    @staticmethod
+    def draw_boulder(size, rng):
+        """Triangular boulder (pyramid) image with cracks drawn from rng"""
+        image = pygame.Surface((size, size), pygame.SRCALPHA)
         
         # Draw a triangle
-        pygame.draw.polygon(self.original_image, (150, 50, 150), [
+        pygame.draw.polygon(image, (150, 50, 150), [
             (size // 2, 0),   # Top point
             (0, size),        # Bottom left
             (size, size)      # Bottom right
@@ -479,23 +501,14 @@ class EnhancedObstacle(pygame.sprite.Sprite):
         
         # Add some texture/cracks
         for _ in range(3):
-            start_x = random.randint(size//4, size//4 * 3)
-            start_y = random.randint(size//4, size//4 * 3)
-            end_x = start_x + random.randint(-size//4, size//4)
-            end_y = start_y + random.randint(-size//4, size//4)
+            start_x = rng.randint(size//4, size//4 * 3)
+            start_y = rng.randint(size//4, size//4 * 3)
+            end_x = start_x + rng.randint(-size//4, size//4)
+            end_y = start_y + rng.randint(-size//4, size//4)
             
-            pygame.draw.line(self.original_image, (100, 30, 100),
+            pygame.draw.line(image, (100, 30, 100),
                            (start_x, start_y), (end_x, end_y), 2)
-        
-        self.image = self.original_image.copy()
-        self.rect = self.image.get_rect()
-        
-        # Position at ground level
-        self.rect.bottomleft = (self.screen_width, self.screen_height - self.ground_height)
-        
-        # Rotation properties
-        self.rotation = 0
-        self.rotation_speed = random.uniform(3, 7)
+        return image
     
     def update(self):
         """Update obstacle position and animation"""
@@ -513,13 +526,8 @@ class EnhancedObstacle(pygame.sprite.Sprite):
             if self.rotation >= 360:
                 self.rotation = 0
                 
-            # Apply rotation
-            self.image = pygame.transform.rotate(self.original_image, self.rotation)
-            
-            # Keep the same position after rotation (which changes rect size)
-            old_center = self.rect.center
-            self.rect = self.image.get_rect()
-            self.rect.center = old_center
+            # Pick the rotated frame, keeping the same center (the frames differ in size)
+            self.image, self.rect = self.atlas.place(self.rotation, self.rect.center)
         
         # Remove if off screen
         if self.rect.right < 0:
@@ -0,0 +1,191 @@
+import heapq
+import itertools
+import time
+
+# Expensive work that does not have to happen this very frame, spread over
+# the spare time of many frames. Each rendered frame calls run() once; it
+# works through the queued jobs, highest priority first, until the frame's
+# time budget is spent, then leaves the rest for later frames.
+#
+# A job is a plain callable or a generator. A generator is time sliced: every
+# yield hands control back, so the queue can stop between slices when the
+# budget runs out. A job given a deadline (in frames) runs to completion on
+# that frame whatever the budget, so work is never later than it is needed.
+# Code that needs a result right away calls finish(), which does whatever is
+# left synchronously.
+#
+# Frames where the queue went over budget are counted for the debug overlay,
+# along with the job responsible, so hitches can be traced to their source.
+
+class Job:
+    """Handle to queued work and, once done, its result"""
+    __slots__ = ("work", "name", "priority", "deadline", "done", "result", "cost")
+
+    def __init__(self, work, name, priority, deadline):
+        self.work = work
+        self.name = name
+        self.priority = priority
+        self.deadline = deadline
+        self.done = False
+        self.result = None
+        self.cost = 0.0  # Seconds the last slice took, to guess whether the next one fits
+
+    def step(self):
+        """Do one slice; True once the job has finished"""
+        if self.done:
+            return True
+        if callable(self.work):
+            self.result = self.work()
+        else:
+            try:
+                next(self.work)
+                return False
+            except StopIteration as stop:
+                self.result = stop.value
+        self.done = True
+        self.work = None
+        return True
+
+    def cancel(self):
+        # Skipped when the queue reaches it
+        self.done = True
+        self.work = None
+
+class FrameJobs:
+    """Per-frame time-budgeted queue of prioritized jobs"""
+    def __init__(self, budget_ms=2.0):
+        self.budget = budget_ms / 1000.0
+        self.frame = 0
+        self.queue = []  # (-priority, order, job): higher priority first, then oldest
+        self.deadlines = []  # (deadline frame, order, job)
+        self.order = itertools.count()
+
+        # Stats for the debug overlay
+        self.used = 0.0  # Seconds spent in the last run()
+        self.slices = 0  # Slices done in the last run()
+        self.overruns = 0  # Frames that went over budget
+        self.worst = 0.0  # Longest run() so far
+        self.last_overrun = None  # (frame, seconds, name of the job that was running)
+
+    def submit(self, work, priority=0, deadline=None, name=None):
+        """
+        Queue work, a callable or generator. Higher priorities run first;
+        deadline is the number of frames it may take at most.
+        """
+        if name is None:
+            name = getattr(work, "__name__", type(work).__name__)
+        if deadline is not None:
+            deadline += self.frame
+        job = Job(work, name, priority, deadline)
+        order = next(self.order)
+        heapq.heappush(self.queue, (-priority, order, job))
+        if deadline is not None:
+            heapq.heappush(self.deadlines, (deadline, order, job))
+        return job
+
+    def finish(self, job):
+        """Complete job now, however much is left, and return its result"""
+        while not job.step():
+            pass
+        return job.result
+
+    def run(self):
+        """Spend this frame's budget on queued work; call once per frame"""
+        start = time.perf_counter()
+        stop = start + self.budget
+        slices = 0
+        name = None
+
+        # Work due this frame is done regardless of the budget
+        deadlines = self.deadlines
+        while deadlines and deadlines[0][0] <= self.frame:
+            job = heapq.heappop(deadlines)[2]
+            if not job.done:
+                name = job.name
+                slices += 1
+                while not job.step():
+                    slices += 1
+
+        # Then the rest, while the next slice is likely to fit; the first one
+        # always runs so a job bigger than the budget still makes progress
+        queue = self.queue
+        while queue:
+            job = queue[0][2]
+            if job.done:
+                heapq.heappop(queue)
+                continue
+            now = time.perf_counter()
+            if slices and now + job.cost > stop:
+                break
+            name = job.name
+            slices += 1
+            finished = job.step()
+            job.cost = time.perf_counter() - now
+            if finished:
+                heapq.heappop(queue)
+
+        self.used = time.perf_counter() - start
+        self.slices = slices
+        self.worst = max(self.worst, self.used)
+        if self.used > self.budget:
+            self.overruns += 1
+            self.last_overrun = (self.frame, self.used, name)
+        self.frame += 1
+
+    def clear(self):
+        for _, _, job in self.queue:
+            job.cancel()
+        self.queue.clear()
+        self.deadlines.clear()
+
+    def __len__(self):
+        return sum(1 for _, _, job in self.queue if not job.done)
+
+    def overlay_lines(self):
+        """Text for the debug overlay"""
+        lines = [f"Jobs: {len(self)} queued, {self.slices} slices",
+                 f"Budget: {self.used * 1000:.2f} / {self.budget * 1000:.2f} ms (worst {self.worst * 1000:.2f})",
+                 f"Overruns: {self.overruns}"]
+        if self.last_overrun is not None:
+            frame, used, name = self.last_overrun
+            lines.append(f"Last: {name} {used * 1000:.2f} ms at frame {frame}")
+        return lines
+
+    def draw_overlay(self, surface, font, x=10, y=10, color=(255, 255, 255)):
+        """Draw the queue's stats over a dark box at (x, y)"""
+        import pygame
+        texts = [font.render(line, True, color) for line in self.overlay_lines()]
+        width = max(text.get_width() for text in texts) + 10
+        height = sum(text.get_height() for text in texts) + 10
+        pygame.draw.rect(surface, (0, 0, 0), (x, y, width, height))
+        for text in texts:
+            surface.blit(text, (x + 5, y + 5))
+            y += text.get_height()
+
+if __name__ == "__main__":
+    import sys
+
+    # A burst of sliced work, as when a chunk of content arrives, spread over frames
+    budget_ms = float(sys.argv[1]) if len(sys.argv) > 1 else 2.0
+    jobs = FrameJobs(budget_ms)
+
+    def busy(ms):
+        end = time.perf_counter() + ms / 1000.0
+        while time.perf_counter() < end:
+            pass
+
+    def sliced(count, ms):
+        for _ in range(count):
+            busy(ms)
+            yield
+
+    start_time = time.perf_counter()
+    busy(40 * 0.25)
+    print(f"All at once: {(time.perf_counter() - start_time) * 1000:.1f} ms in one frame")
+
+    jobs.submit(sliced(40, 0.25), name="burst")
+    frames = 0
+    while len(jobs):
+        jobs.run()
+        frames += 1
+    print(f"Sliced: {frames} frames, worst {jobs.worst * 1000:.2f} ms, {jobs.overruns} over budget")
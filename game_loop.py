@@ -0,0 +1,79 @@
+import time
+
+class FixedTimestep:
+    """
+    Accumulator that decouples simulation steps from rendered frames.
+    Each rendered frame asks advance() how many fixed steps to simulate,
+    then renders with alpha, the fraction of a step left over, so sprite
+    positions can be interpolated between the last two steps.
+    """
+    def __init__(self, step_rate, max_steps_per_frame=8):
+        self.step_time = 1.0 / step_rate
+        self.max_steps_per_frame = max_steps_per_frame  # Avoids a spiral of death after long hitches
+        self.accumulator = 0.0
+        self.last_time = None
+        self.dropped_steps = 0  # Steps skipped because the machine could not keep up
+
+    def reset(self):
+        self.accumulator = 0.0
+        self.last_time = None
+
+    def advance(self, now=None):
+        """Return the number of steps to simulate for this frame"""
+        if now is None:
+            now = time.perf_counter()
+        if self.last_time is None:
+            self.last_time = now
+        self.accumulator += now - self.last_time
+        self.last_time = now
+
+        steps = int(self.accumulator / self.step_time)
+        self.accumulator -= steps * self.step_time
+        if steps > self.max_steps_per_frame:
+            self.dropped_steps += steps - self.max_steps_per_frame
+            steps = self.max_steps_per_frame
+        return steps
+
+    @property
+    def alpha(self):
+        """How far the current frame is between the last step and the next"""
+        return min(1.0, self.accumulator / self.step_time)
+
+class SpriteInterpolator:
+    """
+    Draws pygame sprites between where they were at the last two fixed
+    steps, for games whose rules move sprite rects directly. remember() is
+    called before each step; place() moves each sprite onto a copy of its
+    rect part of the way there, and restore() puts the real rects back
+    before the rules run again.
+    """
+    def __init__(self):
+        self.previous = {}  # Sprite -> rect center before the last step
+
+    def remember(self, sprites):
+        self.previous = {sprite: sprite.rect.center for sprite in sprites}
+
+    def forget(self):
+        # After a reset nothing should slide from where it was before
+        self.previous = {}
+
+    def place(self, sprites, alpha):
+        """Move sprites alpha of the way through the last step; returns what restore() takes"""
+        moved = []
+        for sprite in sprites:
+            before = self.previous.get(sprite)
+            if before is None:
+                continue  # New this step
+            rect = sprite.rect
+            center = (round(before[0] + (rect.centerx - before[0]) * alpha),
+                      round(before[1] + (rect.centery - before[1]) * alpha))
+            if center != rect.center:
+                sprite.rect = rect.copy()
+                sprite.rect.center = center
+                moved.append((sprite, rect))
+        return moved
+
+    @staticmethod
+    def restore(moved):
+        for sprite, rect in moved:
+            sprite.rect = rect
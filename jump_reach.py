@@ -0,0 +1,205 @@
+import math
+
+# What a player can jump over, precomputed so the obstacle spawner can check
+# a pattern with table lookups instead of simulating trajectories.
+#
+# A jump is a fixed impulse under constant gravity, so for every clearance
+# altitude h (pixels above the ground, rounded up) the useful numbers depend
+# on h alone and are tabulated once per physics setup:
+#   rise[h]         time from pressing jump to first being h up
+#   single[h]       longest unbroken time at or above h with one jump
+#   double[h]       the same with the double jump pressed as late as possible
+#   fall_single[h]  time from last being h up to landing, single jump
+#   fall_double[h]  the same for the double jump
+# The tables are built by stepping the same discrete integration the players
+# use, so they match the game at its step rate rather than the ideal curve.
+# Times are in 60 FPS reference frames.
+#
+# Every obstacle that can reach the player becomes a window: the time span it
+# crosses the player's column and the altitude needed to pass over it. A
+# pattern of windows is possible when each group of windows too close to
+# land between can be cleared in one stretch of airtime.
+
+class JumpReach:
+    """Reachability tables for one player's jump physics"""
+    def __init__(self, jump_velocity, double_jump_velocity, gravity, ground_y, player_x, player_width,
+                 player_height, dt=1.0):
+        self.dt = dt
+        self.ground_y = ground_y
+        self.player_x = player_x
+        self.player_width = player_width
+        self.player_height = player_height
+
+        single_arc = self.arc(-jump_velocity, gravity)
+        apex = max(range(len(single_arc)), key=single_arc.__getitem__)
+        # Above a single jump's peak only a double jump from near the apex gets there
+        high_arc = single_arc[:apex + 1] + self.arc(-double_jump_velocity, gravity, single_arc[apex])
+        single_top = int(single_arc[apex])
+        self.max_altitude = int(max(high_arc))
+
+        self.rise = []
+        self.single = []
+        self.double = []
+        self.fall_single = []
+        self.fall_double = []
+        for h in range(self.max_altitude + 1):
+            if h <= single_top:
+                first, last = self.span(single_arc, h)
+                # Double jump on the last step at or above h, as late as it can be
+                tail = self.arc(-double_jump_velocity, gravity, single_arc[last])
+                _, tail_last = self.span(tail, h)
+                double_arc = single_arc[:last + 1] + tail
+                double_last = last + 1 + tail_last
+                self.single.append((last - first) * dt)
+                self.fall_single.append((len(single_arc) - 1 - last) * dt)
+            else:
+                double_arc = high_arc
+                first, double_last = self.span(high_arc, h)
+                self.single.append(-1.0)
+                self.fall_single.append(0.0)
+            self.rise.append((first + 1) * dt)
+            self.double.append((double_last - first) * dt)
+            self.fall_double.append((len(double_arc) - 1 - double_last) * dt)
+
+    def arc(self, velocity, gravity, altitude=0.0):
+        """Altitude after each step of a jump launched upward at velocity, ending on the ground"""
+        dt = self.dt
+        velocity = -velocity
+        altitudes = []
+        while True:
+            velocity += gravity * dt
+            altitude -= velocity * dt
+            if altitude <= 0:
+                altitudes.append(0.0)
+                return altitudes
+            altitudes.append(altitude)
+
+    def span(self, arc, h):
+        """First and last step of the arc at or above h (a single jump is one hump)"""
+        first = next(step for step, altitude in enumerate(arc) if altitude >= h)
+        last = len(arc) - 1 - next(step for step, altitude in enumerate(reversed(arc)) if altitude >= h)
+        return first, last
+
+    def index(self, altitude):
+        return max(0, math.ceil(altitude))
+
+    def clearable(self, altitude, duration):
+        """Whether some jump stays at or above altitude for duration"""
+        h = self.index(altitude)
+        return h <= self.max_altitude and duration <= self.double[h]
+
+    def airborne(self, altitude, duration):
+        """Time in the air before and after a window cleared as tightly as possible"""
+        h = min(self.index(altitude), self.max_altitude)
+        fall = self.fall_single[h] if duration <= self.single[h] else self.fall_double[h]
+        return self.rise[h], fall
+
+    def recovery(self, altitude, duration, next_altitude):
+        """Least gap between a cleared window and the next for a fresh jump in between"""
+        _, fall = self.airborne(altitude, duration)
+        # Land, spend one step on the ground, then rise to the next altitude
+        return fall + self.dt + self.rise[min(self.index(next_altitude), self.max_altitude)]
+
+    def window(self, left, width, top, bottom, travel, margin=None):
+        """
+        (start, end, altitude, optional) of a box crossing the player's
+        column at travel pixels per frame, or None if it never can hit.
+        optional windows can be run under instead of jumped.
+        """
+        if top >= self.ground_y or travel <= 0:
+            return None  # Below the player's feet
+        if margin is None:
+            margin = self.dt  # Positions are only checked once per step
+        end = (left + width - self.player_x) / travel + margin
+        if end <= 0:
+            return None  # Already past
+        start = (left - self.player_x - self.player_width) / travel - margin
+        return (start, end, self.ground_y - top, bottom <= self.ground_y - self.player_height)
+
+    def pattern_possible(self, windows):
+        """Whether a player can get past every window, from the ground"""
+        required = [w for w in windows if not w[3]]
+        # Something the player could run under still has to be jumped over
+        # when it passes during the airtime another obstacle forces
+        for optional in windows:
+            if optional[3]:
+                for start, end, altitude, _ in list(required):
+                    rise, fall = self.airborne(altitude, end - start)
+                    if optional[0] < end + fall and start - rise < optional[1]:
+                        required.append(optional)
+                        break
+        required.sort()
+
+        segment = None
+        for start, end, altitude, _ in required:
+            if segment is not None:
+                segment_start, segment_end, segment_altitude = segment
+                if start - segment_end >= self.recovery(segment_altitude, segment_end - segment_start, altitude):
+                    if not self.clearable(segment_altitude, segment_end - segment_start):
+                        return False
+                else:
+                    # Too close to land in between: one stretch of airtime has to cover both
+                    segment = (segment_start, max(end, segment_end), max(altitude, segment_altitude))
+                    continue
+            segment = (start, end, altitude)
+        return segment is None or self.clearable(segment[2], segment[1] - segment[0])
+
+    def sprite_window(self, obstacle):
+        """Window of a classic runner's obstacle sprite, bounded over its whole motion"""
+        rect = obstacle.rect
+        left, top, width, height = rect.x, rect.y, rect.width, rect.height
+        obstacle_type = getattr(obstacle, "obstacle_type", "standard")
+        if obstacle_type == "flying":
+            top = obstacle.original_y - obstacle.y_range
+            height += 2 * obstacle.y_range
+        elif obstacle_type == "boulder":
+            # Rotated copies of the square never exceed its diagonal
+            width = height = obstacle.original_image.get_width() * math.sqrt(2)
+            left = rect.centerx - width / 2
+            top = rect.centery - height / 2
+        return self.window(left, width, top, top + height, obstacle.speed)
+
+    def sprites_possible(self, obstacle, obstacles):
+        """Whether a new obstacle sprite leaves the pattern of obstacles passable"""
+        window = self.sprite_window(obstacle)
+        if window is None:
+            return True
+        windows = [window]
+        for other in obstacles:
+            window = self.sprite_window(other)
+            if window is not None:
+                windows.append(window)
+        return self.pattern_possible(windows)
+
+_reaches = {}
+
+def jump_reach(**physics):
+    """JumpReach for a physics setup, built once and shared"""
+    key = tuple(sorted(physics.items()))
+    reach = _reaches.get(key)
+    if reach is None:
+        reach = _reaches[key] = JumpReach(**physics)
+    return reach
+
+def sprite_reach(player, ground_y):
+    """JumpReach of a classic runner's player sprite (one step per frame)"""
+    rect = player.rect
+    return jump_reach(jump_velocity=player.jump_velocity, double_jump_velocity=player.double_jump_velocity,
+                      gravity=player.gravity, ground_y=ground_y, player_x=rect.x,
+                      player_width=rect.width, player_height=rect.height)
+
+if __name__ == "__main__":
+    import time
+
+    player = {"ground_y": 400, "player_x": 100, "player_width": 30, "player_height": 50}
+    for name, physics in (("3D (-18/-16, 120 Hz)", {"jump_velocity": -18, "double_jump_velocity": -16,
+                                                    "gravity": 0.8, "dt": 0.5}),
+                          ("Classic (-15/-13, 60 Hz)", {"jump_velocity": -15, "double_jump_velocity": -13,
+                                                        "gravity": 0.8})):
+        start_time = time.perf_counter()
+        reach = JumpReach(**physics, **player)
+        elapsed = time.perf_counter() - start_time
+        print(f"{name}: built in {elapsed * 1000:.1f} ms, reach {reach.max_altitude} px")
+        for h in (0, 30, 60, 100, 150, 200, reach.max_altitude):
+            print(f"  {h:3d} px: rise {reach.rise[h]:5.1f}  single {reach.single[h]:5.1f}  "
+                  f"double {reach.double[h]:5.1f}  fall {reach.fall_single[h]:5.1f}/{reach.fall_double[h]:5.1f}")
@@ -0,0 +1,111 @@
+import pygame
+from storm_simulation import SCREEN_WIDTH, SCREEN_HEIGHT, HORIZON_Y
+
+# Small pixel observations for training, drawn straight from simulation
+# state. Every entity is its hitbox filled with one gray level per layer;
+# there is no sky gradient, perspective grid, weather, text or display flip,
+# so a frame costs a few dozen fills on an 84x84 surface instead of the full
+# 1024x600 Game.draw.
+
+LAYERS = ("ground", "storm", "coins", "powerups", "obstacles", "player")
+
+# Gray level of each layer, spaced so a network can tell them apart
+SHADES = {
+    "background": 0,
+    "ground": 40,
+    "storm": 80,
+    "coins": 120,
+    "powerups": 160,
+    "obstacles": 255,
+    "player": 200,
+    "invincible": 230,
+}
+
+def grayscale_surface(size):
+    """8-bit surface whose pixel values are the gray levels themselves"""
+    surface = pygame.Surface(size, depth=8)
+    surface.set_palette([(shade, shade, shade) for shade in range(256)])
+    return surface
+
+class ObservationRenderer:
+    """Draws a Simulation into a small surface, one layer at a time"""
+    def __init__(self, size=(84, 84), layers=LAYERS):
+        unknown = set(layers) - set(LAYERS)
+        if unknown:
+            raise ValueError(f"Unknown layers: {', '.join(sorted(unknown))}")
+        self.size = size
+        self.layers = tuple(layer for layer in LAYERS if layer in layers)  # Fixed back-to-front order
+        self.scale_x = size[0] / SCREEN_WIDTH
+        self.scale_y = size[1] / SCREEN_HEIGHT
+
+    def new_surface(self):
+        return grayscale_surface(self.size)
+
+    def color(self, surface, name):
+        """Fill value for a layer: the gray level itself on 8-bit surfaces"""
+        shade = SHADES[name]
+        if surface.get_bitsize() == 8:
+            return shade
+        return (shade, shade, shade)
+
+    def scaled_rect(self, x, y, width, height):
+        # Never thinner than one pixel, so small coins stay visible
+        left = int(x * self.scale_x)
+        top = int(y * self.scale_y)
+        return (left, top, max(1, int((x + width) * self.scale_x) - left),
+                max(1, int((y + height) * self.scale_y) - top))
+
+    def render(self, simulation, surface=None):
+        if surface is None:
+            surface = self.new_surface()
+        surface.fill(self.color(surface, "background"))
+        width, height = surface.get_size()
+        for layer in self.layers:
+            if layer == "ground":
+                top = int(HORIZON_Y * self.scale_y)
+                surface.fill(self.color(surface, "ground"), (0, top, width, height - top))
+            elif layer == "storm":
+                # Storm front creeping in from the left edge
+                front = int(simulation.storm.progress / 100 * simulation.player.x * self.scale_x)
+                if front > 0:
+                    surface.fill(self.color(surface, "storm"), (0, 0, front, height))
+            elif layer == "player":
+                player = simulation.player
+                shade = "invincible" if player.invincible else "player"
+                surface.fill(self.color(surface, shade),
+                             self.scaled_rect(player.x, player.y, player.width, player.height))
+            else:
+                kind = layer[:-1]  # "coins" -> "coin"
+                color = self.color(surface, layer)
+                for entity in simulation.entities:
+                    if entity.kind == kind:
+                        surface.fill(color, self.scaled_rect(entity.x, entity.y, entity.width, entity.height))
+        return surface
+
+# Shared by render_env, which has to be a module-level function to reach
+# ProcessVectorEnv workers
+_renderers = {}
+
+def render_env(env, surface):
+    """ProcessVectorEnv renderer: draw a StormRunnerEnv into its shared slot"""
+    size = surface.get_size()
+    renderer = _renderers.get(size)
+    if renderer is None:
+        renderer = _renderers[size] = ObservationRenderer(size)
+    renderer.render(env.simulation, surface)
+
+if __name__ == "__main__":
+    import sys
+    import time
+    from storm_simulation import run_headless
+
+    frames = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    simulation = run_headless(3000, seed=0)
+    for size in ((84, 84), (128, 72)):
+        renderer = ObservationRenderer(size)
+        surface = renderer.new_surface()
+        start_time = time.perf_counter()
+        for _ in range(frames):
+            renderer.render(simulation, surface)
+        elapsed = time.perf_counter() - start_time
+        print(f"{size[0]}x{size[1]}: {elapsed / frames * 1e6:.0f} us/frame")
@@ -0,0 +1,95 @@
+import numpy as np
+import pygame
+from rng_streams import procedural
+
+# Textured, scrolling ground for the 3D mode, drawn one scanline at a time
+# in the style of mode 7. Every screen row below the horizon shows the ground
+# at one depth, so a per-row scale (the 3D runner passes the simulation's
+# depth_scale at each row's depth) fixes where each row samples a tiling
+# ground texture:
+#   u = (x - center) / scale + scroll    across the track, scrolling with the run
+#   v = DEPTH_TEXELS / scale             into the screen
+# The u offsets, the v rows and their flattened texture indices are worked
+# out once per size, so a frame is one integer add and one NumPy gather
+# written straight into the floor surface's pixels.
+
+TEXTURE_WIDTH = 200  # Four 50 px furrows, as far apart as the old perspective lines
+TEXTURE_HEIGHT = 64
+DEPTH_TEXELS = 40  # Texture rows per unit of depth
+GROUND_BROWN = (139, 69, 19)
+FURROW = (80, 60, 40)
+
+def ground_texture(width=TEXTURE_WIDTH, height=TEXTURE_HEIGHT):
+    """RGB array (width, height, 3) of speckled dirt with furrows along the depth"""
+    rng = np.random.default_rng(procedural.getrandbits(64))
+    texture = np.empty((width, height, 3), dtype=np.int16)
+    texture[:] = GROUND_BROWN
+    texture += rng.integers(-12, 13, size=(width, height, 1))  # Brightness speckle
+    stones = rng.random((width, height)) < 0.01
+    texture[stones] = (170, 110, 60)
+    for furrow in range(0, width, 50):
+        texture[furrow:furrow + 2] = FURROW  # Two texels wide, so no row skips over it
+    texture[:, ::16] -= 10  # Faint ridges across, bunching toward the horizon
+    return np.clip(texture, 0, 255).astype(np.uint8)
+
+class PerspectiveFloor:
+    """Draws the ground below horizon_y from a per-row scale table"""
+    def __init__(self, size, horizon_y, row_scales, texture=None):
+        width, height = size
+        self.horizon_y = horizon_y
+        self.surface = pygame.Surface((width, height - horizon_y), 0, 32)
+        display = pygame.display.get_surface()
+        if display is not None and display.get_bitsize() == 32:
+            self.surface = self.surface.convert()  # Same pixel format as the screen: the blit is a copy
+
+        if texture is None:
+            texture = ground_texture()
+        self.texture_width = texture.shape[0]
+        texture_height = texture.shape[1]
+        # Two copies side by side, so base + scroll never needs wrapping
+        mapped = pygame.surfarray.map_array(self.surface, texture)
+        self.texels = np.ascontiguousarray(np.concatenate((mapped, mapped))).ravel()
+
+        scales = np.asarray(row_scales[horizon_y:height], dtype=np.float64)
+        across = np.arange(width, dtype=np.float64) - width // 2
+        u = np.floor(across[:, None] / scales[None, :]).astype(np.intp) % self.texture_width
+        v = np.floor(DEPTH_TEXELS / scales).astype(np.intp) % texture_height
+        self.texture_height = texture_height
+        self.base = u * texture_height + v[None, :]  # Flat texel index of every floor pixel
+        self.index = np.empty_like(self.base)
+        self.shift = None  # Scroll the pixels were last drawn at
+
+    def draw(self, surface, scroll=0.0):
+        """Draw the floor scrolled by scroll texels at the nearest row"""
+        shift = int(scroll) % self.texture_width
+        if shift != self.shift:
+            np.add(self.base, shift * self.texture_height, out=self.index)
+            pixels = pygame.surfarray.pixels2d(self.surface)
+            pixels[...] = self.texels[self.index]
+            del pixels  # Unlocks the surface
+            self.shift = shift
+        surface.blit(self.surface, (0, self.horizon_y))
+
+if __name__ == "__main__":
+    import os
+    import sys
+    import time
+
+    os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+    from storm_simulation import depth_scale
+
+    width, height, horizon_y = 1024, 600, 350
+    pygame.display.set_mode((width, height))
+    rows = [0.0] * horizon_y + [depth_scale((y - horizon_y) / (height - horizon_y)) for y in range(horizon_y, height)]
+
+    start_time = time.perf_counter()
+    floor = PerspectiveFloor((width, height), horizon_y, rows)
+    print(f"Tables built in {(time.perf_counter() - start_time) * 1000:.1f} ms")
+
+    frames = int(sys.argv[1]) if len(sys.argv) > 1 else 300
+    screen = pygame.display.get_surface()
+    start_time = time.perf_counter()
+    for frame in range(frames):
+        floor.draw(screen, frame * 3.0)
+    elapsed = time.perf_counter() - start_time
+    print(f"{width}x{height - horizon_y} floor: {elapsed / frames * 1000:.2f} ms/frame")
@@ -2,11 +2,22 @@ import pygame
 import os
 import math
 from sprite_utils import Animation, load_sprite_sheet, load_image
+from rng_streams import cosmetic
+from scheduler import Scheduler
 
 class EnhancedPlayer(pygame.sprite.Sprite):
-    def __init__(self, screen_height, ground_height):
+    # Jump physics per frame, read by sprite_reach() to keep spawns clearable
+    jump_velocity = -15
+    double_jump_velocity = -13
+    gravity = 0.8
+
+    def __init__(self, screen_height, ground_height, scheduler=None, assets=None):
         super().__init__()
         
+        # Countdowns are scheduled; update() advances the clock unless the game shares its own
+        self.scheduler = scheduler if scheduler is not None else Scheduler()
+        self.owns_scheduler = scheduler is None
+        
         # Store reference values
         self.screen_height = screen_height
         self.ground_height = ground_height
@@ -16,7 +27,7 @@ class EnhancedPlayer(pygame.sprite.Sprite):
         self.jumping = False
         self.double_jump_available = True
         self.invincible = False
-        self.invincible_timer = 0
+        self.invincible_end = None  # Scheduled end of the invincibility
         self.lives = 3
         self.coins = 0
         self.score = 0
@@ -25,8 +36,10 @@ class EnhancedPlayer(pygame.sprite.Sprite):
         self.state = "idle"  # idle, run, jump, fall, hurt
         self.facing_right = True
         
-        # Load animations
-        self.animations = self.load_player_animations()
+        # Load animations and sounds, unless prepared ahead of time by player_assets()
+        if assets is None:
+            assets = self.load_player_animations(), self.load_player_sounds()
+        self.animations, (self.jump_sound, self.hurt_sound) = assets
         
         # Set initial image and rect
         self.image = self.animations["idle"].get_current_frame()
@@ -34,19 +47,23 @@ class EnhancedPlayer(pygame.sprite.Sprite):
         self.rect.bottomleft = (100, screen_height - ground_height)
         
         # Particle effects for running
-        self.dust_timer = 0
+        self.dust_timer = None  # Repeating dust while running
         self.dust_particles = []
         
-        # Jump and hurt sound effects
-        self.jump_sound = None
-        self.hurt_sound = None
+    @staticmethod
+    def load_player_sounds():
+        """Jump and hurt sound effects, None where they could not be loaded"""
+        jump_sound = None
+        hurt_sound = None
         try:
-            self.jump_sound = pygame.mixer.Sound(os.path.join('assets', 'sounds', 'jump.wav'))
-            self.hurt_sound = pygame.mixer.Sound(os.path.join('assets', 'sounds', 'hurt.wav'))
+            jump_sound = pygame.mixer.Sound(os.path.join('assets', 'sounds', 'jump.wav'))
+            hurt_sound = pygame.mixer.Sound(os.path.join('assets', 'sounds', 'hurt.wav'))
         except:
             print("Could not load player sound effects")
+        return jump_sound, hurt_sound
     
-    def load_player_animations(self):
+    @staticmethod
+    def load_player_animations():
         """Load all player animations or create placeholders"""
         animations = {}
         
@@ -70,15 +87,15 @@ class EnhancedPlayer(pygame.sprite.Sprite):
                 animations["hurt"] = Animation([run_frames[0]], 100)  # Use first run frame tinted red for hurt
             else:
                 # Create placeholder animations with colored rectangles
-                run_frames = self.create_placeholder_frames("run", 6)
-                idle_frames = self.create_placeholder_frames("idle", 4)
-                jump_frames = self.create_placeholder_frames("jump", 2)
+                run_frames = EnhancedPlayer.create_placeholder_frames("run", 6)
+                idle_frames = EnhancedPlayer.create_placeholder_frames("idle", 4)
+                jump_frames = EnhancedPlayer.create_placeholder_frames("jump", 2)
                 
                 animations["run"] = Animation(run_frames, 100)
                 animations["idle"] = Animation(idle_frames, 150)
                 animations["jump"] = Animation(jump_frames, 100, loop=False)
                 animations["fall"] = Animation([jump_frames[-1]], 100)
-                animations["hurt"] = Animation([self.create_placeholder_frames("hurt", 1)[0]], 100)
+                animations["hurt"] = Animation([EnhancedPlayer.create_placeholder_frames("hurt", 1)[0]], 100)
         except Exception as e:
             print(f"Error loading player animations: {e}")
             # Create basic placeholder if everything fails
@@ -92,7 +109,8 @@ class EnhancedPlayer(pygame.sprite.Sprite):
             
         return animations
     
-    def create_placeholder_frames(self, animation_type, num_frames):
+    @staticmethod
+    def create_placeholder_frames(animation_type, num_frames):
         """Create placeholder animation frames with different colors based on type"""
         frames = []
         
@@ -151,9 +169,17 @@ class EnhancedPlayer(pygame.sprite.Sprite):
             
         return frames
     
+    @property
+    def invincible_timer(self):
+        """Frames of invincibility left"""
+        return self.scheduler.remaining(self.invincible_end)
+    
     def update(self):
+        if self.owns_scheduler:
+            self.scheduler.advance()
+        
         # Apply gravity
-        self.velocity_y += 0.8
+        self.velocity_y += self.gravity
         self.rect.y += self.velocity_y
         
         # Check if on ground
@@ -167,12 +193,6 @@ class EnhancedPlayer(pygame.sprite.Sprite):
             if self.state == "fall":
                 self.create_dust_particles(5)
         
-        # Update invincibility timer
-        if self.invincible:
-            self.invincible_timer -= 1
-            if self.invincible_timer <= 0:
-                self.invincible = False
-        
         # Update animation state
         if self.invincible and self.invincible_timer > 0:
             new_state = "hurt"
@@ -182,10 +202,8 @@ class EnhancedPlayer(pygame.sprite.Sprite):
             new_state = "fall"
         elif self.velocity_y == 0 and not self.jumping:
             # Only create dust while running on ground
-            self.dust_timer += 1
-            if self.dust_timer >= 10:  # Create dust every 10 frames
-                self.create_dust_particles(1)
-                self.dust_timer = 0
+            if self.dust_timer is None:
+                self.dust_timer = self.scheduler.schedule(10, self.run_dust)
             new_state = "run"
         else:
             new_state = "idle"
@@ -217,7 +235,7 @@ class EnhancedPlayer(pygame.sprite.Sprite):
     
     def jump(self):
         if not self.jumping:
-            self.velocity_y = -15
+            self.velocity_y = self.jump_velocity
             self.jumping = True
             self.state = "jump"
             self.animations[self.state].reset()
@@ -228,7 +246,7 @@ class EnhancedPlayer(pygame.sprite.Sprite):
                 self.jump_sound.play()
                 
         elif self.double_jump_available:
-            self.velocity_y = -13
+            self.velocity_y = self.double_jump_velocity
             self.double_jump_available = False
             self.state = "jump"
             self.animations[self.state].reset()
@@ -240,9 +258,22 @@ class EnhancedPlayer(pygame.sprite.Sprite):
                 self.jump_sound.play()
                 self.jump_sound.set_volume(1.0)
     
+    def run_dust(self):
+        # Create dust every 10 frames while still running
+        if self.state == "run":
+            self.create_dust_particles(1)
+            self.dust_timer = self.scheduler.schedule(10, self.run_dust)
+        else:
+            self.dust_timer = None
+    
     def make_invincible(self, duration=180):
         self.invincible = True
-        self.invincible_timer = duration
+        if self.invincible_end is not None:
+            self.invincible_end.cancel()
+        self.invincible_end = self.scheduler.schedule(duration, self.end_invincibility)
+    
+    def end_invincibility(self):
+        self.invincible = False
     
     def lose_life(self):
         if not self.invincible:
@@ -260,12 +291,12 @@ class EnhancedPlayer(pygame.sprite.Sprite):
         """Create dust particles at player's feet"""
         for _ in range(count):
             # Particle properties
-            size = random.randint(3, 6)
-            pos_x = self.rect.midbottom[0] + random.randint(-10, 10)
-            pos_y = self.rect.midbottom[1] - random.randint(0, 5)
-            velocity_x = random.uniform(-0.5, 0.5)
-            velocity_y = random.uniform(-1.5, -0.5)
-            lifetime = random.randint(20, 40)
+            size = cosmetic.randint(3, 6)
+            pos_x = self.rect.midbottom[0] + cosmetic.randint(-10, 10)
+            pos_y = self.rect.midbottom[1] - cosmetic.randint(0, 5)
+            velocity_x = cosmetic.uniform(-0.5, 0.5)
+            velocity_y = cosmetic.uniform(-1.5, -0.5)
+            lifetime = cosmetic.randint(20, 40)
             
             # Add to particle list
             self.dust_particles.append({
@@ -304,3 +335,12 @@ class EnhancedPlayer(pygame.sprite.Sprite):
                 (int(particle['pos'][0]), int(particle['pos'][1])),
                 particle['size']
             )
+
+def player_assets():
+    """
+    Job for FrameJobs preparing an EnhancedPlayer's animations, then its
+    sounds, so a restart does not load them in the middle of a frame
+    """
+    animations = EnhancedPlayer.load_player_animations()
+    yield
+    return animations, EnhancedPlayer.load_player_sounds()
@@ -0,0 +1,96 @@
+import bisect
+import itertools
+import pygame
+
+# Sprites in painter's order, kept sorted as they come and go instead of
+# sorted afresh every frame. A sprite is inserted at its place (binary
+# search) when added and taken out when removed, which includes kill(), so
+# the queue follows the spawn and despawn of the simulation's entities.
+#
+# Most entities keep their sort key for their whole life: a power-up or a
+# standing obstacle only scrolls sideways. Sprites whose key can change set
+# depth_changes = True, and only they are looked at by resort(); one that has
+# moved is taken out and put back in at its new place. Equal keys stay in the
+# order the sprites were added, as a stable sort of the group would give.
+
+def bottom(sprite):
+    """Default sort key: sprites lower on the screen are drawn over higher ones"""
+    return sprite.rect.bottom
+
+class RenderQueue(pygame.sprite.Group):
+    """Sprite group that iterates and draws in depth order"""
+    def __init__(self, *sprites, key=bottom):
+        self.key = key
+        self.entries = []  # (key, order, sprite), sorted
+        self.entry_of = {}
+        self.moving = set()  # Sprites whose key may change from frame to frame
+        self.order = itertools.count()
+        super().__init__(*sprites)
+
+    def add_internal(self, sprite, layer=None):
+        super().add_internal(sprite, layer)
+        entry = (self.key(sprite), next(self.order), sprite)
+        bisect.insort(self.entries, entry)
+        self.entry_of[sprite] = entry
+        if getattr(sprite, "depth_changes", False):
+            self.moving.add(sprite)
+
+    def remove_internal(self, sprite):
+        super().remove_internal(sprite)
+        entry = self.entry_of.pop(sprite)
+        del self.entries[bisect.bisect_left(self.entries, entry)]
+        self.moving.discard(sprite)
+
+    def resort(self):
+        """Move the sprites whose key changed since the last call to their new place"""
+        entries = self.entries
+        for sprite in self.moving:
+            entry = self.entry_of[sprite]
+            key = self.key(sprite)
+            if key != entry[0]:
+                del entries[bisect.bisect_left(entries, entry)]
+                entry = (key, entry[1], sprite)
+                bisect.insort(entries, entry)
+                self.entry_of[sprite] = entry
+
+    def sprites(self):
+        return [entry[2] for entry in self.entries]
+
+if __name__ == "__main__":
+    import random
+    import sys
+    import time
+
+    # A crowded screen where a few sprites bob up and down each frame
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 500
+    frames = 1000
+    rng = random.Random(1)
+    sprites = []
+    for index in range(count):
+        sprite = pygame.sprite.Sprite()
+        sprite.rect = pygame.Rect(0, rng.randint(350, 600), 20, 20)
+        sprite.depth_changes = index % 20 == 0
+        sprites.append(sprite)
+    movers = [sprite for sprite in sprites if sprite.depth_changes]
+
+    group = pygame.sprite.Group(sprites)
+    start_time = time.perf_counter()
+    for frame in range(frames):
+        for sprite in movers:
+            sprite.rect.y += rng.randint(-3, 3)
+        order = sorted(group.sprites(), key=bottom)
+    sorted_time = time.perf_counter() - start_time
+
+    queue = RenderQueue(sprites)
+    start_time = time.perf_counter()
+    for frame in range(frames):
+        for sprite in movers:
+            sprite.rect.y += rng.randint(-3, 3)
+        queue.resort()
+        order = queue.sprites()
+    queue_time = time.perf_counter() - start_time
+
+    assert order == sorted(group.sprites(), key=bottom)
+    print(f"{count} sprites, {len(movers)} moving")
+    print(f"sorted() every frame: {sorted_time / frames * 1000:.3f} ms/frame")
+    print(f"RenderQueue:          {queue_time / frames * 1000:.3f} ms/frame")
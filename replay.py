@@ -0,0 +1,206 @@
+import bisect
+import pickle
+import struct
+import zlib
+from storm_simulation import (Simulation, STEP_RATE, INPUT_JUMP, INPUT_PAUSE,
+                              INPUT_RESTART)
+
+# A recording is a session seed plus the inputs that were pressed, each
+# stamped with the simulation tick it was applied before. That is all it
+# takes to replay a whole run, since the rules are deterministic.
+#
+# File layout (little endian):
+#   magic "SRR1", step rate (u16), length in ticks (u32), seed (u16 length + utf-8)
+#   then one varint per input: (ticks since previous input << 2) | input code
+
+MAGIC = b"SRR1"
+INPUT_NAMES = {INPUT_JUMP: "jump", INPUT_PAUSE: "pause", INPUT_RESTART: "restart"}
+
+def write_varint(out, value):
+    while True:
+        byte = value & 0x7F
+        value >>= 7
+        if value:
+            out.append(byte | 0x80)
+        else:
+            out.append(byte)
+            return
+
+def read_varint(data, pos):
+    value = 0
+    shift = 0
+    while True:
+        byte = data[pos]
+        pos += 1
+        value |= (byte & 0x7F) << shift
+        if not byte & 0x80:
+            return value, pos
+        shift += 7
+
+class Recording:
+    """Seed, step rate and the (tick, input) stream of one session"""
+    def __init__(self, seed, step_rate=STEP_RATE, events=None, length=0):
+        # Stored as text: RandomStreams derives the same streams from str(seed)
+        self.seed = str(seed)
+        self.step_rate = step_rate
+        self.events = events if events is not None else []
+        self.length = length  # Ticks covered by the recording
+
+    def add(self, tick, code):
+        self.events.append((tick, code))
+        self.length = max(self.length, tick)
+
+    def to_bytes(self):
+        seed = self.seed.encode("utf-8")
+        out = bytearray(MAGIC)
+        out += struct.pack("<HIH", self.step_rate, self.length, len(seed))
+        out += seed
+        previous_tick = 0
+        for tick, code in self.events:
+            write_varint(out, ((tick - previous_tick) << 2) | code)
+            previous_tick = tick
+        return bytes(out)
+
+    @classmethod
+    def from_bytes(cls, data):
+        if data[:4] != MAGIC:
+            raise ValueError("Not a Storm Runner recording")
+        step_rate, length, seed_length = struct.unpack_from("<HIH", data, 4)
+        pos = 4 + struct.calcsize("<HIH")
+        seed = data[pos:pos + seed_length].decode("utf-8")
+        pos += seed_length
+        events = []
+        tick = 0
+        while pos < len(data):
+            value, pos = read_varint(data, pos)
+            tick += value >> 2
+            events.append((tick, value & 3))
+        return cls(seed, step_rate, events, length)
+
+    def save(self, path):
+        with open(path, "wb") as f:
+            f.write(self.to_bytes())
+
+    @classmethod
+    def load(cls, path):
+        with open(path, "rb") as f:
+            return cls.from_bytes(f.read())
+
+class InputRecorder:
+    """Simulation listener that records every input it applies"""
+    def __init__(self, simulation):
+        self.simulation = simulation
+        self.recording = Recording(simulation.streams.session_seed, simulation.step_rate)
+        simulation.add_listener(self.on_simulation_event)
+
+    def on_simulation_event(self, event, data=None):
+        if event == "input":
+            self.recording.add(self.simulation.tick, data)
+
+    def finish(self):
+        """Close the recording at the current tick and return it"""
+        self.recording.length = self.simulation.tick
+        return self.recording
+
+class InputPlayback:
+    """Feeds recorded inputs back into a simulation at their original ticks"""
+    def __init__(self, recording, index=0):
+        self.recording = recording
+        self.index = index  # Next event to apply
+
+    def apply_due(self, simulation):
+        events = self.recording.events
+        while self.index < len(events) and events[self.index][0] <= simulation.tick:
+            simulation.apply_input(events[self.index][1])
+            self.index += 1
+
+    def finished(self, simulation):
+        return simulation.tick >= self.recording.length
+
+def new_simulation(recording):
+    """A fresh simulation seeded like the recorded one"""
+    return Simulation(recording.seed, recording.step_rate)
+
+def play_headless(recording, simulation=None):
+    """Replay a whole recording without rendering and return the final simulation"""
+    if simulation is None:
+        simulation = new_simulation(recording)
+    playback = InputPlayback(recording)
+    while not playback.finished(simulation):
+        playback.apply_due(simulation)
+        simulation.step()
+    return simulation
+
+# Keyframes every 10 seconds of simulated time by default
+KEYFRAME_INTERVAL = STEP_RATE * 10
+
+class KeyframeTimeline:
+    """
+    Periodic compressed snapshots of a recorded run. Seeking restores the
+    nearest keyframe at or before the target and re-simulates only the
+    ticks after it, so scrubbing a long session costs at most one interval.
+    """
+    def __init__(self, recording, interval=KEYFRAME_INTERVAL):
+        self.recording = recording
+        self.interval = interval
+        self.event_ticks = [tick for tick, _ in recording.events]
+        self.ticks = []  # Tick of each keyframe, ascending
+        self.keyframes = []  # zlib-compressed pickled snapshots
+
+    def capture(self, simulation):
+        data = pickle.dumps(simulation.snapshot(), pickle.HIGHEST_PROTOCOL)
+        self.ticks.append(simulation.tick)
+        self.keyframes.append(zlib.compress(data))
+
+    def build(self):
+        """Replay the whole recording once, taking a keyframe every interval ticks"""
+        self.ticks = []
+        self.keyframes = []
+        simulation = new_simulation(self.recording)
+        playback = InputPlayback(self.recording)
+        while True:
+            if simulation.tick % self.interval == 0:
+                self.capture(simulation)
+            if playback.finished(simulation):
+                break
+            playback.apply_due(simulation)
+            simulation.step()
+        return self
+
+    def size(self):
+        """Bytes held by all keyframes"""
+        return sum(len(keyframe) for keyframe in self.keyframes)
+
+    def seek(self, tick, simulation=None):
+        """
+        Put a simulation at the given tick and return the playback that
+        continues from there. Reusing the caller's simulation keeps its
+        listeners (renderers, recorders) attached.
+        """
+        if simulation is None:
+            simulation = new_simulation(self.recording)
+        tick = max(0, min(tick, self.recording.length))
+        index = bisect.bisect_right(self.ticks, tick) - 1
+        if index >= 0:
+            simulation.restore(pickle.loads(zlib.decompress(self.keyframes[index])))
+        elif simulation.tick > tick:
+            raise ValueError("No keyframe before tick %d" % tick)
+
+        # Inputs stamped before the keyframe tick were applied already
+        playback = InputPlayback(self.recording, bisect.bisect_left(self.event_ticks, simulation.tick))
+        while simulation.tick < tick:
+            playback.apply_due(simulation)
+            simulation.step()
+        return simulation, playback
+
+if __name__ == "__main__":
+    import sys
+    import time
+
+    recording = Recording.load(sys.argv[1])
+    start_time = time.perf_counter()
+    simulation = play_headless(recording)
+    elapsed = time.perf_counter() - start_time
+    print(f"Replayed {recording.length} ticks ({len(recording.events)} inputs) in {elapsed:.2f}s "
+          f"({recording.length / max(elapsed, 1e-9):.0f} ticks/s)")
+    print(f"Score: {simulation.score} | High score: {simulation.high_score} | State: {simulation.game_state}")
@@ -0,0 +1,48 @@
+import hashlib
+import os
+import random
+
+# Independent random streams, so that a cosmetic change (one more raindrop,
+# a different quality setting) never shifts the obstacle sequence.
+#   gameplay   - anything that affects collisions or score: spawns, sizes, depths
+#   cosmetic   - per-frame visual noise: rain, lightning, dust, grass jitter
+#   procedural - generated scenery: textures, ground details, fog, backgrounds
+STREAM_NAMES = ("gameplay", "cosmetic", "procedural")
+
+def derive_seed(session_seed, name):
+    """Stable 64-bit seed for one named stream of a session"""
+    digest = hashlib.sha256(f"{session_seed}:{name}".encode()).digest()
+    return int.from_bytes(digest[:8], "little")
+
+class RandomStreams:
+    """One random.Random per subsystem, all derived from a single session seed"""
+    def __init__(self, seed=None):
+        self.gameplay = random.Random()
+        self.cosmetic = random.Random()
+        self.procedural = random.Random()
+        self.seed(seed)
+
+    def seed(self, seed=None):
+        """Reseed every stream in place; None picks a fresh random session seed"""
+        if seed is None:
+            seed = random.SystemRandom().getrandbits(63)
+        self.session_seed = seed
+        for name in STREAM_NAMES:
+            getattr(self, name).seed(derive_seed(seed, name))
+
+def seed_from_environment():
+    """Session seed from the STORM_SEED environment variable, if set"""
+    value = os.environ.get("STORM_SEED")
+    if not value:
+        return None
+    return int(value) if value.lstrip("-").isdigit() else value
+
+# Streams shared by the 2D runners, weather and environment modules.
+# seed_session() reseeds them in place, so these aliases stay valid.
+session = RandomStreams(seed_from_environment())
+gameplay = session.gameplay
+cosmetic = session.cosmetic
+procedural = session.procedural
+
+def seed_session(seed):
+    session.seed(seed)
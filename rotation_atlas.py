@@ -0,0 +1,87 @@
+import pygame
+
+# Spinning sprites (the rolling boulders) used to rotate their image afresh
+# every frame, a new surface per sprite per frame. An atlas holds the image
+# rotated to a fixed number of angles instead, each rotated the first time
+# it is shown, and sprites sharing an image share its atlas, so after the
+# first few turns a spinning sprite only picks a frame. Each frame keeps
+# the rect it fills, centred on the origin, so placing a frame is a move of
+# that rect rather than measuring the new surface.
+
+ROTATION_STEPS = 64  # Frames per full turn, 5.6 degrees apart
+
+class RotationAtlas:
+    """An image rotated to steps evenly spaced angles"""
+    def __init__(self, image, steps=ROTATION_STEPS):
+        self.image = image
+        self.steps = steps
+        self.frames = [None] * steps
+        self.rects = [None] * steps
+
+    def index(self, angle):
+        """Frame nearest to angle, in degrees counterclockwise"""
+        return round(angle * self.steps / 360) % self.steps
+
+    def frame(self, angle):
+        index = self.index(angle)
+        image = self.frames[index]
+        if image is None:
+            image = self.frames[index] = pygame.transform.rotate(self.image, index * 360 / self.steps)
+            rect = image.get_rect()
+            rect.center = (0, 0)
+            self.rects[index] = rect
+        return image
+
+    def place(self, angle, center):
+        """(frame, rect) of angle with the rect centred on center"""
+        image = self.frame(angle)
+        return image, self.rects[self.index(angle)].move(center)
+
+# Atlases by the look of the image, shared by every sprite drawing it. Keys
+# start with the module or runner using them, so the looks of two runners in
+# one process never mix. The least recently used is dropped once there are
+# ATLAS_CACHE_SIZE; sprites holding it keep it until they go.
+ATLAS_CACHE_SIZE = 256
+atlases = {}
+
+def rotation_atlas(key, draw, steps=ROTATION_STEPS):
+    """The atlas for key, its image made by draw() the first time it is needed"""
+    key = (key, steps)
+    atlas = atlases.pop(key, None)
+    if atlas is None:
+        if len(atlases) >= ATLAS_CACHE_SIZE:
+            del atlases[next(iter(atlases))]  # Least recently used
+        atlas = RotationAtlas(draw(), steps)
+    atlases[key] = atlas  # Most recently used last
+    return atlas
+
+if __name__ == "__main__":
+    import os
+    import sys
+    import time
+
+    os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+    pygame.display.set_mode((1, 1))
+
+    # Ten boulders spinning for a while, as the runners draw them
+    frames = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    image = pygame.Surface((50, 50), pygame.SRCALPHA)
+    pygame.draw.polygon(image, (128, 0, 128), [(25, 0), (0, 50), (50, 50)])
+    speeds = [2 + index * 0.3 for index in range(10)]
+
+    start_time = time.perf_counter()
+    for frame in range(frames):
+        for speed in speeds:
+            rotated = pygame.transform.rotate(image, frame * speed % 360)
+            rect = rotated.get_rect(center=(100, 100))
+    rotate_time = time.perf_counter() - start_time
+
+    atlas = rotation_atlas("boulder", lambda: image)
+    start_time = time.perf_counter()
+    for frame in range(frames):
+        for speed in speeds:
+            rotated, rect = atlas.place(frame * speed % 360, (100, 100))
+    atlas_time = time.perf_counter() - start_time
+
+    print(f"rotate every frame: {rotate_time / frames * 1000:.3f} ms/frame")
+    print(f"atlas:              {atlas_time / frames * 1000:.3f} ms/frame")
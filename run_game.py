@@ -1,6 +1,7 @@
 import pygame
 import sys
 import os
+from scheduler import Scheduler
 
 # Initialize pygame
 pygame.init()
@@ -87,8 +88,9 @@ class Game:
         self.player = Player()
         self.all_sprites.add(self.player)
         
-        # Obstacle timer
-        self.obstacle_timer = 0
+        # Obstacles spawn on a schedule
+        self.scheduler = Scheduler()
+        self.scheduler.schedule(60, self.spawn_obstacle)
         
     def handle_events(self):
         for event in pygame.event.get():
@@ -101,18 +103,18 @@ class Game:
                 elif event.key == pygame.K_SPACE:
                     self.player.jump()
     
+    def spawn_obstacle(self):
+        obstacle = Obstacle()
+        self.obstacles.add(obstacle)
+        self.all_sprites.add(obstacle)
+        self.scheduler.schedule(60, self.spawn_obstacle)
+    
     def update(self):
+        self.scheduler.advance()
+        
         # Update all sprites
         self.all_sprites.update()
         
-        # Spawn obstacles
-        self.obstacle_timer += 1
-        if self.obstacle_timer >= 60:
-            obstacle = Obstacle()
-            self.obstacles.add(obstacle)
-            self.all_sprites.add(obstacle)
-            self.obstacle_timer = 0
-            
         # Check for collisions
         hits = pygame.sprite.spritecollide(self.player, self.obstacles, False)
         if hits:
@@ -0,0 +1,110 @@
+import heapq
+import itertools
+
+# Frame-counted countdowns as scheduled callbacks. Instead of every system
+# decrementing its own timers each frame, they ask a shared Scheduler to
+# call them back at a future tick. A binary heap keeps the pending timers
+# ordered by due tick, so advancing costs one comparison when nothing is
+# due and O(log n) per timer that fires, however many are waiting.
+#
+# The clock only moves when advance() is called, so a game that skips its
+# update while paused freezes every countdown with it; pause() does the same
+# for owners that keep calling advance().
+
+class Timer:
+    """Handle to one scheduled callback"""
+    __slots__ = ("due", "callback", "args", "cancelled")
+
+    def __init__(self, due, callback, args):
+        self.due = due
+        self.callback = callback
+        self.args = args
+        self.cancelled = False
+
+    def cancel(self):
+        # Left in the heap and skipped when it comes up
+        self.cancelled = True
+
+class Scheduler:
+    """Calls callbacks when the tick count reaches their due tick"""
+    def __init__(self, now=0):
+        self.now = now
+        self.paused = False
+        self.queue = []  # (due, order, timer)
+        self.order = itertools.count()  # Same-tick timers fire in scheduling order
+
+    def schedule(self, delay, callback, *args):
+        """Call callback(*args) delay ticks from now (at the earliest on the next advance)"""
+        return self.schedule_at(self.now + max(1, delay), callback, *args)
+
+    def schedule_at(self, tick, callback, *args):
+        timer = Timer(tick, callback, args)
+        heapq.heappush(self.queue, (tick, next(self.order), timer))
+        return timer
+
+    def remaining(self, timer):
+        """Ticks until timer fires, 0 once it has fired or been cancelled"""
+        if timer is None or timer.cancelled:
+            return 0
+        return max(0, timer.due - self.now)
+
+    def advance(self, ticks=1):
+        """Move the clock on, firing everything that comes due in order"""
+        if self.paused:
+            return
+        target = self.now + ticks
+        queue = self.queue
+        while queue and queue[0][0] <= target:
+            due, _, timer = heapq.heappop(queue)
+            if timer.cancelled:
+                continue
+            self.now = due
+            timer.cancelled = True  # Fired; remaining() now reports 0
+            timer.callback(*timer.args)
+        self.now = target
+
+    def pause(self):
+        self.paused = True
+
+    def resume(self):
+        self.paused = False
+
+    def clear(self):
+        for _, _, timer in self.queue:
+            timer.cancelled = True
+        self.queue.clear()
+
+    def __len__(self):
+        return sum(1 for _, _, timer in self.queue if not timer.cancelled)
+
+if __name__ == "__main__":
+    import sys
+    import time
+
+    # Many long countdowns with few firing per tick, as in a running game
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 10000
+    ticks = int(sys.argv[2]) if len(sys.argv) > 2 else 10000
+    scheduler = Scheduler()
+    fired = [0]
+
+    def repeat(period):
+        fired[0] += 1
+        scheduler.schedule(period, repeat, period)
+
+    for n in range(count):
+        scheduler.schedule(n % 997 + 1, repeat, 300 + n % 700)
+    start_time = time.perf_counter()
+    for _ in range(ticks):
+        scheduler.advance()
+    elapsed = time.perf_counter() - start_time
+    print(f"{count} timers over {ticks} ticks: {fired[0]} fired, {elapsed / ticks * 1e6:.1f} us/tick")
+
+    countdowns = [n % 997 + 1 for n in range(count)]
+    start_time = time.perf_counter()
+    for _ in range(ticks // 10):
+        for n in range(count):
+            countdowns[n] -= 1
+            if countdowns[n] <= 0:
+                countdowns[n] = 300 + n % 700
+    elapsed = time.perf_counter() - start_time
+    print(f"Per-frame countdowns for comparison: {elapsed / (ticks // 10) * 1e6:.1f} us/tick")
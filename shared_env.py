@@ -0,0 +1,191 @@
+import multiprocessing
+from multiprocessing import shared_memory
+import numpy as np
+from storm_simulation import STEP_RATE, DEFAULT_RULES
+from storm_env import StormRunnerEnv, ACTION_NAMES, OBSERVATION_SIZE
+
+# Environments spread over worker processes, with observations passed
+# through shared memory instead of pipes. Every environment owns one slot of
+# a shared block; its worker writes the observation straight into the slot,
+# and the learner reads the whole block as a NumPy view. Only actions,
+# rewards, done flags and scores travel over the pipes.
+#
+# Pixel observations work the same way: each slot is also wrapped in a
+# pygame surface with pygame.image.frombuffer, so a renderer drawing into
+# that surface writes the learner's array directly.
+
+PIXEL_FORMATS = {"P": 1, "RGBX": 4}  # Bytes per pixel of the supported surface formats
+
+class SharedArray:
+    """A NumPy array living in a multiprocessing.shared_memory block"""
+    def __init__(self, shape, dtype, name=None):
+        self.shape = tuple(shape)
+        self.dtype = np.dtype(dtype)
+        size = max(1, int(np.prod(self.shape)) * self.dtype.itemsize)
+        self.owner = name is None
+        self.memory = shared_memory.SharedMemory(name=name, create=self.owner, size=size)
+        self.array = np.ndarray(self.shape, self.dtype, buffer=self.memory.buf)
+
+    @property
+    def name(self):
+        return self.memory.name
+
+    def spec(self):
+        """What a worker needs to attach to the same block"""
+        return self.shape, self.dtype.str, self.name
+
+    @classmethod
+    def attach(cls, spec):
+        shape, dtype, name = spec
+        return cls(shape, dtype, name)
+
+    def close(self):
+        self.array = None  # Views must go before the buffer can be released
+        self.memory.close()
+        if self.owner:
+            self.memory.unlink()
+
+def slot_surface(pixels, index, pixel_format):
+    """A pygame surface drawing straight into one environment's pixel slot"""
+    import pygame
+
+    view = pixels.array[index]
+    height, width = view.shape[:2]
+    surface = pygame.image.frombuffer(view, (width, height), pixel_format)
+    if pixel_format == "P":
+        surface.set_palette([(shade, shade, shade) for shade in range(256)])  # Grayscale
+    return surface
+
+def env_worker(conn, slots, observation_spec, pixel_spec, pixel_format, renderer, env_options):
+    """Worker process: run the environments in slots, writing into shared memory"""
+    observations = SharedArray.attach(observation_spec)
+    pixels = SharedArray.attach(pixel_spec) if pixel_spec else None
+    envs = [StormRunnerEnv(**env_options) for _ in slots]
+    surfaces = [slot_surface(pixels, slot, pixel_format) for slot in slots] if pixels else []
+
+    def publish(n, observation):
+        observations.array[slots[n]] = observation
+        if pixels:
+            renderer(envs[n], surfaces[n])
+
+    try:
+        while True:
+            command, data = conn.recv()
+            if command == "reset":
+                for n, env in enumerate(envs):
+                    publish(n, env.reset(None if data is None else data[n]))
+                conn.send(None)
+            elif command == "step":
+                rewards, dones, scores = [], [], []
+                for n, env in enumerate(envs):
+                    observation, reward, done, info = env.step(data[n])
+                    if done:
+                        observation = env.reset()  # Auto-reset; the final score goes back in scores
+                    publish(n, observation)
+                    rewards.append(reward)
+                    dones.append(done)
+                    scores.append(info["score"])
+                conn.send((rewards, dones, scores))
+            elif command == "close":
+                break
+    except (EOFError, KeyboardInterrupt):
+        pass
+    finally:
+        surfaces.clear()
+        observations.close()
+        if pixels:
+            pixels.close()
+        conn.close()
+
+class ProcessVectorEnv:
+    """
+    count StormRunnerEnvs spread over a pool of worker processes.
+    observations (and pixels, when a renderer is given) are shared-memory
+    views that the next reset() or step() overwrites in place; copy them if
+    they must outlive the step.
+
+    renderer(env, surface) must be a picklable module-level function; it
+    draws env's state into a surface of frame_size in pixel_format ("P" for
+    8-bit grayscale, "RGBX" for colour).
+    """
+    action_count = len(ACTION_NAMES)
+    observation_size = OBSERVATION_SIZE
+
+    def __init__(self, count, processes=None, step_rate=STEP_RATE, rules=DEFAULT_RULES,
+                 max_frames=None, renderer=None, frame_size=(84, 84), pixel_format="P"):
+        processes = min(count, processes or multiprocessing.cpu_count())
+        self.count = count
+        self.shared_observations = SharedArray((count, OBSERVATION_SIZE), np.float32)
+        self.observations = self.shared_observations.array
+        self.shared_pixels = None
+        self.pixels = None
+        if renderer is not None:
+            width, height = frame_size
+            shape = (count, height, width) if pixel_format == "P" else (count, height, width, PIXEL_FORMATS[pixel_format])
+            self.shared_pixels = SharedArray(shape, np.uint8)
+            self.pixels = self.shared_pixels.array
+
+        env_options = {"step_rate": step_rate, "rules": rules, "max_frames": max_frames}
+        self.slots = np.array_split(np.arange(count), processes)
+        self.connections = []
+        self.workers = []
+        for slots in self.slots:
+            parent, child = multiprocessing.Pipe()
+            worker = multiprocessing.Process(
+                target=env_worker, daemon=True,
+                args=(child, slots.tolist(), self.shared_observations.spec(),
+                      self.shared_pixels.spec() if self.shared_pixels else None,
+                      pixel_format, renderer, env_options))
+            worker.start()
+            child.close()
+            self.connections.append(parent)
+            self.workers.append(worker)
+
+    def reset(self, seeds=None):
+        """Reset every environment; seeds is None or one seed per environment"""
+        for conn, slots in zip(self.connections, self.slots):
+            conn.send(("reset", None if seeds is None else [seeds[slot] for slot in slots]))
+        for conn in self.connections:
+            conn.recv()
+        return self.observations
+
+    def step(self, actions):
+        actions = np.asarray(actions)
+        for conn, slots in zip(self.connections, self.slots):
+            conn.send(("step", actions[slots].tolist()))
+        rewards = np.empty(self.count, dtype=np.float32)
+        dones = np.empty(self.count, dtype=bool)
+        scores = np.empty(self.count, dtype=np.int64)
+        for conn, slots in zip(self.connections, self.slots):
+            rewards[slots], dones[slots], scores[slots] = conn.recv()
+        return self.observations, rewards, dones, {"score": scores}
+
+    def close(self):
+        for conn in self.connections:
+            try:
+                conn.send(("close", None))
+            except OSError:
+                pass
+        for worker in self.workers:
+            worker.join(timeout=5)
+        self.observations = None
+        self.pixels = None
+        self.shared_observations.close()
+        if self.shared_pixels:
+            self.shared_pixels.close()
+
+if __name__ == "__main__":
+    import sys
+    import time
+
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 64
+    frames = int(sys.argv[2]) if len(sys.argv) > 2 else 500
+    env = ProcessVectorEnv(count)
+    env.reset(list(range(count)))
+    rng = np.random.default_rng(0)
+    start_time = time.perf_counter()
+    for _ in range(frames):
+        env.step(rng.integers(0, 3, count))
+    elapsed = time.perf_counter() - start_time
+    print(f"ProcessVectorEnv x{count} on {len(env.workers)} processes: {count * frames / elapsed:.0f} env steps/s")
+    env.close()
@@ -0,0 +1,234 @@
+import argparse
+import ipaddress
+import multiprocessing
+import os
+import queue
+import socket
+import threading
+import time
+from multiprocessing.connection import Listener, Client
+from difficulty_tuner import add_sweep_arguments, jobs_from_arguments, run_chunk, print_report
+
+# Runs difficulty_tuner jobs on workers connected over TCP, so a sweep can
+# use more than one machine. The coordinator hands one job at a time to
+# each connected worker and collects the results as they stream back. A job
+# whose worker disconnects is put back in the queue for the next free
+# worker. So is one whose worker goes quiet, but that worker stays connected:
+# if it finishes after all, the first result in wins and the copy still
+# queued is skipped.
+#
+# Messages (pickled by multiprocessing.connection, authenticated with a
+# shared key). Unpickling runs code, so whoever knows the key can run code
+# on both ends: anything beyond loopback needs a secret key set in
+# STORM_CLUSTER_KEY, and only a loopback-only sweep may use the built-in one.
+#   worker -> coordinator  ("hello", name)
+#   coordinator -> worker  ("job", job_id, job) or ("stop",)
+#   worker -> coordinator  ("result", job_id, results, elapsed)
+
+DEFAULT_PORT = 6210
+LOOPBACK_AUTHKEY = b"storm-runner-loopback"  # Public, so only good for connections that stay on this machine
+JOB_TIMEOUT = 600  # Seconds without a result before the job is offered to another worker too
+
+def is_loopback(host):
+    """Whether host only reaches this machine"""
+    try:
+        return ipaddress.ip_address(host).is_loopback
+    except ValueError:
+        pass  # A name rather than an address
+    try:
+        return ipaddress.ip_address(socket.gethostbyname(host)).is_loopback
+    except (OSError, ValueError):
+        return False
+
+def cluster_authkey(host):
+    """
+    Shared key for a connection to or on host: STORM_CLUSTER_KEY, or the
+    built-in key on loopback. Raises ValueError for any other host without one.
+    """
+    value = os.environ.get("STORM_CLUSTER_KEY")
+    if value:
+        return value.encode()
+    if not is_loopback(host):
+        raise ValueError(f"{host} is reachable from other machines; set STORM_CLUSTER_KEY to a secret key")
+    return LOOPBACK_AUTHKEY
+
+def run_worker(address, authkey=None, name=None):
+    """Connect to a coordinator and run jobs until it says stop"""
+    if authkey is None:
+        authkey = cluster_authkey(address[0])
+    conn = Client(address, authkey=authkey)
+    conn.send(("hello", name or f"{socket.gethostname()}:{os.getpid()}"))
+    try:
+        while True:
+            message = conn.recv()
+            if message[0] == "stop":
+                break
+            _, job_id, job = message
+            start_time = time.perf_counter()
+            _, results = run_chunk(job)
+            conn.send(("result", job_id, results, time.perf_counter() - start_time))
+    except (EOFError, OSError):
+        pass  # Coordinator went away
+    finally:
+        conn.close()
+
+class WorkerStats:
+    """Work done by one connected worker"""
+    def __init__(self, name):
+        self.name = name
+        self.jobs = 0
+        self.frames = 0
+        self.busy_time = 0.0
+        self.lost = False
+
+    @property
+    def frames_per_second(self):
+        return self.frames / self.busy_time if self.busy_time else 0.0
+
+class Coordinator:
+    """Accepts workers and feeds them jobs until every job has a result"""
+    def __init__(self, jobs, address=("127.0.0.1", DEFAULT_PORT), authkey=None,
+                 job_timeout=JOB_TIMEOUT):
+        if authkey is None:
+            authkey = cluster_authkey(address[0])
+        self.jobs = jobs
+        self.pending = queue.Queue()
+        for job_id in range(len(jobs)):
+            self.pending.put(job_id)
+        self.results = {}  # job_id -> results
+        self.workers = []
+        self.job_timeout = job_timeout
+        self.requeued = 0
+        self.lock = threading.Lock()
+        self.done = threading.Event()
+        if not jobs:
+            self.done.set()  # Nothing to wait for
+        self.listener = Listener(address, authkey=authkey)
+
+    @property
+    def address(self):
+        return self.listener.address
+
+    def accept_workers(self):
+        while not self.done.is_set():
+            try:
+                conn = self.listener.accept()
+            except (OSError, multiprocessing.AuthenticationError):
+                continue  # Bad key or a closed listener; done is checked again
+            threading.Thread(target=self.serve, args=(conn,), daemon=True).start()
+
+    def serve(self, conn):
+        """Feed one worker until the sweep is done or the worker is lost"""
+        job_id = None
+        stats = None
+        try:
+            stats = WorkerStats(conn.recv()[1])
+            with self.lock:
+                self.workers.append(stats)
+            while not self.done.is_set():
+                try:
+                    job_id = self.pending.get(timeout=0.2)
+                except queue.Empty:
+                    continue
+                if job_id in self.results:
+                    job_id = None  # A re-queued job that its first worker finished after all
+                    continue
+                conn.send(("job", job_id, self.jobs[job_id]))
+                if not conn.poll(self.job_timeout):
+                    # Slow or stuck: queue the job again, but keep listening in case this worker wins
+                    with self.lock:
+                        self.requeued += 1
+                    self.pending.put(job_id)
+                    job_id = None
+                    while not conn.poll(0.2):
+                        if self.done.is_set():
+                            return
+                _, finished_id, results, elapsed = conn.recv()
+                with self.lock:
+                    stats.jobs += 1
+                    stats.frames += sum(steps for steps, _, _ in results)
+                    stats.busy_time += elapsed
+                    self.results.setdefault(finished_id, results)
+                    if len(self.results) == len(self.jobs):
+                        self.done.set()
+                job_id = None
+            conn.send(("stop",))
+        except (EOFError, OSError):
+            if stats is not None:
+                stats.lost = True
+            if job_id is not None:
+                with self.lock:
+                    self.requeued += 1
+                self.pending.put(job_id)
+        finally:
+            conn.close()
+
+    def run(self):
+        """Block until every job is done; returns results in job order"""
+        threading.Thread(target=self.accept_workers, daemon=True).start()
+        self.done.wait()
+        self.listener.close()
+        return [self.results[job_id] for job_id in range(len(self.jobs))]
+
+def start_local_workers(address, count, authkey=None):
+    """Worker processes on this machine, connecting back over loopback"""
+    host, port = address
+    if host == "0.0.0.0":
+        host = "127.0.0.1"
+    if authkey is None:
+        authkey = cluster_authkey(host)
+    workers = [multiprocessing.Process(target=run_worker, args=((host, port), authkey, f"local-{n}"), daemon=True)
+               for n in range(count)]
+    for worker in workers:
+        worker.start()
+    return workers
+
+def collect(grid, jobs, results):
+    rows = [[] for _ in grid]
+    for job, chunk in zip(jobs, results):
+        rows[job[0]].extend(chunk)
+    return list(zip(grid, rows))
+
+def print_workers(coordinator, elapsed):
+    total = 0
+    for stats in coordinator.workers:
+        total += stats.frames
+        print(f"{stats.name:<30} {stats.jobs:>5} jobs {stats.frames:>12} frames "
+              f"{stats.frames_per_second:>10.0f} frames/s{'  (lost)' if stats.lost else ''}")
+    print(f"{total} frames in {elapsed:.1f}s ({total / elapsed:.0f} frames/s overall, "
+          f"{coordinator.requeued} jobs re-queued)")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Distributed Storm Runner simulation sweeps over TCP")
+    subparsers = parser.add_subparsers(dest="role", required=True)
+    coordinator_parser = subparsers.add_parser("coordinator", help="Serve a sweep to connected workers")
+    add_sweep_arguments(coordinator_parser)
+    coordinator_parser.add_argument("--bind", default="127.0.0.1",
+                                    help="Address to listen on; other than loopback needs STORM_CLUSTER_KEY")
+    coordinator_parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    coordinator_parser.add_argument("--local-workers", type=int, default=0,
+                                    help="Also start this many workers on this machine")
+    coordinator_parser.add_argument("--job-timeout", type=float, default=JOB_TIMEOUT)
+    worker_parser = subparsers.add_parser("worker", help="Run jobs for a coordinator")
+    worker_parser.add_argument("--host", default="127.0.0.1",
+                               help="Coordinator's address; other than loopback needs STORM_CLUSTER_KEY")
+    worker_parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    args = parser.parse_args()
+
+    try:
+        authkey = cluster_authkey(args.host if args.role == "worker" else args.bind)
+    except ValueError as error:
+        parser.error(str(error))
+    if args.role == "worker":
+        run_worker((args.host, args.port), authkey)
+        raise SystemExit
+
+    grid, jobs = jobs_from_arguments(args)
+    coordinator = Coordinator(jobs, (args.bind, args.port), authkey, args.job_timeout)
+    print(f"Coordinator on {coordinator.address[0]}:{coordinator.address[1]} with {len(jobs)} jobs")
+    start_local_workers(coordinator.address, args.local_workers, authkey)
+    start_time = time.perf_counter()
+    results = coordinator.run()
+    elapsed = time.perf_counter() - start_time
+    print_report(collect(grid, jobs, results))
+    print_workers(coordinator, elapsed)
@@ -0,0 +1,160 @@
+import struct
+from storm_simulation import (PlayerState, StormMeter, ObstacleState, PowerUpState, CoinState,
+                              LevelStream)
+
+# Compact binary encoding of a Simulation's complete logical state, for
+# holding thousands of saved sessions in memory or on disk. Unlike
+# Simulation.snapshot() (a pickle of every attribute dict) the layout is
+# fixed, so a typical mid-game state packs into a few kilobytes, most of it
+# the Mersenne Twister state of the gameplay stream.
+#
+# Layout (little endian):
+#   magic "SRS3", session fields, storm progress, player,
+#   gameplay RNG state, entity count (u16), then one record per entity:
+#     common: kind, x, y, prev_x, prev_y, width, height, speed, z_position
+#     obstacle: type, original size, then flying or boulder motion fields
+#     powerup: size, type
+#     coin: original size, value, animation frame and speed
+#   then the level stream: cursor (u16), chunk count (u8) and each chunk's
+#   header; chunks are rebuilt from their seeds rather than stored
+
+MAGIC = b"SRS3"
+
+GAME_STATES = ("title", "playing", "paused", "game_over")
+KINDS = ("obstacle", "powerup", "coin")
+OBSTACLE_TYPES = ("standard", "flying", "boulder")
+POWERUP_TYPES = ("invincibility", "score_boost", "extra_life")
+
+SESSION = struct.Struct("<BiiIiidHIdd")  # STATE_FIELDS, then storm progress
+PLAYER = struct.Struct("<dddddBIB")  # x, y, prev_x, prev_y, velocity_y, flags, invincible_until, lives
+RNG = struct.Struct("<i625IBd")  # version, state words and position, has gauss_next, gauss_next
+COUNT = struct.Struct("<H")
+BODY = struct.Struct("<BddddhhddB")  # kind, x, y, prev_x, prev_y, width, height, speed, z_position, alive
+OBSTACLE = struct.Struct("<BHH")
+FLYING = struct.Struct("<bdd")  # y_movement, y_range, original_y
+BOULDER = struct.Struct("<Hdd")  # size, rotation, rotation_speed
+POWERUP = struct.Struct("<HB")
+COIN = struct.Struct("<HHdd")
+STREAM = struct.Struct("<HB")  # cursor, chunk count
+CHUNK = struct.Struct("<IddH")  # seed, start, game_speed, difficulty_level
+
+ENTITY_CLASSES = {"obstacle": ObstacleState, "powerup": PowerUpState, "coin": CoinState}
+
+def export_state(simulation):
+    """Pack a simulation's full game state into bytes"""
+    out = bytearray(MAGIC)
+    out += SESSION.pack(GAME_STATES.index(simulation.game_state), simulation.high_score,
+                        simulation.high_coins, simulation.tick, simulation.score,
+                        simulation.coins_collected, simulation.game_speed,
+                        simulation.difficulty_level, simulation.frame, simulation.score_carry,
+                        simulation.storm.progress)
+
+    player = simulation.player
+    flags = player.jumping | player.double_jump_available << 1 | player.invincible << 2
+    out += PLAYER.pack(player.x, player.y, player.prev_x, player.prev_y, player.velocity_y,
+                       flags, player.invincible_until, player.lives)
+
+    version, words, gauss_next = simulation.rng.getstate()
+    out += RNG.pack(version, *words, gauss_next is not None, gauss_next or 0.0)
+
+    out += COUNT.pack(len(simulation.entities))
+    for entity in simulation.entities:
+        out += BODY.pack(KINDS.index(entity.kind), entity.x, entity.y, entity.prev_x, entity.prev_y,
+                         entity.width, entity.height, entity.speed, entity.z_position, entity.alive)
+        if entity.kind == "obstacle":
+            out += OBSTACLE.pack(OBSTACLE_TYPES.index(entity.obstacle_type),
+                                 entity.original_width, entity.original_height)
+            if entity.obstacle_type == "flying":
+                out += FLYING.pack(entity.y_movement, entity.y_range, entity.original_y)
+            elif entity.obstacle_type == "boulder":
+                out += BOULDER.pack(entity.size, entity.rotation, entity.rotation_speed)
+        elif entity.kind == "powerup":
+            out += POWERUP.pack(entity.size, POWERUP_TYPES.index(entity.type))
+        else:
+            out += COIN.pack(entity.original_size, entity.value,
+                             entity.animation_frame, entity.animation_speed)
+
+    headers, cursor = simulation.stream.state()
+    out += STREAM.pack(cursor, len(headers))
+    for header in headers:
+        out += CHUNK.pack(*header)
+    return bytes(out)
+
+def import_state(simulation, data):
+    """
+    Replace a simulation's game state with an exported one. Renderers
+    rebuild their views through the reset and spawn events, as with
+    Simulation.restore().
+    """
+    if data[:4] != MAGIC:
+        raise ValueError("Not a Storm Runner game state")
+    pos = 4
+    fields = SESSION.unpack_from(data, pos)
+    pos += SESSION.size
+    (game_state, simulation.high_score, simulation.high_coins, simulation.tick, simulation.score,
+     simulation.coins_collected, simulation.game_speed, simulation.difficulty_level,
+     simulation.frame, simulation.score_carry, storm_progress) = fields
+    simulation.game_state = GAME_STATES[game_state]
+    simulation.storm = StormMeter(simulation.rules)
+    simulation.storm.progress = storm_progress
+
+    player = simulation.player = PlayerState()
+    (player.x, player.y, player.prev_x, player.prev_y, player.velocity_y,
+     flags, player.invincible_until, player.lives) = PLAYER.unpack_from(data, pos)
+    pos += PLAYER.size
+    player.jumping = bool(flags & 1)
+    player.double_jump_available = bool(flags & 2)
+    player.invincible = bool(flags & 4)
+
+    rng_fields = RNG.unpack_from(data, pos)
+    pos += RNG.size
+    has_gauss, gauss_next = rng_fields[-2:]
+    simulation.rng.setstate((rng_fields[0], rng_fields[1:-2], gauss_next if has_gauss else None))
+
+    count, = COUNT.unpack_from(data, pos)
+    pos += COUNT.size
+    entities = []
+    for _ in range(count):
+        kind, x, y, prev_x, prev_y, width, height, speed, z_position, alive = BODY.unpack_from(data, pos)
+        pos += BODY.size
+        kind = KINDS[kind]
+        entity = ENTITY_CLASSES[kind].__new__(ENTITY_CLASSES[kind])
+        entity.__dict__.update(x=x, y=y, prev_x=prev_x, prev_y=prev_y, width=width, height=height,
+                               speed=speed, z_position=z_position, alive=bool(alive))
+        if kind == "obstacle":
+            obstacle_type, entity.original_width, entity.original_height = OBSTACLE.unpack_from(data, pos)
+            pos += OBSTACLE.size
+            entity.obstacle_type = OBSTACLE_TYPES[obstacle_type]
+            if entity.obstacle_type == "flying":
+                entity.y_movement, entity.y_range, entity.original_y = FLYING.unpack_from(data, pos)
+                pos += FLYING.size
+            elif entity.obstacle_type == "boulder":
+                entity.size, entity.rotation, entity.rotation_speed = BOULDER.unpack_from(data, pos)
+                pos += BOULDER.size
+        elif kind == "powerup":
+            entity.size, powerup_type = POWERUP.unpack_from(data, pos)
+            pos += POWERUP.size
+            entity.type = POWERUP_TYPES[powerup_type]
+        else:
+            (entity.original_size, entity.value,
+             entity.animation_frame, entity.animation_speed) = COIN.unpack_from(data, pos)
+            pos += COIN.size
+        entities.append(entity)
+    simulation.entities = entities
+
+    cursor, count = STREAM.unpack_from(data, pos)
+    pos += STREAM.size
+    headers = []
+    for _ in range(count):
+        headers.append(CHUNK.unpack_from(data, pos))
+        pos += CHUNK.size
+    simulation.stream = LevelStream(simulation.rules)
+    simulation.stream.restore((headers, cursor))
+    simulation.reschedule()
+
+    simulation.notify("reset")
+    for chunk in simulation.stream.chunks:
+        simulation.notify("chunk", chunk)
+    for entity in entities:
+        simulation.notify("spawn", entity)
+    return simulation
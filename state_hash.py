@@ -0,0 +1,229 @@
+import struct
+import zlib
+from replay import write_varint, read_varint
+
+# Per-frame hashes of the gameplay state, to prove that an optimization
+# left the rules alone. A run writes one record per simulation step: the
+# tick and a crc32 for each field group. Two streams of the same seed and
+# inputs must match record for record; compare() reports the first tick
+# where they do not and which groups differed.
+#
+# File layout: magic "SRH1", group count (u8), then per step
+#   varint ticks since the previous record, one u32 crc32 per group
+
+MAGIC = b"SRH1"
+GROUPS = ("session", "player", "entities", "rng")
+GAME_STATES = ("title", "playing", "paused", "game_over")
+
+# getstate() copies 625 words, which would cost more than the step being
+# hashed; the RNG is only re-hashed this often. A divergent draw still shows
+# up in the entities group on the step it spawns something.
+RNG_INTERVAL = 30
+
+SESSION = struct.Struct("<BIiidHIddH")
+PLAYER = struct.Struct("<dddBIB")
+ENTITY_FORMAT = "Bddhhdddd"
+RECORD = struct.Struct("<%dI" % len(GROUPS))
+KINDS = {"obstacle": 0, "powerup": 1, "coin": 2}
+
+CHUNK_FORMAT = "IddH"  # seed, start, game_speed, difficulty_level
+
+_entity_structs = {}
+_chunk_structs = {}
+
+def entity_struct(count):
+    """One Struct packing count entities at once, cached by count"""
+    packer = _entity_structs.get(count)
+    if packer is None:
+        packer = _entity_structs[count] = struct.Struct("<" + ENTITY_FORMAT * count)
+    return packer
+
+def chunk_struct(count):
+    """One Struct packing count level chunk headers, cached by count"""
+    packer = _chunk_structs.get(count)
+    if packer is None:
+        packer = _chunk_structs[count] = struct.Struct("<" + CHUNK_FORMAT * count)
+    return packer
+
+class StateHasher:
+    """crc32 of each field group of a Simulation"""
+    def __init__(self, rng_interval=RNG_INTERVAL):
+        self.rng_interval = rng_interval
+        self.rng_hash = 0
+        self.rng_tick = None
+
+    def session_fields(self, simulation):
+        return (GAME_STATES.index(simulation.game_state), simulation.tick, simulation.score,
+                simulation.coins_collected, simulation.game_speed, simulation.difficulty_level,
+                simulation.frame, simulation.score_carry, simulation.storm.progress,
+                simulation.stream.cursor)
+
+    def stream_fields(self, simulation):
+        """Headers of the pending level chunks; their contents follow from these"""
+        values = []
+        for header in simulation.stream.state()[0]:
+            values += header
+        return values
+
+    def player_fields(self, simulation):
+        player = simulation.player
+        flags = player.jumping | player.double_jump_available << 1 | player.invincible << 2
+        return (player.x, player.y, player.velocity_y, flags, player.invincible_until, player.lives)
+
+    def entity_fields(self, entity):
+        return (KINDS[entity.kind], entity.x, entity.y, entity.width, entity.height, entity.speed,
+                entity.z_position, getattr(entity, "rotation", 0.0), getattr(entity, "animation_frame", 0.0))
+
+    def hash(self, simulation):
+        """(session, player, entities, rng) crc32s of the current state"""
+        session = zlib.crc32(SESSION.pack(*self.session_fields(simulation)))
+        stream = self.stream_fields(simulation)
+        session = zlib.crc32(chunk_struct(len(stream) // 4).pack(*stream), session)
+        player = zlib.crc32(PLAYER.pack(*self.player_fields(simulation)))
+        entity_list = simulation.entities
+        values = []
+        for entity in entity_list:
+            values += self.entity_fields(entity)
+        entities = zlib.crc32(entity_struct(len(entity_list)).pack(*values))
+        tick = simulation.tick
+        if self.rng_tick is None or tick - self.rng_tick >= self.rng_interval or tick < self.rng_tick:
+            _, words, _ = simulation.rng.getstate()
+            self.rng_hash = zlib.crc32(struct.pack("<625I", *words))
+            self.rng_tick = tick
+        return session, player, entities, self.rng_hash
+
+class HashWriter:
+    """Appends one hash record per call to record(), usually after every step"""
+    def __init__(self, path, rng_interval=RNG_INTERVAL):
+        self.file = open(path, "wb")
+        self.file.write(MAGIC + bytes([len(GROUPS)]))
+        self.hasher = StateHasher(rng_interval)
+        self.previous_tick = 0
+        self.started = False  # Whether a record has been written, flushed or not
+        self.buffer = bytearray()
+
+    def record(self, simulation):
+        if simulation.tick <= self.previous_tick and self.started:
+            return  # Seeking back through a replay; ticks already hashed are kept
+        self.started = True
+        write_varint(self.buffer, simulation.tick - self.previous_tick)
+        self.previous_tick = simulation.tick
+        self.buffer += RECORD.pack(*self.hasher.hash(simulation))
+        if len(self.buffer) > 65536:
+            self.flush()
+
+    def flush(self):
+        self.file.write(self.buffer)
+        self.buffer.clear()
+
+    def close(self):
+        self.flush()
+        self.file.close()
+
+def read_hashes(path):
+    """List of (tick, hashes) records from a hash file"""
+    with open(path, "rb") as f:
+        data = f.read()
+    if data[:4] != MAGIC or data[4] != len(GROUPS):
+        raise ValueError("Not a Storm Runner hash stream")
+    records = []
+    pos = 5
+    tick = 0
+    while pos < len(data):
+        delta, pos = read_varint(data, pos)
+        tick += delta
+        records.append((tick, RECORD.unpack_from(data, pos)))
+        pos += RECORD.size
+    return records
+
+def compare(records_a, records_b):
+    """
+    First divergence between two hash streams, as (tick, [group names]),
+    or None if they agree for as long as both run
+    """
+    for (tick_a, hashes_a), (tick_b, hashes_b) in zip(records_a, records_b):
+        if tick_a != tick_b:
+            return min(tick_a, tick_b), ["tick"]
+        differing = [name for name, a, b in zip(GROUPS, hashes_a, hashes_b) if a != b]
+        if differing:
+            return tick_a, differing
+    return None
+
+def diff_fields(simulation_a, simulation_b):
+    """Names of the individual fields that differ between two live simulations"""
+    hasher = StateHasher()
+    names = ["game_state", "tick", "score", "coins_collected", "game_speed", "difficulty_level",
+             "frame", "score_carry", "storm.progress", "stream.cursor"]
+    differing = [f"session.{name}" for name, a, b in zip(names, hasher.session_fields(simulation_a),
+                                                          hasher.session_fields(simulation_b)) if a != b]
+    if hasher.stream_fields(simulation_a) != hasher.stream_fields(simulation_b):
+        differing.append("session.stream.chunks")
+    names = ["x", "y", "velocity_y", "flags", "invincible_until", "lives"]
+    differing += [f"player.{name}" for name, a, b in zip(names, hasher.player_fields(simulation_a),
+                                                         hasher.player_fields(simulation_b)) if a != b]
+    entities_a, entities_b = simulation_a.entities, simulation_b.entities
+    if len(entities_a) != len(entities_b):
+        differing.append("entities.count")
+    names = ["kind", "x", "y", "width", "height", "speed", "z_position", "rotation", "animation_frame"]
+    for n, (a, b) in enumerate(zip(entities_a, entities_b)):
+        differing += [f"entities[{n}].{name}" for name, field_a, field_b in
+                      zip(names, hasher.entity_fields(a), hasher.entity_fields(b)) if field_a != field_b]
+    if simulation_a.rng.getstate() != simulation_b.rng.getstate():
+        differing.append("rng")
+    return differing
+
+if __name__ == "__main__":
+    import argparse
+    from storm_simulation import Simulation
+    from replay import Recording, InputPlayback, new_simulation
+
+    parser = argparse.ArgumentParser(description="Write and compare per-step gameplay state hashes")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    record_parser = subparsers.add_parser("record", help="Replay a recording headless, hashing every step")
+    record_parser.add_argument("recording")
+    record_parser.add_argument("output")
+    soak_parser = subparsers.add_parser("soak", help="Run a seeded metronome session, hashing every step")
+    soak_parser.add_argument("output")
+    soak_parser.add_argument("--seed", default=0)
+    soak_parser.add_argument("--steps", type=int, default=100000)
+    soak_parser.add_argument("--jump-every", type=int, default=90)
+    compare_parser = subparsers.add_parser("compare", help="Report the first step where two streams differ")
+    compare_parser.add_argument("first")
+    compare_parser.add_argument("second")
+    args = parser.parse_args()
+
+    if args.command == "compare":
+        records_a, records_b = read_hashes(args.first), read_hashes(args.second)
+        divergence = compare(records_a, records_b)
+        if divergence is not None:
+            tick, groups = divergence
+            print(f"Runs diverge at tick {tick}: {', '.join(groups)} differ")
+            raise SystemExit(1)
+        if len(records_a) != len(records_b):
+            print(f"Runs agree for {min(len(records_a), len(records_b))} steps, then one ends")
+        else:
+            print(f"Runs agree for all {len(records_a)} steps")
+        raise SystemExit
+
+    if args.command == "record":
+        recording = Recording.load(args.recording)
+        simulation = new_simulation(recording)
+        playback = InputPlayback(recording)
+        writer = HashWriter(args.output)
+        while not playback.finished(simulation):
+            playback.apply_due(simulation)
+            simulation.step()
+            writer.record(simulation)
+    else:
+        simulation = Simulation(args.seed)
+        simulation.start()
+        writer = HashWriter(args.output)
+        for step in range(args.steps):
+            if simulation.game_state == "game_over":
+                simulation.start()
+            if args.jump_every and step % args.jump_every == 0:
+                simulation.jump()
+            simulation.step()
+            writer.record(simulation)
+    writer.close()
+    print(f"Hashed {simulation.tick} ticks to {args.output}")
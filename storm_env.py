@@ -0,0 +1,216 @@
+import numpy as np
+from storm_simulation import Simulation, SCREEN_WIDTH, SCREEN_HEIGHT, FPS, STEP_RATE, DEFAULT_RULES, PLAYER_X
+from batch_simulation import BatchSimulation
+
+# Gym-style environments for training agents on the Storm Runner 3D rules.
+#
+#   env = StormRunnerEnv()
+#   observation = env.reset(seed=7)
+#   observation, reward, done, info = env.step(ACTION_JUMP)
+#
+# One environment step is one 60 FPS frame: the action is applied, then the
+# simulation runs step_rate / FPS fixed steps. VectorStormRunnerEnv steps
+# many sessions per call on top of BatchSimulation and resets finished ones
+# automatically.
+
+ACTION_NONE = 0
+ACTION_JUMP = 1  # Jump from the ground; ignored in the air
+ACTION_DOUBLE_JUMP = 2  # Second jump while airborne; ignored on the ground or once used
+ACTION_NAMES = ("none", "jump", "double_jump")
+
+NEAREST_OBSTACLES = 3
+
+# Observation layout, every value roughly in [-1, 1]
+PLAYER_FIELDS = ("player_y", "velocity_y", "jumping", "double_jump_available",
+                 "invincible", "lives", "storm_progress", "game_speed")
+ENTITY_FIELDS = ("distance", "y", "width", "height", "present")
+OBSERVATION_SIZE = len(PLAYER_FIELDS) + len(ENTITY_FIELDS) * (NEAREST_OBSTACLES + 2)  # + nearest coin and powerup
+
+# Reward = points scored / 100, minus 1 per life lost, minus the storm's gain / 100
+SCORE_REWARD = 0.01
+LIFE_PENALTY = 1.0
+STORM_PENALTY = 0.01
+
+def wants_jump(action, jumping, double_jump_available):
+    """Whether an action presses jump this frame; works on scalars and arrays"""
+    first = np.logical_and(action == ACTION_JUMP, np.logical_not(jumping))
+    second = np.logical_and(action == ACTION_DOUBLE_JUMP, np.logical_and(jumping, double_jump_available))
+    return np.logical_or(first, second)
+
+def step_reward(score_gain, lives_lost, storm_gain):
+    return (score_gain * SCORE_REWARD - lives_lost * LIFE_PENALTY
+            - np.maximum(storm_gain, 0) * STORM_PENALTY)
+
+def entity_features(x, y, width, height, present):
+    return ((x - PLAYER_X) / SCREEN_WIDTH, y / SCREEN_HEIGHT, width / SCREEN_WIDTH,
+            height / SCREEN_HEIGHT, present)
+
+class StormRunnerEnv:
+    """One Storm Runner session behind a reset(seed)/step(action) interface"""
+    action_count = len(ACTION_NAMES)
+    observation_size = OBSERVATION_SIZE
+
+    def __init__(self, step_rate=STEP_RATE, rules=DEFAULT_RULES, max_frames=None):
+        self.simulation = Simulation(step_rate=step_rate, rules=rules)
+        self.steps_per_frame = max(1, step_rate // FPS)
+        self.max_frames = max_frames  # Optional time limit in 60 FPS frames
+        self.frames = 0
+
+    def reset(self, seed=None):
+        self.simulation.reset(seed=seed)
+        self.frames = 0
+        return self.observe()
+
+    def step(self, action):
+        simulation = self.simulation
+        player = simulation.player
+        score, lives, storm = simulation.score, player.lives, simulation.storm.progress
+        if wants_jump(action, player.jumping, player.double_jump_available):
+            simulation.jump()
+        for _ in range(self.steps_per_frame):
+            simulation.step()
+            if simulation.game_state != "playing":
+                break
+        self.frames += 1
+
+        reward = float(step_reward(simulation.score - score, max(0, lives - player.lives),
+                                   simulation.storm.progress - storm))
+        done = simulation.game_state == "game_over"
+        info = {"score": simulation.score, "lives": player.lives,
+                "storm_progress": simulation.storm.progress}
+        if self.max_frames and self.frames >= self.max_frames and not done:
+            done = True
+            info["truncated"] = True
+        return self.observe(), reward, done, info
+
+    def observe(self):
+        simulation = self.simulation
+        player = simulation.player
+        observation = [player.y / SCREEN_HEIGHT, player.velocity_y / 20, player.jumping,
+                       player.double_jump_available, player.invincible, player.lives / 5,
+                       simulation.storm.progress / 100, simulation.game_speed / 10]
+
+        # Nearest obstacles whose right edge has not passed the player yet
+        ahead = sorted((entity for entity in simulation.entities
+                        if entity.kind == "obstacle" and entity.right >= PLAYER_X),
+                       key=lambda entity: entity.x)
+        for n in range(NEAREST_OBSTACLES):
+            if n < len(ahead):
+                entity = ahead[n]
+                observation += entity_features(entity.x, entity.y, entity.width, entity.height, 1)
+            else:
+                observation += entity_features(SCREEN_WIDTH + PLAYER_X, 0, 0, 0, 0)
+        for kind in ("coin", "powerup"):
+            nearest = min((entity for entity in simulation.entities
+                           if entity.kind == kind and entity.right >= PLAYER_X),
+                          key=lambda entity: entity.x, default=None)
+            if nearest is not None:
+                observation += entity_features(nearest.x, nearest.y, nearest.width, nearest.height, 1)
+            else:
+                observation += entity_features(SCREEN_WIDTH + PLAYER_X, 0, 0, 0, 0)
+        return np.array(observation, dtype=np.float32)
+
+class VectorStormRunnerEnv:
+    """
+    count sessions stepped together. step() takes an array of actions and
+    returns arrays of observations, rewards and done flags; a session that
+    finishes is reset straight away, and info["score"] holds its final score.
+    """
+    action_count = len(ACTION_NAMES)
+    observation_size = OBSERVATION_SIZE
+
+    def __init__(self, count, step_rate=STEP_RATE, rules=DEFAULT_RULES, max_frames=None):
+        self.count = count
+        self.step_rate = step_rate
+        self.rules = rules
+        self.steps_per_frame = max(1, step_rate // FPS)
+        self.max_frames = max_frames
+        self.batch = None
+        self.frames = np.zeros(count, dtype=np.int64)
+        self.reset()
+
+    def reset(self, seed=None):
+        self.batch = BatchSimulation(self.count, seed, self.step_rate, self.rules)
+        self.frames[:] = 0
+        return self.observe()
+
+    def step(self, actions):
+        batch = self.batch
+        actions = np.asarray(actions)
+        score = batch.score.copy()
+        lives = batch.lives.copy()
+        storm = batch.storm_progress.copy()
+        batch.step(wants_jump(actions, batch.jumping, batch.double_jump_available))
+        for _ in range(self.steps_per_frame - 1):
+            batch.step()
+        self.frames += 1
+
+        rewards = step_reward(batch.score - score, np.maximum(0, lives - batch.lives),
+                              batch.storm_progress - storm).astype(np.float32)
+        dones = batch.game_over.copy()
+        truncated = np.zeros(self.count, dtype=bool)
+        if self.max_frames:
+            truncated = ~dones & (self.frames >= self.max_frames)
+            dones |= truncated
+        info = {"score": batch.score.copy(), "lives": batch.lives.copy(),
+                "storm_progress": batch.storm_progress.copy(), "truncated": truncated}
+        finished = np.flatnonzero(dones)
+        if len(finished):
+            batch.reset(finished)
+            self.frames[finished] = 0
+        return self.observe(), rewards, dones, info
+
+    def observe(self):
+        batch = self.batch
+        observation = np.empty((self.count, OBSERVATION_SIZE), dtype=np.float32)
+        observation[:, 0] = batch.player_y / SCREEN_HEIGHT
+        observation[:, 1] = batch.velocity_y / 20
+        observation[:, 2] = batch.jumping
+        observation[:, 3] = batch.double_jump_available
+        observation[:, 4] = batch.invincible
+        observation[:, 5] = batch.lives / 5
+        observation[:, 6] = batch.storm_progress / 100
+        observation[:, 7] = batch.game_speed / 10
+
+        column = len(PLAYER_FIELDS)
+        for slots, nearest in ((batch.obstacles, NEAREST_OBSTACLES), (batch.coins, 1), (batch.powerups, 1)):
+            ahead = slots.active & (slots.x + slots.width >= PLAYER_X)
+            order = np.argsort(np.where(ahead, slots.x, np.inf), axis=1)[:, :nearest]
+            present = np.take_along_axis(ahead, order, axis=1)
+            features = entity_features(np.where(present, np.take_along_axis(slots.x, order, axis=1),
+                                                SCREEN_WIDTH + PLAYER_X),
+                                       np.take_along_axis(slots.y, order, axis=1) * present,
+                                       np.take_along_axis(slots.width, order, axis=1) * present,
+                                       np.take_along_axis(slots.height, order, axis=1) * present,
+                                       present)
+            for n in range(nearest):
+                for feature in features:
+                    observation[:, column] = feature[:, n]
+                    column += 1
+        return observation
+
+if __name__ == "__main__":
+    import sys
+    import time
+
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 1024
+    frames = int(sys.argv[2]) if len(sys.argv) > 2 else 1000
+    rng = np.random.default_rng(0)
+
+    env = StormRunnerEnv()
+    env.reset(seed=0)
+    start_time = time.perf_counter()
+    for _ in range(frames):
+        _, _, done, _ = env.step(rng.integers(0, 3))
+        if done:
+            env.reset()
+    elapsed = time.perf_counter() - start_time
+    print(f"StormRunnerEnv: {frames / elapsed:.0f} env steps/s")
+
+    vector_env = VectorStormRunnerEnv(count)
+    vector_env.reset(seed=0)
+    start_time = time.perf_counter()
+    for _ in range(frames):
+        vector_env.step(rng.integers(0, 3, count))
+    elapsed = time.perf_counter() - start_time
+    print(f"VectorStormRunnerEnv x{count}: {count * frames / elapsed:.0f} env steps/s")
@@ -1,20 +1,37 @@
 import pygame
-import random
 import sys
 import os
 import math
 from pygame import mixer
+from storm_simulation import (SCREEN_WIDTH, SCREEN_HEIGHT, HORIZON_Y, GROUND_Y,
+                              INPUT_JUMP, INPUT_PAUSE, INPUT_RESTART,
+                              Simulation, depth_scale)
+from game_loop import FixedTimestep
+from rng_streams import seed_from_environment
+from replay import (Recording, InputRecorder, InputPlayback, KeyframeTimeline,
+                    new_simulation, play_headless)
+from state_codec import export_state, import_state
+from state_hash import HashWriter
+from autopilot import Autopilot
+from frame_jobs import FrameJobs
+from render_queue import RenderQueue
+from rotation_atlas import rotation_atlas
+
+# The textured floor needs NumPy; without it the ground stays flat
+try:
+    from perspective_floor import PerspectiveFloor
+except ImportError:
+    PerspectiveFloor = None
 
 # Initialize pygame
 pygame.init()
-mixer.init()
 
 # Game constants
-SCREEN_WIDTH = 1024
-SCREEN_HEIGHT = 600
 GROUND_HEIGHT = 60
-FPS = 60
-HORIZON_Y = 350  # Horizon line for 3D perspective
+SEEK_SECONDS = 10  # LEFT/RIGHT jump this far through a replay
+MAX_RENDER_FPS = 240  # Rendering is interpolated, so any refresh rate up to this works
+FLOOR_SPEED = 5  # Entities' base speed; each floor row keeps pace with the entities at its depth
+CHUNK_WARM_FRAMES = 60  # Frames to draw a chunk's images in; it arrives about two seconds before its content
 
 # Colors
 WHITE = (255, 255, 255)
@@ -30,58 +47,101 @@ PURPLE = (128, 0, 128)
 SKY_BLUE = (135, 206, 235)
 GROUND_BROWN = (139, 69, 19)
 
-# Create the screen
-screen = pygame.display.set_mode((SCREEN_WIDTH, SCREEN_HEIGHT))
-pygame.display.set_caption("Storm Runner 3D")
-clock = pygame.time.Clock()
+# The screen is only created when a Game is, so the module (and the
+# simulation behind it) can be imported without a display
+screen = None
+clock = None
+
+def init_display():
+    """Create the game window and start the mixer"""
+    global screen, clock
+    if screen is None:
+        screen = pygame.display.set_mode((SCREEN_WIDTH, SCREEN_HEIGHT))
+        pygame.display.set_caption("Storm Runner 3D")
+        clock = pygame.time.Clock()
+        try:
+            mixer.init()
+        except pygame.error:
+            print("Could not initialize the mixer")
+    return screen
 
 # 3D Helper Functions
-def draw_3d_ground(surface, horizon_y):
-    """Draw a 3D perspective ground with horizon"""
+
+# The sky and ground never change for a given surface size and horizon, so
+# they are drawn once into a display-format layer and blitted each frame.
+# Keying on the size means a resized window simply gets a fresh layer.
+GROUND_LAYER_CACHE_SIZE = 4
+ground_layers = {}
+
+def render_3d_ground(size, horizon_y):
+    """Sky gradient and perspective ground for a surface of size"""
+    width, height = size
+    layer = pygame.Surface(size)
+    
     # Draw sky gradient
     for y in range(horizon_y):
         # Calculate sky color (lighter toward horizon)
         sky_color = (100 + y//3, 150 + y//4, 255)
-        pygame.draw.line(surface, sky_color, (0, y), (SCREEN_WIDTH, y))
+        pygame.draw.line(layer, sky_color, (0, y), (width, y))
     
     # Draw ground with perspective lines
-    ground_rect = pygame.Rect(0, horizon_y, SCREEN_WIDTH, SCREEN_HEIGHT - horizon_y)
-    pygame.draw.rect(surface, GROUND_BROWN, ground_rect)
+    ground_rect = pygame.Rect(0, horizon_y, width, height - horizon_y)
+    pygame.draw.rect(layer, GROUND_BROWN, ground_rect)
     
     # Draw perspective lines on ground
-    vanishing_point_x = SCREEN_WIDTH // 2
-    for x in range(0, SCREEN_WIDTH, 50):
-        start_point = (x, SCREEN_HEIGHT)
+    vanishing_point_x = width // 2
+    for x in range(0, width, 50):
+        start_point = (x, height)
         end_point = (vanishing_point_x + (x - vanishing_point_x) // 3, horizon_y)
-        pygame.draw.line(surface, (80, 60, 40), start_point, end_point, 1)
+        pygame.draw.line(layer, (80, 60, 40), start_point, end_point, 1)
+    
+    # Match the display's pixel format so the blit is a plain copy
+    if pygame.display.get_surface() is not None:
+        layer = layer.convert()
+    return layer
+
+def draw_3d_ground(surface, horizon_y):
+    """Draw a 3D perspective ground with horizon"""
+    key = (surface.get_size(), horizon_y)
+    layer = ground_layers.get(key)
+    if layer is None:
+        if len(ground_layers) >= GROUND_LAYER_CACHE_SIZE:
+            del ground_layers[next(iter(ground_layers))]  # Drop the oldest
+        layer = ground_layers[key] = render_3d_ground(*key)
+    surface.blit(layer, (0, 0))
+
+# Scale of the ground on each screen row, from the simulation's depth_scale
+# at the depth whose ground line (depth_ground_y) falls on that row. The
+# textured floor samples its texture through this table and apply_perspective
+# reads it, so a floor row scrolls at the speed of the entities standing on it.
+def perspective_rows(height, horizon_y):
+    """Per-row ground scale for a screen height; rows above the horizon take the horizon's"""
+    rows = [depth_scale(0.0)] * horizon_y
+    for y in range(horizon_y, height):
+        rows.append(depth_scale((y - horizon_y) / (height - horizon_y)))
+    return rows
+
+ROW_SCALES = perspective_rows(SCREEN_HEIGHT, HORIZON_Y)
 
 def apply_perspective(y_pos, min_scale=0.5, max_scale=1.0):
-    """Calculate scale factor based on y position (perspective)"""
-    # Objects closer to the horizon appear smaller
-    distance_from_bottom = SCREEN_HEIGHT - y_pos
-    perspective_factor = distance_from_bottom / (SCREEN_HEIGHT - HORIZON_Y)
+    """Scale factor of the ground at screen row y_pos (perspective)"""
+    row = min(max(int(y_pos), 0), SCREEN_HEIGHT - 1)
     # Clamp the scale between min and max
-    return max(min_scale, min(max_scale, perspective_factor))
+    return max(min_scale, min(max_scale, ROW_SCALES[row]))
 
 # Storm progress bar
 class StormProgressBar:
-    def __init__(self, x, y, width, height):
+    def __init__(self, x, y, width, height, meter):
         self.rect = pygame.Rect(x, y, width, height)
-        self.progress = 0  # 0 to 100
-        self.danger_zone = 85  # Changed from 80 to 85 for more warning time
-        
-    def update(self, player_speed, storm_speed):
-        # Calculate progress based on player vs storm speed
-        speed_diff = storm_speed - player_speed
-        
-        # Increase progress if storm is faster, decrease if player is faster
-        if speed_diff > 0:
-            self.progress += speed_diff * 0.08  # Changed from 0.1 to 0.08 for slower storm progress
-        else:
-            self.progress = max(0, self.progress + speed_diff * 0.06)  # Changed from 0.05 to 0.06 for faster recovery
-            
-        # Cap progress at 100
-        self.progress = min(100, self.progress)
+        self.meter = meter  # StormMeter from the simulation
+
+    @property
+    def progress(self):
+        return self.meter.progress
+
+    @property
+    def danger_zone(self):
+        return self.meter.danger_zone
         
     def draw(self, surface):
         # Draw background
@@ -111,10 +171,11 @@ class StormProgressBar:
         text_rect = text.get_rect(midleft=(self.rect.x + 5, self.rect.centery))
         surface.blit(text, text_rect)
 
-# Player class
+# Player class - draws a PlayerState from the simulation
 class Player(pygame.sprite.Sprite):
-    def __init__(self):
+    def __init__(self, state):
         super().__init__()
+        self.state = state
         self.width = 30
         self.height = 50
         self.image = pygame.Surface((self.width, self.height), pygame.SRCALPHA)
@@ -139,15 +200,6 @@ class Player(pygame.sprite.Sprite):
         self.image.blit(highlight, (5, 0))
         
         self.rect = self.image.get_rect()
-        self.rect.bottomleft = (100, HORIZON_Y + 50)  # Position player above horizon
-        self.velocity_y = 0
-        self.jumping = False
-        self.double_jump_available = True
-        self.score = 0
-        self.invincible = False
-        self.invincible_timer = 0
-        self.lives = 5
-        self.coins = 0
         
         # Jump animation frames
         self.standing_image = self.image.copy()
@@ -170,22 +222,17 @@ class Player(pygame.sprite.Sprite):
         self.shadow = pygame.Surface((30, 10), pygame.SRCALPHA)
         self.shadow.fill((0, 0, 0, 80))
         self.shadow_rect = self.shadow.get_rect()
+        self.update()
         
-    def update(self):
-        # Gravity
-        self.velocity_y += 0.8
-        self.rect.y += self.velocity_y
-        
-        # Check if on ground
-        ground_y = HORIZON_Y + 50  # Position above horizon line
-        if self.rect.bottom >= ground_y:
-            self.rect.bottom = ground_y
-            self.velocity_y = 0
-            self.jumping = False
-            self.double_jump_available = True
-            self.image = self.standing_image
+    def update(self, alpha=1.0):
+        x, y = self.state.interpolated(alpha)
+        self.rect.topleft = (int(x), int(y))
+        
+        # Use jumping image when in air
+        self.image = self.jumping_image if self.state.jumping else self.standing_image
             
         # Update shadow position - always on ground, gets smaller when player jumps higher
+        ground_y = GROUND_Y
         self.shadow_rect.midbottom = (self.rect.midbottom[0], ground_y)
         distance_from_ground = ground_y - self.rect.bottom
         shadow_scale = max(0.5, 1.0 - (distance_from_ground / 100))
@@ -193,391 +240,330 @@ class Player(pygame.sprite.Sprite):
         if shadow_width > 0:  # Prevent zero width
             self.shadow = pygame.transform.scale(self.shadow, (shadow_width, 5))
             self.shadow_rect = self.shadow.get_rect(midbottom=(self.rect.midbottom[0], ground_y))
-            
-        # Invincibility timer
-        if self.invincible:
-            self.invincible_timer -= 1
-            if self.invincible_timer <= 0:
-                self.invincible = False
-                
-        # Use jumping image when in air
-        if self.jumping:
-            self.image = self.jumping_image
-    
-    def jump(self):
-        if not self.jumping:
-            self.velocity_y = -18
-            self.jumping = True
-            self.image = self.jumping_image
-        elif self.double_jump_available:
-            self.velocity_y = -16
-            self.double_jump_available = False
-            self.image = self.jumping_image
-            
-    def make_invincible(self, duration=240):
-        self.invincible = True
-        self.invincible_timer = duration
-        
-    def lose_life(self):
-        if not self.invincible:
-            self.lives -= 1
-            self.make_invincible(180)
-            return self.lives <= 0
-        return False
         
     def draw_shadow(self, surface):
         # Draw the player's shadow on the ground
         surface.blit(self.shadow, self.shadow_rect)
-            self.velocity_y = -18  # Changed from -15 to -18 for higher jumps
-            self.jumping = True
-        elif self.double_jump_available:
-            self.velocity_y = -16  # Changed from -13 to -16 for higher double jumps
-            self.double_jump_available = False
-            
-    def make_invincible(self, duration=240):  # Changed from 180 to 240 for longer invincibility
-        self.invincible = True
-        self.invincible_timer = duration
-        
-    def lose_life(self):
-        if not self.invincible:
-            self.lives -= 1
-            self.make_invincible(180)  # Changed from 120 to 180 for longer invincibility after hit
-            return self.lives <= 0
-        return False
-
-# Obstacle class
+
+# Entity images are drawn once per distinct look and shared by every sprite
+# showing it, so sprites rebuilt after a state import or a replay seek cost
+# a dictionary lookup instead of fresh drawing. Shared images are never
+# drawn on; sprites transform them into new surfaces instead.
+PROTOTYPE_CACHE_SIZE = 512
+prototypes = {}
+
+# Obstacles come in a new size at every depth, so their images are shared by
+# variant instead: the original size rounded to a size class, at the middle
+# of one of a few depth buckets. That is a few hundred images for all the
+# obstacles a run can spawn, each within a few pixels of the hitbox,
+# so spawning reuses one where it used to draw and scale a new surface.
+OBSTACLE_SIZE_CLASS = 5  # Pixels of original size per class
+OBSTACLE_DEPTH_BUCKETS = 8
+
+def prototype(key, draw):
+    """The image for key, drawn by draw() the first time it is needed"""
+    image = prototypes.get(key)
+    if image is None:
+        if len(prototypes) >= PROTOTYPE_CACHE_SIZE:
+            del prototypes[next(iter(prototypes))]  # Drop the oldest
+        image = prototypes[key] = draw()
+    return image
+
+def obstacle_variant(state):
+    """(width class, height class, depth bucket) of an ObstacleState's image"""
+    width = round(state.original_width / OBSTACLE_SIZE_CLASS) * OBSTACLE_SIZE_CLASS
+    height = round(state.original_height / OBSTACLE_SIZE_CLASS) * OBSTACLE_SIZE_CLASS
+    bucket = min(int(state.z_position * OBSTACLE_DEPTH_BUCKETS), OBSTACLE_DEPTH_BUCKETS - 1)
+    return width, height, bucket
+
+def draw_obstacle(obstacle_type, original_width, original_height, width, height):
+    if obstacle_type == "standard":
+        # Create a triangular obstacle
+        image = pygame.Surface((original_width, original_height), pygame.SRCALPHA)
+        
+        # Draw a triangle
+        pygame.draw.polygon(image, RED, [
+            (original_width // 2, 0),  # Top point
+            (0, original_height),      # Bottom left
+            (original_width, original_height)   # Bottom right
+        ])
+        
+        # Add 3D shadow effect
+        shadow = pygame.Surface((original_width, 10), pygame.SRCALPHA)
+        shadow.fill((0, 0, 0, 100))  # Semi-transparent black
+        image.blit(shadow, (0, original_height - 5))
+    
+    elif obstacle_type == "flying":
+        # Create a flying triangular obstacle
+        image = pygame.Surface((original_width, original_height), pygame.SRCALPHA)
+        
+        # Draw a triangle pointing right (like an arrow)
+        pygame.draw.polygon(image, ORANGE, [
+            (0, 0),           # Top left
+            (0, original_height),      # Bottom left
+            (original_width, original_height//2) # Right middle
+        ])
+    
+    else:
+        # Create a triangular boulder (pyramid)
+        image = pygame.Surface((original_width, original_width), pygame.SRCALPHA)
+        
+        # Draw a triangle
+        pygame.draw.polygon(image, PURPLE, [
+            (original_width // 2, 0),   # Top point
+            (0, original_width),        # Bottom left
+            (original_width, original_width)      # Bottom right
+        ])
+        
+        # Add 3D shadow effect
+        shadow = pygame.Surface((original_width, 10), pygame.SRCALPHA)
+        shadow.fill((0, 0, 0, 100))  # Semi-transparent black
+        image.blit(shadow, (0, original_width - 5))
+    
+    # Scale based on z-position (perspective)
+    return pygame.transform.scale(image, (width, height))
+
+# Obstacle class - draws an ObstacleState from the simulation
 class Obstacle(pygame.sprite.Sprite):
-    def __init__(self, speed, game_speed, obstacle_type="standard"):
+    def __init__(self, state):
         super().__init__()
-        self.obstacle_type = obstacle_type
-        self.speed = speed + game_speed
-        self.z_position = 0  # Depth position (0 = closest, 1 = farthest/horizon)
-        self.original_width = 0
-        self.original_height = 0
-        
-        if obstacle_type == "standard":
-            # Create a triangular obstacle
-            self.original_width = random.randint(30, 50)
-            self.original_height = random.randint(30, 60)
-            self.image = pygame.Surface((self.original_width, self.original_height), pygame.SRCALPHA)
-            
-            # Draw a triangle
-            pygame.draw.polygon(self.image, RED, [
-                (self.original_width // 2, 0),  # Top point
-                (0, self.original_height),      # Bottom left
-                (self.original_width, self.original_height)   # Bottom right
-            ])
-            
-            # Add 3D shadow effect
-            shadow = pygame.Surface((self.original_width, 10), pygame.SRCALPHA)
-            shadow.fill((0, 0, 0, 100))  # Semi-transparent black
-            self.image.blit(shadow, (0, self.original_height - 5))
-            
-            self.rect = self.image.get_rect()
-            self.z_position = random.uniform(0.1, 0.5)  # Random depth
-            
-            # Scale based on z-position (perspective)
-            scale = 1.0 - (self.z_position * 0.5)  # Objects farther away are smaller
-            new_width = int(self.original_width * scale)
-            new_height = int(self.original_height * scale)
-            self.image = pygame.transform.scale(self.image, (new_width, new_height))
-            self.rect = self.image.get_rect()
-            
-            # Position based on z-position
-            ground_y = HORIZON_Y + (SCREEN_HEIGHT - HORIZON_Y) * self.z_position
-            self.rect.bottomleft = (SCREEN_WIDTH, ground_y)
-        
-        elif obstacle_type == "flying":
-            # Create a flying triangular obstacle
-            self.original_width = random.randint(40, 60)
-            self.original_height = random.randint(20, 40)
-            self.image = pygame.Surface((self.original_width, self.original_height), pygame.SRCALPHA)
-            
-            # Draw a triangle pointing right (like an arrow)
-            pygame.draw.polygon(self.image, ORANGE, [
-                (0, 0),           # Top left
-                (0, self.original_height),      # Bottom left
-                (self.original_width, self.original_height//2) # Right middle
-            ])
-            
-            self.rect = self.image.get_rect()
-            self.z_position = random.uniform(0.2, 0.7)  # Random depth
-            
-            # Scale based on z-position (perspective)
-            scale = 1.0 - (self.z_position * 0.5)
-            new_width = int(self.original_width * scale)
-            new_height = int(self.original_height * scale)
-            self.image = pygame.transform.scale(self.image, (new_width, new_height))
-            self.rect = self.image.get_rect()
-            
-            # Position based on z-position
-            height_offset = random.randint(50, 150)
-            ground_y = HORIZON_Y + (SCREEN_HEIGHT - HORIZON_Y) * self.z_position
-            self.rect.bottomleft = (SCREEN_WIDTH, ground_y - height_offset * scale)
-            
-            self.y_movement = random.choice([-1, 1])
-            self.y_range = random.randint(10, 30) * scale  # Scale movement range too
-            self.original_y = self.rect.y
-        
-        elif obstacle_type == "boulder":
-            # Create a triangular boulder (pyramid)
-            self.original_size = random.randint(40, 60)
-            self.image = pygame.Surface((self.original_size, self.original_size), pygame.SRCALPHA)
-            
-            # Draw a triangle
-            pygame.draw.polygon(self.image, PURPLE, [
-                (self.original_size // 2, 0),   # Top point
-                (0, self.original_size),        # Bottom left
-                (self.original_size, self.original_size)      # Bottom right
-            ])
-            
-            # Add 3D shadow effect
-            shadow = pygame.Surface((self.original_size, 10), pygame.SRCALPHA)
-            shadow.fill((0, 0, 0, 100))  # Semi-transparent black
-            self.image.blit(shadow, (0, self.original_size - 5))
-            
-            self.rect = self.image.get_rect()
-            self.z_position = random.uniform(0.1, 0.4)  # Random depth
-            
-            # Scale based on z-position (perspective)
-            scale = 1.0 - (self.z_position * 0.5)
-            new_size = int(self.original_size * scale)
-            self.image = pygame.transform.scale(self.image, (new_size, new_size))
-            self.rect = self.image.get_rect()
-            
-            # Position based on z-position
-            ground_y = HORIZON_Y + (SCREEN_HEIGHT - HORIZON_Y) * self.z_position
-            self.rect.bottomleft = (SCREEN_WIDTH, ground_y)
-            
-            self.rotation = 0
-            self.rotation_speed = random.uniform(2, 5)
-            self.original_image = self.image.copy()
+        self.state = state
+        self.obstacle_type = state.obstacle_type
+        # Flying ones bob and rotating boulders change height, moving their bottom edge
+        self.depth_changes = self.obstacle_type in ("flying", "boulder")
+        self.original_width = state.original_width
+        self.original_height = state.original_height
         
-    def update(self):
-        # Calculate speed based on z-position (closer objects move faster)
-        z_speed_factor = 1.0 - (self.z_position * 0.5)
-        effective_speed = self.speed * z_speed_factor
-        
-        self.rect.x -= effective_speed
-        
-        # Special movement patterns based on obstacle type
-        if self.obstacle_type == "flying":
-            # Oscillating up and down movement
-            self.rect.y = self.original_y + self.y_range * math.sin(pygame.time.get_ticks() * 0.005)
-        
-        elif self.obstacle_type == "boulder":
-            # Rotating triangle
-            self.rotation += self.rotation_speed
-            if self.rotation >= 360:
-                self.rotation = 0
-                
-            # Rotate the image
-            old_center = self.rect.center
-            self.image = pygame.transform.rotate(self.original_image, self.rotation)
-            self.rect = self.image.get_rect(center=old_center)
+        self.image = self.image_for(state)
+        if self.obstacle_type == "boulder":
+            self.atlas = rotation_atlas(("3d", "boulder") + obstacle_variant(state), lambda: self.image)
         
-        if self.rect.right < 0:
-            self.kill()
+        self.rect = self.image.get_rect()
+        self.update()
+    
+    @staticmethod
+    def image_for(state):
+        """Shared prototype image of an ObstacleState's variant"""
+        obstacle_type = state.obstacle_type
+        width, height, bucket = obstacle_variant(state)
+        scale = depth_scale((bucket + 0.5) / OBSTACLE_DEPTH_BUCKETS)
+        size = (int(width * scale), int(height * scale))
+        return prototype(("obstacle", obstacle_type, width, height, bucket),
+                         lambda: draw_obstacle(obstacle_type, width, height, *size))
+        
+    def update(self, alpha=1.0):
+        state = self.state
+        if self.obstacle_type == "boulder":
+            # Pick the rotated frame shared by boulders of this variant
+            x, y = state.interpolated(alpha)
+            self.image, self.rect = self.atlas.place(state.rotation, (int(x) + state.width // 2,
+                                                                      int(y) + state.height // 2))
+        else:
+            # The variant may be a little off the hitbox's size; it stands where the hitbox does
+            x, y = state.interpolated(alpha)
+            self.rect.midbottom = (int(x) + state.width // 2, int(y) + state.height)
+
+def draw_powerup(powerup_type, size, line_width):
+    image = pygame.Surface((size, size), pygame.SRCALPHA)
+    
+    # Draw a circular powerup with different colors based on type
+    if powerup_type == 'invincibility':
+        color = (0, 200, 255)  # Light blue for invincibility
+    elif powerup_type == 'score_boost':
+        color = (255, 215, 0)  # Gold for score boost
+    else:  # extra_life
+        color = (255, 100, 100)  # Light red for extra life
+        
+    # Draw the circular powerup
+    pygame.draw.circle(image, color, (size//2, size//2), size//2)
+    
+    # Add 3D effect with highlight and shadow
+    highlight = pygame.Surface((size, size), pygame.SRCALPHA)
+    shadow = pygame.Surface((size, size), pygame.SRCALPHA)
+    
+    # Create highlight (top-left quarter circle)
+    pygame.draw.circle(highlight, (255, 255, 255, 100), (size//4, size//4), size//4)
+    
+    # Create shadow (bottom-right quarter circle)
+    pygame.draw.circle(shadow, (0, 0, 0, 80), (size*3//4, size*3//4), size//4)
+    
+    # Apply highlight and shadow
+    image.blit(highlight, (0, 0))
+    image.blit(shadow, (0, 0))
+    
+    # Add a symbol inside based on type (scaled)
+    symbol_size = max(1, int(size * 0.6))
+    if powerup_type == 'invincibility':
+        # Shield symbol
+        pygame.draw.arc(image, WHITE, 
+                      (size//5, size//5, symbol_size, symbol_size), 
+                      0, math.pi, line_width)
+        pygame.draw.line(image, WHITE, 
+                       (size//5, size//2), 
+                       (size*4//5, size//2), 
+                       line_width)
+    elif powerup_type == 'score_boost':
+        # Plus symbol
+        pygame.draw.line(image, WHITE, 
+                       (size//2, size//5), 
+                       (size//2, size*4//5), 
+                       line_width)
+        pygame.draw.line(image, WHITE, 
+                       (size//5, size//2), 
+                       (size*4//5, size//2), 
+                       line_width)
+    else:  # extra_life
+        # Heart symbol (simplified)
+        heart_size = max(1, int(size//5))
+        pygame.draw.circle(image, WHITE, 
+                         (size//3, size//3), 
+                         heart_size)
+        pygame.draw.circle(image, WHITE, 
+                         (size*2//3, size//3), 
+                         heart_size)
+        pygame.draw.polygon(image, WHITE, [
+            (size//5, size//3), 
+            (size//2, size*3//4), 
+            (size*4//5, size//3)
+        ])
+    return image
 
-# PowerUp class
+# PowerUp class - draws a PowerUpState from the simulation
 class PowerUp(pygame.sprite.Sprite):
-    def __init__(self, speed, game_speed):
+    def __init__(self, state):
         super().__init__()
-        self.z_position = random.uniform(0.2, 0.6)  # Random depth
-        
-        # Scale based on z-position (perspective)
-        scale = 1.0 - (self.z_position * 0.5)
-        size = int(25 * scale)
-        
-        self.image = pygame.Surface((size, size), pygame.SRCALPHA)
+        self.state = state
+        self.type = state.type
+        self.image = self.image_for(state)
         self.rect = self.image.get_rect()
-        
-        # Position based on z-position
-        ground_y = HORIZON_Y + (SCREEN_HEIGHT - HORIZON_Y) * self.z_position
-        height_offset = random.randint(0, 100) * scale
-        self.rect.bottomleft = (SCREEN_WIDTH, ground_y - height_offset)
-        
-        self.speed = speed + game_speed
-        self.type = random.choice(['invincibility', 'score_boost', 'extra_life'])
-        
-        # Draw a circular powerup with different colors based on type
-        if self.type == 'invincibility':
-            color = (0, 200, 255)  # Light blue for invincibility
-        elif self.type == 'score_boost':
-            color = (255, 215, 0)  # Gold for score boost
-        else:  # extra_life
-            color = (255, 100, 100)  # Light red for extra life
-            
-        # Draw the circular powerup
-        pygame.draw.circle(self.image, color, (size//2, size//2), size//2)
-        
-        # Add 3D effect with highlight and shadow
-        highlight = pygame.Surface((size, size), pygame.SRCALPHA)
-        shadow = pygame.Surface((size, size), pygame.SRCALPHA)
-        
-        # Create highlight (top-left quarter circle)
-        pygame.draw.circle(highlight, (255, 255, 255, 100), (size//4, size//4), size//4)
-        
-        # Create shadow (bottom-right quarter circle)
-        pygame.draw.circle(shadow, (0, 0, 0, 80), (size*3//4, size*3//4), size//4)
-        
-        # Apply highlight and shadow
-        self.image.blit(highlight, (0, 0))
-        self.image.blit(shadow, (0, 0))
-        
-        # Add a symbol inside based on type (scaled)
-        symbol_size = max(1, int(size * 0.6))
-        if self.type == 'invincibility':
-            # Shield symbol
-            pygame.draw.arc(self.image, WHITE, 
-                          (size//5, size//5, symbol_size, symbol_size), 
-                          0, math.pi, max(1, int(2*scale)))
-            pygame.draw.line(self.image, WHITE, 
-                           (size//5, size//2), 
-                           (size*4//5, size//2), 
-                           max(1, int(2*scale)))
-        elif self.type == 'score_boost':
-            # Plus symbol
-            pygame.draw.line(self.image, WHITE, 
-                           (size//2, size//5), 
-                           (size//2, size*4//5), 
-                           max(1, int(2*scale)))
-            pygame.draw.line(self.image, WHITE, 
-                           (size//5, size//2), 
-                           (size*4//5, size//2), 
-                           max(1, int(2*scale)))
-        else:  # extra_life
-            # Heart symbol (simplified)
-            heart_size = max(1, int(size//5))
-            pygame.draw.circle(self.image, WHITE, 
-                             (size//3, size//3), 
-                             heart_size)
-            pygame.draw.circle(self.image, WHITE, 
-                             (size*2//3, size//3), 
-                             heart_size)
-            pygame.draw.polygon(self.image, WHITE, [
-                (size//5, size//3), 
-                (size//2, size*3//4), 
-                (size*4//5, size//3)
-            ])
-        
-    def update(self):
-        # Calculate speed based on z-position (closer objects move faster)
-        z_speed_factor = 1.0 - (self.z_position * 0.5)
-        effective_speed = self.speed * z_speed_factor
-        
-        self.rect.x -= effective_speed
-        if self.rect.right < 0:
-            self.kill()
+        self.update()
+    
+    @staticmethod
+    def image_for(state):
+        """Shared prototype image of a PowerUpState"""
+        size = state.size
+        line_width = max(1, int(2*depth_scale(state.z_position)))
+        return prototype(("powerup", state.type, size, line_width),
+                         lambda: draw_powerup(state.type, size, line_width))
+        
+    def update(self, alpha=1.0):
+        x, y = self.state.interpolated(alpha)
+        self.rect.topleft = (int(x), int(y))
+
+def draw_coin(size, line_width):
+    image = pygame.Surface((size, size), pygame.SRCALPHA)
+    
+    # Create a circular coin with 3D effect
+    pygame.draw.circle(image, YELLOW, (size//2, size//2), size//2)
+    
+    # Add 3D effect with highlight and shadow
+    highlight = pygame.Surface((size, size), pygame.SRCALPHA)
+    shadow = pygame.Surface((size, size), pygame.SRCALPHA)
+    
+    # Create highlight (top-left quarter circle)
+    pygame.draw.circle(highlight, (255, 255, 255, 100), (size//4, size//4), size//4)
+    
+    # Create shadow (bottom-right quarter circle)
+    pygame.draw.circle(shadow, (0, 0, 0, 80), (size*3//4, size*3//4), size//4)
+    
+    # Apply highlight and shadow
+    image.blit(highlight, (0, 0))
+    image.blit(shadow, (0, 0))
+    
+    # Draw a simple star/shine effect (scaled)
+    pygame.draw.line(image, WHITE, (size//2, size//5), (size//2, size*4//5), line_width)
+    pygame.draw.line(image, WHITE, (size//5, size//2), (size*4//5, size//2), line_width)
+    return image
+
+# The coin's pulse and spin come from a flipbook: for each pulse size, a
+# rotation atlas of the scaled coin with a frame per degree, which is what
+# the spin turns each step at the default step rate. Coins that look alike
+# share it, so a coin only picks its frame once the frames have been drawn.
+COIN_SPIN_STEPS = 360
 
-# Coin class
+def coin_look(state):
+    """(size, line width) a CoinState is drawn with"""
+    return state.original_size, max(1, int(depth_scale(state.z_position) * 1.5))
+
+# Coin class - draws a CoinState from the simulation
 class Coin(pygame.sprite.Sprite):
-    def __init__(self, speed, game_speed):
+    depth_changes = True  # The pulse moves its bottom edge
+
+    def __init__(self, state):
         super().__init__()
-        self.z_position = random.uniform(0.2, 0.7)  # Random depth
-        
-        # Scale based on z-position (perspective)
-        scale = 1.0 - (self.z_position * 0.5)
-        size = int(15 * scale)
-        
-        self.image = pygame.Surface((size, size), pygame.SRCALPHA)
+        self.state = state
+        self.look = coin_look(state)
+        self.image = self.image_for(state)
         self.rect = self.image.get_rect()
         
-        # Position based on z-position
-        ground_y = HORIZON_Y + (SCREEN_HEIGHT - HORIZON_Y) * self.z_position
-        height_offset = random.randint(20, 120) * scale
-        self.rect.bottomleft = (SCREEN_WIDTH, ground_y - height_offset)
-        
-        self.speed = speed + game_speed
-        self.value = 1
-        
-        # Animation
-        self.animation_frame = 0
-        self.animation_speed = 0.2
-        
-        # Create a circular coin with 3D effect
-        pygame.draw.circle(self.image, YELLOW, (size//2, size//2), size//2)
-        
-        # Add 3D effect with highlight and shadow
-        highlight = pygame.Surface((size, size), pygame.SRCALPHA)
-        shadow = pygame.Surface((size, size), pygame.SRCALPHA)
-        
-        # Create highlight (top-left quarter circle)
-        pygame.draw.circle(highlight, (255, 255, 255, 100), (size//4, size//4), size//4)
-        
-        # Create shadow (bottom-right quarter circle)
-        pygame.draw.circle(shadow, (0, 0, 0, 80), (size*3//4, size*3//4), size//4)
-        
-        # Apply highlight and shadow
-        self.image.blit(highlight, (0, 0))
-        self.image.blit(shadow, (0, 0))
-        
-        # Draw a simple star/shine effect (scaled)
-        line_width = max(1, int(scale * 1.5))
-        pygame.draw.line(self.image, WHITE, (size//2, size//5), (size//2, size*4//5), line_width)
-        pygame.draw.line(self.image, WHITE, (size//5, size//2), (size*4//5, size//2), line_width)
-        
-        # Store original image for animation
-        self.original_image = self.image.copy()
-        self.original_size = size
-        
-    def update(self):
-        # Calculate speed based on z-position (closer objects move faster)
-        z_speed_factor = 1.0 - (self.z_position * 0.5)
-        effective_speed = self.speed * z_speed_factor
-        
-        self.rect.x -= effective_speed
+        # Original image for animation
+        self.original_image = self.image
+        self.original_size = state.original_size
+        self.update()
+    
+    @staticmethod
+    def image_for(state):
+        """Shared prototype image of a CoinState"""
+        size, line_width = coin_look(state)
+        return prototype(("coin", size, line_width), lambda: draw_coin(size, line_width))
+    
+    def flipbook_page(self, size):
+        """Spin frames of this coin scaled to size, shared by coins that look alike"""
+        return rotation_atlas(("3d", "coin") + self.look + (size,),
+                              lambda: pygame.transform.scale(self.original_image, (size, size)),
+                              COIN_SPIN_STEPS)
         
+    def update(self, alpha=1.0):
         # Simple animation - make the coin "pulse" and rotate
-        self.animation_frame += self.animation_speed
-        scale_factor = 1.0 + 0.1 * math.sin(self.animation_frame)
-        angle = self.animation_frame * 10 % 360
+        size, angle = self.state.animation_pose()
         
-        # Create a new scaled and rotated image
-        size = int(self.original_size * scale_factor)
+        # Pick the scaled and rotated frame
         if size > 0:  # Prevent zero size
-            scaled_image = pygame.transform.scale(self.original_image, (size, size))
-            self.image = pygame.transform.rotate(scaled_image, angle)
-            
-            # Keep the center position
-            old_center = self.rect.center
-            self.rect = self.image.get_rect()
-            self.rect.center = old_center
-        
-        if self.rect.right < 0:
-            self.kill()
+            self.image = self.flipbook_page(size).frame(angle)
+            self.rect.size = self.image.get_size()
+        x, y = self.state.interpolated(alpha)
+        self.rect.topleft = (int(x), int(y))
 
-# Game class
+# Sprite class that draws each kind of simulation entity
+SPRITE_CLASSES = {"obstacle": Obstacle, "powerup": PowerUp, "coin": Coin}
+
+def warm_chunk(chunk):
+    """Job drawing the images a chunk's content will need, one per slice"""
+    for state in chunk.entities():
+        SPRITE_CLASSES[state.kind].image_for(state)
+        yield
+
+# Game class - input and rendering around a Simulation
 class Game:
-    def __init__(self):
+    def __init__(self, simulation=None, playback=None, timeline=None):
+        init_display()
         self.running = True
-        self.game_state = "title"  # title, playing, game_over, paused
-        self.score = 0
-        self.high_score = 0
-        self.coins_collected = 0
-        self.high_coins = 0
-        self.game_speed = 1
-        self.obstacle_timer = 0
-        self.powerup_timer = 0
-        self.coin_timer = 0
-        self.difficulty_level = 1
+        self.playback = playback  # InputPlayback replacing the keyboard, if replaying
+        self.timeline = timeline  # KeyframeTimeline for seeking through the replay
+        self.hash_writer = None  # HashWriter fed after every step, when checking for desyncs
+        self.autopilot = None  # Autopilot pressing jump in place of the keyboard, for soak runs
+        self.jobs = FrameJobs()  # Work done in each frame's spare time
+        self.show_jobs = False  # F3 shows the job queue's debug overlay
+        self.floor = None
+        if PerspectiveFloor is not None:
+            self.floor = PerspectiveFloor((SCREEN_WIDTH, SCREEN_HEIGHT), HORIZON_Y, ROW_SCALES)
+        self.floor_scroll = self.previous_floor_scroll = 0.0  # Texels the floor has moved
+        if simulation is None:
+            simulation = Simulation(seed_from_environment())  # Set STORM_SEED for a reproducible run
+        self.simulation = simulation
+        self.timestep = FixedTimestep(self.simulation.step_rate)
         self.font = pygame.font.SysFont(None, 36)
         self.title_font = pygame.font.SysFont(None, 72)
         self.small_font = pygame.font.SysFont(None, 24)
         
         # Create sprite groups
         self.all_sprites = pygame.sprite.Group()
-        self.obstacles = pygame.sprite.Group()
-        self.powerups = pygame.sprite.Group()
-        self.coins = pygame.sprite.Group()
-        
-        # Create player
-        self.player = Player()
-        self.player.lives = 5  # Changed from 3 to 5 for more lives
-        self.all_sprites.add(self.player)
+        self.render_queue = RenderQueue()  # Entity sprites in drawing order; the player goes on top
+        self.sprites_by_entity = {}
         
-        # Create storm progress bar
-        self.storm_progress = StormProgressBar(SCREEN_WIDTH - 260, 10, 250, 25)
+        # Create player and storm progress bar views of the simulation
+        self.simulation.add_listener(self.on_simulation_event)
+        self.on_simulation_event("reset")
         
         # Heart image for lives
         self.heart_img = pygame.Surface((25, 25), pygame.SRCALPHA)
@@ -597,27 +583,57 @@ class Game:
         except:
             print("Could not load background music")
     
+    # Simulation state shown by the HUD
+    @property
+    def game_state(self):
+        return self.simulation.game_state
+
+    @property
+    def score(self):
+        return self.simulation.score
+
+    @property
+    def high_score(self):
+        return self.simulation.high_score
+
+    @property
+    def coins_collected(self):
+        return self.simulation.coins_collected
+
+    @property
+    def high_coins(self):
+        return self.simulation.high_coins
+
+    @property
+    def game_speed(self):
+        return self.simulation.game_speed
+
+    @property
+    def difficulty_level(self):
+        return self.simulation.difficulty_level
+
+    def on_simulation_event(self, event, entity=None):
+        if event == "spawn":
+            sprite = SPRITE_CLASSES[entity.kind](entity)
+            self.sprites_by_entity[entity] = sprite
+            sprite.add(self.all_sprites, self.render_queue)
+        elif event == "despawn":
+            sprite = self.sprites_by_entity.pop(entity, None)
+            if sprite is not None:
+                sprite.kill()
+        elif event == "chunk":
+            # Draw the images the upcoming content needs in spare frame time, before it spawns
+            self.jobs.submit(warm_chunk(entity), deadline=CHUNK_WARM_FRAMES, name="warm_chunk")
+        elif event == "reset":
+            self.all_sprites.empty()
+            self.render_queue.empty()
+            self.sprites_by_entity.clear()
+            self.player = Player(self.simulation.player)
+            self.all_sprites.add(self.player)
+            self.storm_progress = StormProgressBar(SCREEN_WIDTH - 260, 10, 250, 25, self.simulation.storm)
+    
     def reset_game(self):
-        self.all_sprites.empty()
-        self.obstacles.empty()
-        self.powerups.empty()
-        self.coins.empty()
-        
-        self.player = Player()
-        self.player.lives = 5  # Changed from 3 to 5 for more lives
-        self.all_sprites.add(self.player)
-        
-        self.score = 0
-        self.coins_collected = 0
-        self.game_speed = 1
-        self.obstacle_timer = 0
-        self.powerup_timer = 0
-        self.coin_timer = 0
-        self.difficulty_level = 1
-        self.game_state = "playing"
-        
-        # Reset storm progress
-        self.storm_progress = StormProgressBar(SCREEN_WIDTH - 260, 10, 250, 25)
+        self.simulation.reset()
     
     def handle_events(self):
         for event in pygame.event.get():
@@ -627,129 +643,75 @@ class Game:
             if event.type == pygame.KEYDOWN:
                 if event.key == pygame.K_ESCAPE:
                     self.running = False
+                elif event.key == pygame.K_F3:
+                    self.show_jobs = not self.show_jobs
+                
+                # A replay supplies its own inputs
+                if self.playback is not None:
+                    if self.timeline is not None and event.key in (pygame.K_LEFT, pygame.K_RIGHT):
+                        direction = 1 if event.key == pygame.K_RIGHT else -1
+                        self.seek(self.simulation.tick + direction * SEEK_SECONDS * self.simulation.step_rate)
+                    continue
                     
                 if self.game_state == "title":
                     if event.key == pygame.K_RETURN:
-                        self.reset_game()
+                        self.simulation.apply_input(INPUT_RESTART)
                         
                 elif self.game_state == "playing":
                     if event.key == pygame.K_SPACE:
-                        self.player.jump()
+                        self.simulation.apply_input(INPUT_JUMP)
                     elif event.key == pygame.K_p:
-                        self.game_state = "paused"
+                        self.simulation.apply_input(INPUT_PAUSE)
                         
                 elif self.game_state == "paused":
                     if event.key == pygame.K_p:
-                        self.game_state = "playing"
+                        self.simulation.apply_input(INPUT_PAUSE)
                         
                 elif self.game_state == "game_over":
                     if event.key == pygame.K_RETURN:
-                        self.reset_game()
+                        self.simulation.apply_input(INPUT_RESTART)
+    
+    def export_state(self):
+        """Compact binary copy of the game state; sprites and images are not included"""
+        return export_state(self.simulation)
+    
+    def import_state(self, data):
+        """Restore an exported state; sprites come back from the image prototypes"""
+        import_state(self.simulation, data)
+        self.timestep.reset()
+    
+    def seek(self, tick):
+        """Jump to a tick of the replay from its nearest keyframe"""
+        self.simulation, self.playback = self.timeline.seek(tick, self.simulation)
+        self.timestep.reset()
     
     def update(self):
+        # One fixed simulation step; sprites catch up in draw()
+        if self.playback is not None:
+            if self.playback.finished(self.simulation):
+                self.running = False
+                return
+            self.playback.apply_due(self.simulation)
+        elif self.autopilot is not None:
+            self.autopilot.play()
+        self.simulation.step()
+        self.previous_floor_scroll = self.floor_scroll
         if self.game_state == "playing":
-            # Update all sprites
-            self.all_sprites.update()
-            
-            # Check for difficulty increase
-            new_level = 1 + self.score // 700  # Changed from 500 to 700 for slower difficulty progression
-            if new_level > self.difficulty_level:
-                self.difficulty_level = new_level
-                self.game_speed += 0.3  # Changed from 0.5 to 0.3 for smaller speed jumps
-            else:
-                # Smaller continuous speed increase
-                self.game_speed += 0.0002  # Changed from 0.0005 to 0.0002 for slower progression
-            
-            # Update storm progress
-            storm_speed = self.game_speed * 1.1  # Changed from 1.2 to 1.1 for slower storm
-            player_speed = self.game_speed
-            if not self.player.jumping:  # Player is slower when not jumping
-                player_speed *= 0.9
-            self.storm_progress.update(player_speed, storm_speed)
-            
-            # Check if storm caught up with player
-            if self.storm_progress.progress >= 100:
-                game_over = self.player.lose_life()
-                if game_over:
-                    self.game_state = "game_over"
-                    if self.score > self.high_score:
-                        self.high_score = self.score
-                    if self.coins_collected > self.high_coins:
-                        self.high_coins = self.coins_collected
-                else:
-                    # Reset storm progress after taking damage
-                    self.storm_progress.progress = 40  # Changed from 50 to 40 for more recovery time
-            
-            # Spawn obstacles - rate increases with difficulty
-            self.obstacle_timer += 1
-            spawn_rate = max(15, 80 // (self.game_speed * (1 + (self.difficulty_level * 0.08))))  # Increased base rate for fewer obstacles
-            if self.obstacle_timer >= spawn_rate:
-                if random.random() < 0.6:  # Changed from 0.7 to 0.6 for fewer obstacles
-                    # Choose obstacle type based on difficulty
-                    obstacle_types = ["standard"]
-                    if self.difficulty_level >= 2:
-                        obstacle_types.append("flying")
-                    if self.difficulty_level >= 3:
-                        obstacle_types.append("boulder")
-                    
-                    obstacle_type = random.choice(obstacle_types)
-                    obstacle = Obstacle(5, self.game_speed, obstacle_type)
-                    self.obstacles.add(obstacle)
-                    self.all_sprites.add(obstacle)
-                self.obstacle_timer = 0
-                
-            # Spawn powerups (more frequently)
-            self.powerup_timer += 1
-            if self.powerup_timer >= 120 // self.game_speed:  # Changed from 180 to 120 for more powerups
-                if random.random() < 0.4:  # Changed from 0.3 to 0.4 for more powerups
-                    powerup = PowerUp(5, self.game_speed)
-                    self.powerups.add(powerup)
-                    self.all_sprites.add(powerup)
-                self.powerup_timer = 0
-                
-            # Spawn coins
-            self.coin_timer += 1
-            if self.coin_timer >= 70 // self.game_speed:  # Changed from 90 to 70 for more coins
-                if random.random() < 0.6:  # Changed from 0.5 to 0.6 for more coins
-                    coin = Coin(5, self.game_speed)
-                    self.coins.add(coin)
-                    self.all_sprites.add(coin)
-                self.coin_timer = 0
-                
-            # Check for collisions with obstacles
-            if not self.player.invincible:
-                hits = pygame.sprite.spritecollide(self.player, self.obstacles, False)
-                if hits:
-                    game_over = self.player.lose_life()
-                    if game_over:
-                        self.game_state = "game_over"
-                        if self.score > self.high_score:
-                            self.high_score = self.score
-                        if self.coins_collected > self.high_coins:
-                            self.high_coins = self.coins_collected
-            
-            # Check for collisions with powerups
-            powerup_hits = pygame.sprite.spritecollide(self.player, self.powerups, True)
-            for powerup in powerup_hits:
-                if powerup.type == 'invincibility':
-                    self.player.make_invincible()
-                elif powerup.type == 'score_boost':
-                    self.score += 100
-                elif powerup.type == 'extra_life' and self.player.lives < 5:
-                    self.player.lives += 1
-            
-            # Check for collisions with coins
-            coin_hits = pygame.sprite.spritecollide(self.player, self.coins, True)
-            for coin in coin_hits:
-                self.coins_collected += coin.value
-                self.score += 10 * coin.value
-            
-            # Update score
-            self.score += 1
+            self.floor_scroll += (FLOOR_SPEED + self.game_speed) * self.simulation.dt
+        if self.hash_writer is not None:
+            self.hash_writer.record(self.simulation)
     
-    def draw(self):
+    def draw(self, alpha=1.0):
+        # Bring the sprites in line with the simulation, between the last two steps
+        if self.game_state == "playing":
+            self.all_sprites.update(alpha)
+            self.render_queue.resort()
+        
         # Draw 3D ground with perspective
         draw_3d_ground(screen, HORIZON_Y)
+        if self.floor is not None:
+            scroll = self.previous_floor_scroll + (self.floor_scroll - self.previous_floor_scroll) * alpha
+            self.floor.draw(screen, scroll)
         
         if self.game_state == "title":
             title_text = self.title_font.render("STORM RUNNER 3D", True, BLACK)
@@ -766,17 +728,14 @@ class Game:
             # Draw player's shadow first
             self.player.draw_shadow(screen)
             
-            # Sort sprites by their y position for proper depth rendering
-            # (objects lower on screen should be drawn on top of objects higher on screen)
-            sorted_sprites = sorted(self.all_sprites.sprites(), key=lambda sprite: sprite.rect.bottom)
-            
-            # Draw all sprites in order
-            for sprite in sorted_sprites:
-                if sprite != self.player:  # We'll draw player separately
-                    screen.blit(sprite.image, sprite.rect)
+            # Draw the entities by their y position for proper depth rendering
+            # (objects lower on screen are drawn on top of objects higher on screen)
+            self.render_queue.draw(screen)
             
             # Draw player with blinking effect when invincible
-            if self.player.invincible and self.player.invincible_timer % 10 < 5:
+            simulation = self.simulation
+            frames_left = (simulation.player.invincible_until - simulation.frame) * simulation.dt
+            if simulation.player.invincible and frames_left % 10 < 5:
                 pass  # Skip drawing player every few frames for blinking effect
             else:
                 screen.blit(self.player.image, self.player.rect)
@@ -797,7 +756,7 @@ class Game:
             self.storm_progress.draw(screen)
             
             # Draw lives (hearts)
-            for i in range(self.player.lives):
+            for i in range(self.simulation.player.lives):
                 screen.blit(self.heart_img, (SCREEN_WIDTH - 40 - (i * 30), 45))
             
             # Draw pause overlay
@@ -828,24 +787,67 @@ class Game:
             screen.blit(coins_text, (SCREEN_WIDTH//2 - coins_text.get_width()//2, SCREEN_HEIGHT//2 + 80))
             screen.blit(restart_text, (SCREEN_WIDTH//2 - restart_text.get_width()//2, SCREEN_HEIGHT//2 + 120))
         
+        # Spare frame time goes to queued work
+        self.jobs.run()
+        if self.show_jobs:
+            self.jobs.draw_overlay(screen, self.small_font, 10, SCREEN_HEIGHT - GROUND_HEIGHT - 90)
+        
         pygame.display.flip()
     
-    def run(self):
+    def run(self, full_speed=False):
+        """Play in real time, or with full_speed render one step per frame, uncapped"""
+        self.timestep.reset()
         while self.running:
             self.handle_events()
-            self.update()
-            self.draw()
-            clock.tick(FPS)
+            if full_speed:
+                self.update()
+                self.draw()
+                continue
+            for _ in range(self.timestep.advance()):
+                self.update()
+            self.draw(self.timestep.alpha)
+            clock.tick(MAX_RENDER_FPS)
 
 # Create and run the game
 if __name__ == "__main__":
+    import argparse
+    
+    parser = argparse.ArgumentParser(description="Storm Runner 3D")
+    parser.add_argument("--record", metavar="FILE", help="save this session's inputs to FILE")
+    parser.add_argument("--replay", metavar="FILE", help="play back a recorded session")
+    parser.add_argument("--full-speed", action="store_true", help="replay as fast as frames can be drawn")
+    parser.add_argument("--headless", action="store_true", help="replay without rendering and print the result")
+    parser.add_argument("--hashes", metavar="FILE", help="write per-step state hashes to FILE (see state_hash.py)")
+    parser.add_argument("--autopilot", action="store_true", help="let the bot play, restarting after each game over")
+    args = parser.parse_args()
+    
+    recording = Recording.load(args.replay) if args.replay else None
+    if recording is not None and args.headless:
+        simulation = play_headless(recording)
+        print(f"Score: {simulation.score} | High score: {simulation.high_score} | Ticks: {simulation.tick}")
+        sys.exit()
+    
     # Create assets directories if they don't exist
     os.makedirs(os.path.join('assets', 'images'), exist_ok=True)
     os.makedirs(os.path.join('assets', 'sounds'), exist_ok=True)
     os.makedirs(os.path.join('assets', 'music'), exist_ok=True)
     
-    game = Game()
-    game.run()
+    if recording is not None:
+        timeline = KeyframeTimeline(recording).build()
+        game = Game(new_simulation(recording), InputPlayback(recording), timeline)
+    else:
+        game = Game()
+    recorder = InputRecorder(game.simulation) if args.record else None
+    if args.hashes:
+        game.hash_writer = HashWriter(args.hashes)
+    if args.autopilot and recording is None:
+        game.autopilot = Autopilot(game.simulation)
+    game.run(full_speed=args.full_speed)
+    
+    if recorder is not None:
+        recorder.finish().save(args.record)
+    if game.hash_writer is not None:
+        game.hash_writer.close()
     
     pygame.quit()
     sys.exit()
@@ -1,9 +1,12 @@
 import pygame
-import random
 import sys
 import os
 import math
 from pygame import mixer
+from game_loop import FixedTimestep, SpriteInterpolator
+from rng_streams import gameplay
+from jump_reach import sprite_reach
+from scheduler import Scheduler
 
 # Initialize pygame
 pygame.init()
@@ -13,7 +16,8 @@ pygame.init()
 SCREEN_WIDTH = 1024
 SCREEN_HEIGHT = 600
 GROUND_HEIGHT = 60
-FPS = 60
+FPS = 60  # Rate the rules are written for, and the rate they step at
+MAX_RENDER_FPS = 240  # Sprites are drawn between steps, so any refresh rate up to this works
 
 # Colors
 WHITE = (255, 255, 255)
@@ -52,14 +56,17 @@ class StormProgressBar:
         # Cap progress at 100
         self.progress = min(100, self.progress)
         
-    def draw(self, surface):
+    def draw(self, surface, offset=(0, 0)):
+        # Where the bar goes on surface, which starts at offset on the screen
+        rect = self.rect.move(-offset[0], -offset[1])
+        
         # Draw background
-        pygame.draw.rect(surface, DARK_GRAY, self.rect)
+        pygame.draw.rect(surface, DARK_GRAY, rect)
         
         # Draw progress
         if self.progress > 0:
-            fill_width = int((self.progress / 100) * self.rect.width)
-            fill_rect = pygame.Rect(self.rect.x, self.rect.y, fill_width, self.rect.height)
+            fill_width = int((self.progress / 100) * rect.width)
+            fill_rect = pygame.Rect(rect.x, rect.y, fill_width, rect.height)
             
             # Color changes based on progress
             if self.progress < 50:
@@ -72,18 +79,43 @@ class StormProgressBar:
             pygame.draw.rect(surface, color, fill_rect)
             
         # Draw border
-        pygame.draw.rect(surface, WHITE, self.rect, 2)
+        pygame.draw.rect(surface, WHITE, rect, 2)
         
         # Draw "STORM" label
         font = pygame.font.SysFont(None, 24)
         text = font.render("STORM", True, WHITE)
-        text_rect = text.get_rect(midleft=(self.rect.x + 5, self.rect.centery))
+        text_rect = text.get_rect(midleft=(rect.x + 5, rect.centery))
         surface.blit(text, text_rect)
 
+# Part of the HUD for dirty-rect drawing: only re-rendered, and only redrawn
+# on screen, when the value it shows changes
+class HudSprite(pygame.sprite.DirtySprite):
+    def __init__(self, rect, render):
+        super().__init__()
+        self.rect = pygame.Rect(rect)
+        self.render = render  # render(image, value) draws value onto an image the size of rect
+        self.image = pygame.Surface(self.rect.size, pygame.SRCALPHA)
+        self.value = None
+        self.dirty = 0
+        
+    def show(self, value):
+        if value != self.value:
+            self.value = value
+            self.image.fill((0, 0, 0, 0))
+            self.render(self.image, value)
+            self.dirty = 1
+
 # Player class
-class Player(pygame.sprite.Sprite):
-    def __init__(self):
+class Player(pygame.sprite.DirtySprite):
+    # Jump physics per frame, read by sprite_reach() to keep spawns clearable
+    jump_velocity = -15
+    double_jump_velocity = -13
+    gravity = 0.8
+
+    def __init__(self, scheduler):
         super().__init__()
+        self.scheduler = scheduler  # The game's clock, advanced once per playing frame
+        self.dirty = 2  # Redrawn every frame in dirty-rect mode
         self.image = pygame.Surface((30, 50))
         self.image.fill(BLUE)
         self.rect = self.image.get_rect()
@@ -93,13 +125,18 @@ class Player(pygame.sprite.Sprite):
         self.double_jump_available = True
         self.score = 0
         self.invincible = False
-        self.invincible_timer = 0
+        self.invincible_end = None  # Scheduled end of the invincibility
         self.lives = 3
         self.coins = 0
         
+    @property
+    def invincible_timer(self):
+        """Frames of invincibility left"""
+        return self.scheduler.remaining(self.invincible_end)
+        
     def update(self):
         # Gravity
-        self.velocity_y += 0.8
+        self.velocity_y += self.gravity
         self.rect.y += self.velocity_y
         
         # Check if on ground
@@ -108,24 +145,23 @@ class Player(pygame.sprite.Sprite):
             self.velocity_y = 0
             self.jumping = False
             self.double_jump_available = True
-            
-        # Invincibility timer
-        if self.invincible:
-            self.invincible_timer -= 1
-            if self.invincible_timer <= 0:
-                self.invincible = False
     
     def jump(self):
         if not self.jumping:
-            self.velocity_y = -15
+            self.velocity_y = self.jump_velocity
             self.jumping = True
         elif self.double_jump_available:
-            self.velocity_y = -13
+            self.velocity_y = self.double_jump_velocity
             self.double_jump_available = False
             
     def make_invincible(self, duration=180):  # 3 seconds at 60 FPS
         self.invincible = True
-        self.invincible_timer = duration
+        if self.invincible_end is not None:
+            self.invincible_end.cancel()
+        self.invincible_end = self.scheduler.schedule(duration, self.end_invincibility)
+        
+    def end_invincibility(self):
+        self.invincible = False
         
     def lose_life(self):
         if not self.invincible:
@@ -136,17 +172,16 @@ class Player(pygame.sprite.Sprite):
 
 # Game class
 class Game:
-    def __init__(self):
+    def __init__(self, dirty_rects=False):
         self.running = True
+        self.dirty_rects = dirty_rects  # Redraw and push only the parts of the screen that changed
         self.game_state = "title"  # title, playing, game_over, paused
         self.score = 0
         self.high_score = 0
         self.coins_collected = 0
         self.high_coins = 0
         self.game_speed = 1
-        self.obstacle_timer = 0
-        self.powerup_timer = 0
-        self.coin_timer = 0
+        self.scheduler = Scheduler()  # Spawns and countdowns, advanced only while playing
         self.difficulty_level = 1
         self.font = pygame.font.SysFont(None, 36)
         self.title_font = pygame.font.SysFont(None, 72)
@@ -154,13 +189,22 @@ class Game:
         
         # Create sprite groups
         self.all_sprites = pygame.sprite.Group()
+        self.interpolator = SpriteInterpolator()  # Draws the sprites between the last two steps
         self.obstacles = pygame.sprite.Group()
         self.powerups = pygame.sprite.Group()
         self.coins = pygame.sprite.Group()
         
+        # Dirty-rect mode: moving sprites and the HUD in layers over a fixed background
+        self.layers = pygame.sprite.LayeredDirty()
+        self.background = pygame.Surface((SCREEN_WIDTH, SCREEN_HEIGHT)).convert()
+        self.background.fill(WHITE)
+        pygame.draw.rect(self.background, GRAY, (0, SCREEN_HEIGHT - GROUND_HEIGHT, SCREEN_WIDTH, GROUND_HEIGHT))
+        self.layers.clear(screen, self.background)
+        self.drawn_state = None  # Screen shown by the last full redraw
+        
         # Create player
-        self.player = Player()
-        self.all_sprites.add(self.player)
+        self.player = Player(self.scheduler)
+        self.add_sprite(self.player)
         
         # Create storm progress bar
         self.storm_progress = StormProgressBar(SCREEN_WIDTH - 260, 10, 250, 25)
@@ -177,26 +221,57 @@ class Game:
         except:
             print("Could not load background music")
     
+    def add_sprite(self, sprite, *groups):
+        """Add sprite to the game and to groups"""
+        sprite.add(self.all_sprites, *groups)
+        if self.dirty_rects:
+            self.layers.add(sprite, layer=0)
+    
+    def build_hud(self):
+        # HUD sprites drawn over everything else in dirty-rect mode
+        def text(font):
+            return lambda image, value: image.blit(font.render(value, True, BLACK), (0, 0))
+        
+        def storm_bar(image, fill_width):
+            self.storm_progress.draw(image, self.storm_progress.rect.topleft)
+        
+        def hearts(image, lives):
+            for i in range(lives):
+                image.blit(self.heart_img, (image.get_width() - 40 - (i * 30), 0))
+        
+        self.score_hud = HudSprite((10, 10, 400, 40), text(self.font))
+        self.coins_hud = HudSprite((10, 50, 400, 40), text(self.font))
+        self.speed_hud = HudSprite((10, 90, 400, 30), text(self.small_font))
+        self.storm_hud = HudSprite(self.storm_progress.rect, storm_bar)
+        self.lives_hud = HudSprite((0, 45, SCREEN_WIDTH, 25), hearts)
+        self.layers.add(self.score_hud, self.coins_hud, self.speed_hud, self.storm_hud, self.lives_hud, layer=1)
+    
     def reset_game(self):
         self.all_sprites.empty()
+        self.interpolator.forget()
         self.obstacles.empty()
         self.powerups.empty()
         self.coins.empty()
+        self.layers.empty()
+        
+        self.scheduler = Scheduler()  # Drops the last game's pending timers
         
-        self.player = Player()
-        self.all_sprites.add(self.player)
+        self.player = Player(self.scheduler)
+        self.add_sprite(self.player)
         
         self.score = 0
         self.coins_collected = 0
         self.game_speed = 1
-        self.obstacle_timer = 0
-        self.powerup_timer = 0
-        self.coin_timer = 0
         self.difficulty_level = 1
         self.game_state = "playing"
+        self.schedule_obstacle()
+        self.schedule_powerup()
+        self.schedule_coin()
         
         # Reset storm progress
         self.storm_progress = StormProgressBar(SCREEN_WIDTH - 210, 10, 200, 20)
+        if self.dirty_rects:
+            self.build_hud()
     
     def handle_events(self):
         for event in pygame.event.get():
@@ -225,8 +300,48 @@ class Game:
                     if event.key == pygame.K_RETURN:
                         self.reset_game()
     
+    def schedule_obstacle(self):
+        # Spawn obstacles - rate increases with difficulty
+        spawn_rate = max(10, 60 // (self.game_speed * (1 + (self.difficulty_level * 0.1))))
+        self.scheduler.schedule(spawn_rate, self.spawn_obstacle)
+    
+    def spawn_obstacle(self):
+        if gameplay.random() < 0.7:  # 70% chance to spawn obstacle
+            obstacle = Obstacle(5, self.game_speed)
+            # Never a pattern no jump gets through
+            reach = sprite_reach(self.player, SCREEN_HEIGHT - GROUND_HEIGHT)
+            if reach.sprites_possible(obstacle, self.obstacles):
+                self.add_sprite(obstacle, self.obstacles)
+        self.schedule_obstacle()
+    
+    def schedule_powerup(self):
+        # Spawn powerups (less frequently)
+        spawn_rate = 180 // self.game_speed
+        self.scheduler.schedule(spawn_rate, self.spawn_powerup)
+    
+    def spawn_powerup(self):
+        if gameplay.random() < 0.3:  # 30% chance to spawn powerup
+            powerup = PowerUp(5, self.game_speed)
+            self.add_sprite(powerup, self.powerups)
+        self.schedule_powerup()
+    
+    def schedule_coin(self):
+        # Spawn coins
+        spawn_rate = 90 // self.game_speed
+        self.scheduler.schedule(spawn_rate, self.spawn_coin)
+    
+    def spawn_coin(self):
+        if gameplay.random() < 0.5:  # 50% chance to spawn coin
+            coin = Coin(5, self.game_speed)
+            self.add_sprite(coin, self.coins)
+        self.schedule_coin()
+    
     def update(self):
+        self.interpolator.remember(self.all_sprites)
         if self.game_state == "playing":
+            # Timers only count playing frames, so pausing freezes them
+            self.scheduler.advance()
+            
             # Update all sprites
             self.all_sprites.update()
             
@@ -259,34 +374,6 @@ class Game:
                     # Reset storm progress after taking damage
                     self.storm_progress.progress = 50
             
-            # Spawn obstacles - rate increases with difficulty
-            self.obstacle_timer += 1
-            spawn_rate = max(10, 60 // (self.game_speed * (1 + (self.difficulty_level * 0.1))))
-            if self.obstacle_timer >= spawn_rate:
-                if random.random() < 0.7:  # 70% chance to spawn obstacle
-                    obstacle = Obstacle(5, self.game_speed)
-                    self.obstacles.add(obstacle)
-                    self.all_sprites.add(obstacle)
-                self.obstacle_timer = 0
-                
-            # Spawn powerups (less frequently)
-            self.powerup_timer += 1
-            if self.powerup_timer >= 180 // self.game_speed:
-                if random.random() < 0.3:  # 30% chance to spawn powerup
-                    powerup = PowerUp(5, self.game_speed)
-                    self.powerups.add(powerup)
-                    self.all_sprites.add(powerup)
-                self.powerup_timer = 0
-                
-            # Spawn coins
-            self.coin_timer += 1
-            if self.coin_timer >= 90 // self.game_speed:
-                if random.random() < 0.5:  # 50% chance to spawn coin
-                    coin = Coin(5, self.game_speed)
-                    self.coins.add(coin)
-                    self.all_sprites.add(coin)
-                self.coin_timer = 0
-                
             # Check for collisions with obstacles
             if not self.player.invincible:
                 hits = pygame.sprite.spritecollide(self.player, self.obstacles, False)
@@ -318,7 +405,41 @@ class Game:
             # Update score
             self.score += 1
     
-    def draw(self):
+    def draw_dirty(self, alpha=1.0):
+        """Redraw only what moved or changed, and push just those rectangles"""
+        full = self.drawn_state != "playing"
+        if full:
+            # Back from a full-screen page: everything has to go up once
+            screen.blit(self.background, (0, 0))
+            self.layers.repaint_rect(screen.get_rect())
+            self.drawn_state = "playing"
+        
+        self.score_hud.show(f"Score: {self.score}")
+        self.coins_hud.show(f"Coins: {self.coins_collected}")
+        self.speed_hud.show(f"Speed: {self.game_speed:.1f}x | Level: {self.difficulty_level}")
+        self.storm_hud.show(int((self.storm_progress.progress / 100) * self.storm_progress.rect.width))
+        self.lives_hud.show(self.player.lives)
+        
+        # Blink when invincible by hiding the player every few frames
+        self.player.visible = not (self.player.invincible and self.player.invincible_timer % 10 < 5)
+        
+        moved = self.interpolator.place(self.all_sprites, alpha)
+        rects = self.layers.draw(screen)
+        self.interpolator.restore(moved)
+        if full:
+            pygame.display.flip()
+        else:
+            pygame.display.update(rects)
+    
+    def draw(self, alpha=1.0):
+        if self.dirty_rects:
+            if self.game_state == "playing":
+                self.draw_dirty(alpha)
+                return
+            if self.game_state == self.drawn_state:
+                return  # Title, pause and game over pages do not change
+            self.drawn_state = self.game_state
+        
         screen.fill(WHITE)
         
         # Draw ground
@@ -336,7 +457,8 @@ class Game:
             screen.blit(pause_text, (SCREEN_WIDTH//2 - pause_text.get_width()//2, SCREEN_HEIGHT//2 + 90))
             
         elif self.game_state == "playing" or self.game_state == "paused":
-            # Draw all sprites
+            # Draw all sprites, part of the way through the last step
+            moved = self.interpolator.place(self.all_sprites, alpha)
             self.all_sprites.draw(screen)
             
             # Draw player with blinking effect when invincible
@@ -345,6 +467,8 @@ class Game:
             else:
                 screen.blit(self.player.image, self.player.rect)
             
+            self.interpolator.restore(moved)
+            
             # Draw score
             score_text = self.font.render(f"Score: {self.score}", True, BLACK)
             screen.blit(score_text, (10, 10))
@@ -395,23 +519,28 @@ class Game:
         pygame.display.flip()
     
     def run(self):
+        # The rules step at a fixed FPS; a slow frame catches up instead of slowing the game,
+        # and frames are drawn as often as the display allows
+        timestep = FixedTimestep(FPS)
         while self.running:
             self.handle_events()
-            self.update()
-            self.draw()
-            clock.tick(FPS)
+            for _ in range(timestep.advance()):
+                self.update()
+            self.draw(timestep.alpha)
+            clock.tick(MAX_RENDER_FPS)
 
 # Obstacle class
-class Obstacle(pygame.sprite.Sprite):
+class Obstacle(pygame.sprite.DirtySprite):
     def __init__(self, speed, game_speed):
         super().__init__()
-        self.height = random.randint(20, 50)
-        self.width = random.randint(20, 40)
+        self.height = gameplay.randint(20, 50)
+        self.width = gameplay.randint(20, 40)
         self.image = pygame.Surface((self.width, self.height))
         self.image.fill(RED)
         self.rect = self.image.get_rect()
         self.rect.bottomleft = (SCREEN_WIDTH, SCREEN_HEIGHT - GROUND_HEIGHT)
         self.speed = speed + game_speed
+        self.dirty = 2  # Moves every frame
         
     def update(self):
         self.rect.x -= self.speed
@@ -419,15 +548,16 @@ class Obstacle(pygame.sprite.Sprite):
             self.kill()
 
 # PowerUp class
-class PowerUp(pygame.sprite.Sprite):
+class PowerUp(pygame.sprite.DirtySprite):
     def __init__(self, speed, game_speed):
         super().__init__()
         self.image = pygame.Surface((25, 25))
         self.image.fill(GREEN)
         self.rect = self.image.get_rect()
-        self.rect.bottomleft = (SCREEN_WIDTH, SCREEN_HEIGHT - GROUND_HEIGHT - random.randint(0, 100))
+        self.rect.bottomleft = (SCREEN_WIDTH, SCREEN_HEIGHT - GROUND_HEIGHT - gameplay.randint(0, 100))
         self.speed = speed + game_speed
-        self.type = random.choice(['invincibility', 'score_boost', 'extra_life'])
+        self.dirty = 2  # Moves every frame
+        self.type = gameplay.choice(['invincibility', 'score_boost', 'extra_life'])
         
     def update(self):
         self.rect.x -= self.speed
@@ -435,14 +565,15 @@ class PowerUp(pygame.sprite.Sprite):
             self.kill()
 
 # Coin class
-class Coin(pygame.sprite.Sprite):
+class Coin(pygame.sprite.DirtySprite):
     def __init__(self, speed, game_speed):
         super().__init__()
         self.image = pygame.Surface((15, 15))
         self.image.fill(YELLOW)
         self.rect = self.image.get_rect()
-        self.rect.bottomleft = (SCREEN_WIDTH, SCREEN_HEIGHT - GROUND_HEIGHT - random.randint(20, 120))
+        self.rect.bottomleft = (SCREEN_WIDTH, SCREEN_HEIGHT - GROUND_HEIGHT - gameplay.randint(20, 120))
         self.speed = speed + game_speed
+        self.dirty = 2  # Moves every frame
         self.value = 1
         
     def update(self):
@@ -457,7 +588,14 @@ if __name__ == "__main__":
     os.makedirs(os.path.join('assets', 'sounds'), exist_ok=True)
     os.makedirs(os.path.join('assets', 'music'), exist_ok=True)
     
-    game = Game()
+    import argparse
+    
+    parser = argparse.ArgumentParser(description="Storm Runner Enhanced")
+    parser.add_argument("--dirty-rects", action="store_true",
+                        help="redraw and update only the changed parts of the screen (for slow machines)")
+    args = parser.parse_args()
+    
+    game = Game(dirty_rects=args.dirty_rects)
     game.run()
     
     pygame.quit()
@@ -3,6 +3,10 @@ import sys
 import os
 from menu_system import MenuSystem
 from storm_runner_enhanced import Game
+from game_loop import FixedTimestep
+from storm_simulation import INPUT_JUMP, INPUT_PAUSE, INPUT_RESTART
+from replay import Recording
+import rng_streams
 
 # Initialize pygame
 pygame.init()
@@ -12,6 +16,7 @@ pygame.init()
 SCREEN_WIDTH = 1024
 SCREEN_HEIGHT = 600
 FPS = 60
+MAX_RENDER_FPS = 240  # The game draws its sprites between steps, so any refresh rate up to this works
 
 # Create the screen
 screen = pygame.display.set_mode((SCREEN_WIDTH, SCREEN_HEIGHT))
@@ -27,8 +32,41 @@ os.makedirs(os.path.join('assets', 'music'), exist_ok=True)
 MENU = 0
 PLAYING = 1
 
+# Keys the game reacts to while playing, as recordable inputs
+INPUT_KEYS = {pygame.K_SPACE: INPUT_JUMP, pygame.K_p: INPUT_PAUSE, pygame.K_RETURN: INPUT_RESTART}
+
+def apply_input(game, code):
+    """Apply a live or recorded input to the game"""
+    if code == INPUT_JUMP:
+        game.player.jump()
+    elif code == INPUT_PAUSE:
+        if game.game_state == "playing":
+            game.game_state = "paused"
+        elif game.game_state == "paused":
+            game.game_state = "playing"
+    elif code == INPUT_RESTART and game.game_state == "game_over":
+        game.reset_game()
+
+def start_session(game, seed=None):
+    """Reseed the gameplay streams and start a fresh game; returns the seed used"""
+    rng_streams.seed_session(seed)
+    game.reset_game()
+    return rng_streams.session.session_seed
+
+def session_path(path, session):
+    """File for a run's session'th recording: path, then path with -2, -3, ... before the extension"""
+    if session == 1:
+        return path
+    root, extension = os.path.splitext(path)
+    return f"{root}-{session}{extension}"
+
+def save_recording(recording, length, path):
+    """Write out a finished session's recording"""
+    recording.length = length
+    recording.save(path)
+
 # Main function
-def main():
+def main(record_path=None, replay_path=None):
     # Create menu system
     menu = MenuSystem(SCREEN_WIDTH, SCREEN_HEIGHT)
     
@@ -38,9 +76,25 @@ def main():
     # Set initial state
     current_state = MENU
     
+    # Inputs of the current session, stamped with the game step they precede
+    recording = None
+    sessions = 0  # Sessions started from the menu, each recorded to its own file
+    playback = None
+    playback_index = 0
+    tick = 0
+    if replay_path:
+        playback = Recording.load(replay_path)
+        start_session(game, playback.seed)
+        current_state = PLAYING
+    
+    # Game rules step at a fixed FPS, independent of how long frames take or how often they are drawn
+    timestep = FixedTimestep(FPS)
+    
     # Main game loop
     running = True
     while running:
+        steps = timestep.advance()
+        
         # Handle events
         events = pygame.event.get()
         for event in events:
@@ -54,7 +108,11 @@ def main():
             
             if action == "play":
                 current_state = PLAYING
-                game.reset_game()
+                seed = start_session(game)
+                tick = 0
+                sessions += 1
+                if record_path:
+                    recording = Recording(seed, FPS)
                 # Apply menu settings to the game
                 try:
                     pygame.mixer.music.set_volume(menu.get_volume())
@@ -75,24 +133,34 @@ def main():
                 if event.type == pygame.KEYDOWN:
                     if event.key == pygame.K_ESCAPE and game.game_state == "game_over":
                         game_over_escape = True
-                    elif event.key == pygame.K_SPACE:
-                        game.player.jump()
-                    elif event.key == pygame.K_p:
-                        if game.game_state == "playing":
-                            game.game_state = "paused"
-                        elif game.game_state == "paused":
-                            game.game_state = "playing"
-                    elif event.key == pygame.K_RETURN and game.game_state == "game_over":
-                        game.reset_game()
+                    elif event.key in INPUT_KEYS and playback is None:
+                        code = INPUT_KEYS[event.key]
+                        apply_input(game, code)
+                        if recording is not None:
+                            recording.add(tick, code)
             
             if game_over_escape:
                 current_state = MENU
+                if recording is not None:
+                    save_recording(recording, tick, session_path(record_path, sessions))
+                    recording = None
+                playback = None  # A replay ends with its session; Play from the menu is live
             
             # Update game (but don't call game.handle_events() again)
-            game.update()
+            for _ in range(steps):
+                if playback is not None:
+                    while (playback_index < len(playback.events) and
+                           playback.events[playback_index][0] <= tick):
+                        apply_input(game, playback.events[playback_index][1])
+                        playback_index += 1
+                    if tick >= playback.length:
+                        running = False
+                        break
+                game.update()
+                tick += 1
             
             # Draw game
-            game.draw()
+            game.draw(timestep.alpha)
             
             # Check if game over to return to menu
             if game.game_state == "game_over":
@@ -104,11 +172,19 @@ def main():
         
         # Update display
         pygame.display.update()
-        clock.tick(FPS)
+        clock.tick(MAX_RENDER_FPS)
     
     # Clean up
+    if recording is not None:
+        save_recording(recording, tick, session_path(record_path, sessions))
     pygame.quit()
     sys.exit()
 
 if __name__ == "__main__":
-    main()
+    import argparse
+    
+    parser = argparse.ArgumentParser(description="Storm Runner")
+    parser.add_argument("--record", metavar="FILE", help="save each session's inputs: the first to FILE, later ones to FILE-2, FILE-3, ...")
+    parser.add_argument("--replay", metavar="FILE", help="play back a recorded session")
+    args = parser.parse_args()
+    main(args.record, args.replay)
@@ -1,9 +1,13 @@
 import pygame
-import random
 import sys
 import os
 import math
 from pygame import mixer
+from game_loop import FixedTimestep, SpriteInterpolator
+from rng_streams import gameplay
+from jump_reach import sprite_reach
+from scheduler import Scheduler
+from rotation_atlas import rotation_atlas
 
 # Initialize pygame
 pygame.init()
@@ -13,7 +17,8 @@ pygame.init()
 SCREEN_WIDTH = 1024
 SCREEN_HEIGHT = 600
 GROUND_HEIGHT = 60
-FPS = 60
+FPS = 60  # Rate the rules are written for, and the rate they step at
+MAX_RENDER_FPS = 240  # Sprites are drawn between steps, so any refresh rate up to this works
 
 # Colors
 WHITE = (255, 255, 255)
@@ -82,8 +87,14 @@ class StormProgressBar:
 
 # Player class
 class Player(pygame.sprite.Sprite):
-    def __init__(self):
+    # Jump physics per frame, read by sprite_reach() to keep spawns clearable
+    jump_velocity = -18  # Changed from -15 to -18 for higher jumps
+    double_jump_velocity = -16  # Changed from -13 to -16 for higher double jumps
+    gravity = 0.8
+
+    def __init__(self, scheduler):
         super().__init__()
+        self.scheduler = scheduler  # The game's clock, advanced once per playing frame
         self.image = pygame.Surface((30, 50))
         self.image.fill(BLUE)
         self.rect = self.image.get_rect()
@@ -93,13 +104,18 @@ class Player(pygame.sprite.Sprite):
         self.double_jump_available = True
         self.score = 0
         self.invincible = False
-        self.invincible_timer = 0
+        self.invincible_end = None  # Scheduled end of the invincibility
         self.lives = 3
         self.coins = 0
         
+    @property
+    def invincible_timer(self):
+        """Frames of invincibility left"""
+        return self.scheduler.remaining(self.invincible_end)
+        
     def update(self):
         # Gravity
-        self.velocity_y += 0.8
+        self.velocity_y += self.gravity
         self.rect.y += self.velocity_y
         
         # Check if on ground
@@ -108,24 +124,23 @@ class Player(pygame.sprite.Sprite):
             self.velocity_y = 0
             self.jumping = False
             self.double_jump_available = True
-            
-        # Invincibility timer
-        if self.invincible:
-            self.invincible_timer -= 1
-            if self.invincible_timer <= 0:
-                self.invincible = False
     
     def jump(self):
         if not self.jumping:
-            self.velocity_y = -18  # Changed from -15 to -18 for higher jumps
+            self.velocity_y = self.jump_velocity
             self.jumping = True
         elif self.double_jump_available:
-            self.velocity_y = -16  # Changed from -13 to -16 for higher double jumps
+            self.velocity_y = self.double_jump_velocity
             self.double_jump_available = False
             
     def make_invincible(self, duration=240):  # Changed from 180 to 240 for longer invincibility
         self.invincible = True
-        self.invincible_timer = duration
+        if self.invincible_end is not None:
+            self.invincible_end.cancel()
+        self.invincible_end = self.scheduler.schedule(duration, self.end_invincibility)
+        
+    def end_invincibility(self):
+        self.invincible = False
         
     def lose_life(self):
         if not self.invincible:
@@ -143,8 +158,8 @@ class Obstacle(pygame.sprite.Sprite):
         
         if obstacle_type == "standard":
             # Create a triangular obstacle
-            height = random.randint(30, 60)
-            width = random.randint(30, 50)
+            height = gameplay.randint(30, 60)
+            width = gameplay.randint(30, 50)
             self.image = pygame.Surface((width, height), pygame.SRCALPHA)
             
             # Draw a triangle
@@ -159,8 +174,8 @@ class Obstacle(pygame.sprite.Sprite):
         
         elif obstacle_type == "flying":
             # Create a flying triangular obstacle
-            height = random.randint(20, 40)
-            width = random.randint(40, 60)
+            height = gameplay.randint(20, 40)
+            width = gameplay.randint(40, 60)
             self.image = pygame.Surface((width, height), pygame.SRCALPHA)
             
             # Draw a triangle pointing right (like an arrow)
@@ -171,15 +186,15 @@ class Obstacle(pygame.sprite.Sprite):
             ])
             
             self.rect = self.image.get_rect()
-            height_offset = random.randint(50, 150)
+            height_offset = gameplay.randint(50, 150)
             self.rect.bottomleft = (SCREEN_WIDTH, SCREEN_HEIGHT - GROUND_HEIGHT - height_offset)
-            self.y_movement = random.choice([-1, 1])
-            self.y_range = random.randint(10, 30)
+            self.y_movement = gameplay.choice([-1, 1])
+            self.y_range = gameplay.randint(10, 30)
             self.original_y = self.rect.y
         
         elif obstacle_type == "boulder":
             # Create a triangular boulder (pyramid)
-            size = random.randint(40, 60)
+            size = gameplay.randint(40, 60)
             self.image = pygame.Surface((size, size), pygame.SRCALPHA)
             
             # Draw a triangle
@@ -192,8 +207,9 @@ class Obstacle(pygame.sprite.Sprite):
             self.rect = self.image.get_rect()
             self.rect.bottomleft = (SCREEN_WIDTH, SCREEN_HEIGHT - GROUND_HEIGHT)
             self.rotation = 0
-            self.rotation_speed = random.uniform(2, 5)
-            self.original_image = self.image.copy()
+            self.rotation_speed = gameplay.uniform(2, 5)
+            self.original_image = self.image
+            self.atlas = rotation_atlas(("triangles", "boulder", size), lambda: self.image)
         
     def update(self):
         self.rect.x -= self.speed
@@ -209,10 +225,8 @@ class Obstacle(pygame.sprite.Sprite):
             if self.rotation >= 360:
                 self.rotation = 0
                 
-            # Rotate the image
-            old_center = self.rect.center
-            self.image = pygame.transform.rotate(self.original_image, self.rotation)
-            self.rect = self.image.get_rect(center=old_center)
+            # Pick the rotated frame shared by boulders of this size
+            self.image, self.rect = self.atlas.place(self.rotation, self.rect.center)
         
         if self.rect.right < 0:
             self.kill()
@@ -223,9 +237,9 @@ class PowerUp(pygame.sprite.Sprite):
         super().__init__()
         self.image = pygame.Surface((25, 25), pygame.SRCALPHA)
         self.rect = self.image.get_rect()
-        self.rect.bottomleft = (SCREEN_WIDTH, SCREEN_HEIGHT - GROUND_HEIGHT - random.randint(0, 100))
+        self.rect.bottomleft = (SCREEN_WIDTH, SCREEN_HEIGHT - GROUND_HEIGHT - gameplay.randint(0, 100))
         self.speed = speed + game_speed
-        self.type = random.choice(['invincibility', 'score_boost', 'extra_life'])
+        self.type = gameplay.choice(['invincibility', 'score_boost', 'extra_life'])
         
         # Draw a circular powerup with different colors based on type
         if self.type == 'invincibility':
@@ -264,7 +278,7 @@ class Coin(pygame.sprite.Sprite):
         super().__init__()
         self.image = pygame.Surface((15, 15), pygame.SRCALPHA)
         self.rect = self.image.get_rect()
-        self.rect.bottomleft = (SCREEN_WIDTH, SCREEN_HEIGHT - GROUND_HEIGHT - random.randint(20, 120))
+        self.rect.bottomleft = (SCREEN_WIDTH, SCREEN_HEIGHT - GROUND_HEIGHT - gameplay.randint(20, 120))
         self.speed = speed + game_speed
         self.value = 1
         
@@ -302,9 +316,7 @@ class Game:
         self.coins_collected = 0
         self.high_coins = 0
         self.game_speed = 1
-        self.obstacle_timer = 0
-        self.powerup_timer = 0
-        self.coin_timer = 0
+        self.scheduler = Scheduler()  # Spawns and countdowns, advanced only while playing
         self.difficulty_level = 1
         self.font = pygame.font.SysFont(None, 36)
         self.title_font = pygame.font.SysFont(None, 72)
@@ -312,12 +324,13 @@ class Game:
         
         # Create sprite groups
         self.all_sprites = pygame.sprite.Group()
+        self.interpolator = SpriteInterpolator()  # Draws the sprites between the last two steps
         self.obstacles = pygame.sprite.Group()
         self.powerups = pygame.sprite.Group()
         self.coins = pygame.sprite.Group()
         
         # Create player
-        self.player = Player()
+        self.player = Player(self.scheduler)
         self.player.lives = 5  # Changed from 3 to 5 for more lives
         self.all_sprites.add(self.player)
         
@@ -344,22 +357,25 @@ class Game:
     
     def reset_game(self):
         self.all_sprites.empty()
+        self.interpolator.forget()
         self.obstacles.empty()
         self.powerups.empty()
         self.coins.empty()
         
-        self.player = Player()
+        self.scheduler = Scheduler()  # Drops the last game's pending timers
+        
+        self.player = Player(self.scheduler)
         self.player.lives = 5  # Changed from 3 to 5 for more lives
         self.all_sprites.add(self.player)
         
         self.score = 0
         self.coins_collected = 0
         self.game_speed = 1
-        self.obstacle_timer = 0
-        self.powerup_timer = 0
-        self.coin_timer = 0
         self.difficulty_level = 1
         self.game_state = "playing"
+        self.schedule_obstacle()
+        self.schedule_powerup()
+        self.schedule_coin()
         
         # Reset storm progress
         self.storm_progress = StormProgressBar(SCREEN_WIDTH - 260, 10, 250, 25)
@@ -391,8 +407,59 @@ class Game:
                     if event.key == pygame.K_RETURN:
                         self.reset_game()
     
+    def schedule_obstacle(self):
+        # Spawn obstacles - rate increases with difficulty
+        spawn_rate = max(15, 80 // (self.game_speed * (1 + (self.difficulty_level * 0.08))))  # Increased base rate for fewer obstacles
+        self.scheduler.schedule(spawn_rate, self.spawn_obstacle)
+    
+    def spawn_obstacle(self):
+        if gameplay.random() < 0.6:  # Changed from 0.7 to 0.6 for fewer obstacles
+            # Choose obstacle type based on difficulty
+            obstacle_types = ["standard"]
+            if self.difficulty_level >= 2:
+                obstacle_types.append("flying")
+            if self.difficulty_level >= 3:
+                obstacle_types.append("boulder")
+
+            obstacle_type = gameplay.choice(obstacle_types)
+            obstacle = Obstacle(5, self.game_speed, obstacle_type)
+            # Never a pattern no jump gets through
+            reach = sprite_reach(self.player, SCREEN_HEIGHT - GROUND_HEIGHT)
+            if reach.sprites_possible(obstacle, self.obstacles):
+                self.obstacles.add(obstacle)
+                self.all_sprites.add(obstacle)
+        self.schedule_obstacle()
+    
+    def schedule_powerup(self):
+        # Spawn powerups (more frequently)
+        spawn_rate = 120 // self.game_speed  # Changed from 180 to 120 for more powerups
+        self.scheduler.schedule(spawn_rate, self.spawn_powerup)
+    
+    def spawn_powerup(self):
+        if gameplay.random() < 0.4:  # Changed from 0.3 to 0.4 for more powerups
+            powerup = PowerUp(5, self.game_speed)
+            self.powerups.add(powerup)
+            self.all_sprites.add(powerup)
+        self.schedule_powerup()
+    
+    def schedule_coin(self):
+        # Spawn coins
+        spawn_rate = 70 // self.game_speed  # Changed from 90 to 70 for more coins
+        self.scheduler.schedule(spawn_rate, self.spawn_coin)
+    
+    def spawn_coin(self):
+        if gameplay.random() < 0.6:  # Changed from 0.5 to 0.6 for more coins
+            coin = Coin(5, self.game_speed)
+            self.coins.add(coin)
+            self.all_sprites.add(coin)
+        self.schedule_coin()
+    
     def update(self):
+        self.interpolator.remember(self.all_sprites)
         if self.game_state == "playing":
+            # Timers only count playing frames, so pausing freezes them
+            self.scheduler.advance()
+            
             # Update all sprites
             self.all_sprites.update()
             
@@ -425,42 +492,6 @@ class Game:
                     # Reset storm progress after taking damage
                     self.storm_progress.progress = 40  # Changed from 50 to 40 for more recovery time
             
-            # Spawn obstacles - rate increases with difficulty
-            self.obstacle_timer += 1
-            spawn_rate = max(15, 80 // (self.game_speed * (1 + (self.difficulty_level * 0.08))))  # Increased base rate for fewer obstacles
-            if self.obstacle_timer >= spawn_rate:
-                if random.random() < 0.6:  # Changed from 0.7 to 0.6 for fewer obstacles
-                    # Choose obstacle type based on difficulty
-                    obstacle_types = ["standard"]
-                    if self.difficulty_level >= 2:
-                        obstacle_types.append("flying")
-                    if self.difficulty_level >= 3:
-                        obstacle_types.append("boulder")
-                    
-                    obstacle_type = random.choice(obstacle_types)
-                    obstacle = Obstacle(5, self.game_speed, obstacle_type)
-                    self.obstacles.add(obstacle)
-                    self.all_sprites.add(obstacle)
-                self.obstacle_timer = 0
-                
-            # Spawn powerups (more frequently)
-            self.powerup_timer += 1
-            if self.powerup_timer >= 120 // self.game_speed:  # Changed from 180 to 120 for more powerups
-                if random.random() < 0.4:  # Changed from 0.3 to 0.4 for more powerups
-                    powerup = PowerUp(5, self.game_speed)
-                    self.powerups.add(powerup)
-                    self.all_sprites.add(powerup)
-                self.powerup_timer = 0
-                
-            # Spawn coins
-            self.coin_timer += 1
-            if self.coin_timer >= 70 // self.game_speed:  # Changed from 90 to 70 for more coins
-                if random.random() < 0.6:  # Changed from 0.5 to 0.6 for more coins
-                    coin = Coin(5, self.game_speed)
-                    self.coins.add(coin)
-                    self.all_sprites.add(coin)
-                self.coin_timer = 0
-                
             # Check for collisions with obstacles
             if not self.player.invincible:
                 hits = pygame.sprite.spritecollide(self.player, self.obstacles, False)
@@ -492,7 +523,7 @@ class Game:
             # Update score
             self.score += 1
     
-    def draw(self):
+    def draw(self, alpha=1.0):
         screen.fill(WHITE)
         
         # Draw ground
@@ -510,7 +541,8 @@ class Game:
             screen.blit(pause_text, (SCREEN_WIDTH//2 - pause_text.get_width()//2, SCREEN_HEIGHT//2 + 90))
             
         elif self.game_state == "playing" or self.game_state == "paused":
-            # Draw all sprites
+            # Draw all sprites, part of the way through the last step
+            moved = self.interpolator.place(self.all_sprites, alpha)
             self.all_sprites.draw(screen)
             
             # Draw player with blinking effect when invincible
@@ -519,6 +551,8 @@ class Game:
             else:
                 screen.blit(self.player.image, self.player.rect)
             
+            self.interpolator.restore(moved)
+            
             # Draw score
             score_text = self.font.render(f"Score: {self.score}", True, BLACK)
             screen.blit(score_text, (10, 10))
@@ -569,11 +603,15 @@ class Game:
         pygame.display.flip()
     
     def run(self):
+        # The rules step at a fixed FPS; a slow frame catches up instead of slowing the game,
+        # and frames are drawn as often as the display allows
+        timestep = FixedTimestep(FPS)
         while self.running:
             self.handle_events()
-            self.update()
-            self.draw()
-            clock.tick(FPS)
+            for _ in range(timestep.advance()):
+                self.update()
+            self.draw(timestep.alpha)
+            clock.tick(MAX_RENDER_FPS)
 
 # Create and run the game
 if __name__ == "__main__":
@@ -0,0 +1,725 @@
+import math
+import random
+from rng_streams import RandomStreams
+from jump_reach import jump_reach
+from scheduler import Scheduler
+
+# Display-free simulation of the Storm Runner 3D rules.
+# Nothing in this module touches pygame, so it can be stepped headless
+# (soak tests, difficulty tuning) as fast as the CPU allows. Renderers
+# observe the state through listeners instead of owning it.
+
+# Game constants (shared with storm_runner_3d)
+SCREEN_WIDTH = 1024
+SCREEN_HEIGHT = 600
+FPS = 60
+HORIZON_Y = 350  # Horizon line for 3D perspective
+GROUND_Y = HORIZON_Y + 50  # Where the player stands
+
+# The rules are tuned in pixels per 60 FPS frame. The simulation steps at a
+# fixed STEP_RATE and scales every rate by dt, the length of one step in
+# those reference frames, so gameplay speed never depends on the renderer.
+STEP_RATE = 120
+
+# Player box and physics, per 60 FPS frame. The batch simulator, the
+# autopilot and the jump reach tables import these rather than repeating them.
+PLAYER_X = 100
+PLAYER_WIDTH = 30
+PLAYER_HEIGHT = 50
+JUMP_VELOCITY = -18  # Changed from -15 to -18 for higher jumps
+DOUBLE_JUMP_VELOCITY = -16  # Changed from -13 to -16 for higher double jumps
+GRAVITY = 0.8
+
+# Player inputs (SPACE, P and RETURN)
+INPUT_JUMP = 1
+INPUT_PAUSE = 2
+INPUT_RESTART = 3
+
+class Rules:
+    """
+    Tunable difficulty constants. Defaults are the hand-tuned values the
+    game ships with; pass keyword overrides to try other settings.
+    """
+    level_score = 700  # Changed from 500 to 700 for slower difficulty progression
+    level_speed_step = 0.3  # Changed from 0.5 to 0.3 for smaller speed jumps
+    speed_creep = 0.0002  # Changed from 0.0005 to 0.0002 for slower progression
+    storm_multiplier = 1.1  # Changed from 1.2 to 1.1 for slower storm
+    storm_gain = 0.08  # Changed from 0.1 to 0.08 for slower storm progress
+    storm_recovery = 0.06  # Changed from 0.05 to 0.06 for faster recovery
+    storm_reset = 40  # Changed from 50 to 40 for more recovery time
+    obstacle_interval = 80  # Increased base rate for fewer obstacles
+    obstacle_min_interval = 15
+    obstacle_level_factor = 0.08
+    obstacle_chance = 0.6  # Changed from 0.7 to 0.6 for fewer obstacles
+    powerup_interval = 120  # Changed from 180 to 120 for more powerups
+    powerup_chance = 0.4  # Changed from 0.3 to 0.4 for more powerups
+    coin_interval = 70  # Changed from 90 to 70 for more coins
+    coin_chance = 0.6  # Changed from 0.5 to 0.6 for more coins
+    chunk_frames = 120  # Frames of content generated ahead at a time
+
+    def __init__(self, **overrides):
+        for name, value in overrides.items():
+            if not hasattr(Rules, name) or name.startswith("_"):
+                raise ValueError(f"Unknown rule: {name}")
+            setattr(self, name, value)
+
+    @classmethod
+    def names(cls):
+        return [name for name, value in vars(cls).items()
+                if not name.startswith("_") and isinstance(value, (int, float))]
+
+    def as_dict(self):
+        return {name: getattr(self, name) for name in self.names()}
+
+DEFAULT_RULES = Rules()
+
+def rotated_size(width, height, angle):
+    """Size of the bounding box pygame.transform.rotate produces"""
+    if angle % 90 == 0:
+        if angle % 180 == 0:
+            return width, height
+        return height, width
+    radians = math.radians(angle)
+    cos_a = math.cos(radians)
+    sin_a = math.sin(radians)
+    cx, cy = cos_a * width, cos_a * height
+    sx, sy = sin_a * width, sin_a * height
+    new_width = int(max(abs(cx + sy), abs(cx - sy), abs(-cx + sy), abs(-cx - sy)))
+    new_height = int(max(abs(sx + cy), abs(sx - cy), abs(-sx + cy), abs(-sx - cy)))
+    return new_width, new_height
+
+def depth_scale(z_position):
+    """Objects farther away (higher z) are drawn smaller"""
+    return 1.0 - (z_position * 0.5)
+
+def depth_ground_y(z_position):
+    """Screen y of the ground line at a given depth"""
+    return HORIZON_Y + (SCREEN_HEIGHT - HORIZON_Y) * z_position
+
+class Body:
+    """Axis-aligned box with float coordinates (a display-free pygame.Rect)"""
+    def __init__(self, x=0.0, y=0.0, width=0, height=0):
+        self.x = x
+        self.y = y
+        self.width = width
+        self.height = height
+        self.alive = True
+        self.prev_x = x
+        self.prev_y = y
+
+    @property
+    def right(self):
+        return self.x + self.width
+
+    @property
+    def bottom(self):
+        return self.y + self.height
+
+    @property
+    def center(self):
+        return (self.x + self.width / 2, self.y + self.height / 2)
+
+    def store_previous(self):
+        """Remember the position at the start of a step for interpolation"""
+        self.prev_x = self.x
+        self.prev_y = self.y
+
+    def interpolated(self, alpha):
+        """Top-left position blended between the last two steps"""
+        return (self.prev_x + (self.x - self.prev_x) * alpha,
+                self.prev_y + (self.y - self.prev_y) * alpha)
+
+    def resize_about_center(self, width, height):
+        center_x, center_y = self.center
+        self.width = width
+        self.height = height
+        self.x = center_x - width / 2
+        self.y = center_y - height / 2
+
+    def collides(self, other):
+        # Same test as pygame.Rect.colliderect
+        return (self.x < other.x + other.width and other.x < self.x + self.width and
+                self.y < other.y + other.height and other.y < self.y + self.height)
+
+    def kill(self):
+        self.alive = False
+
+class PlayerState(Body):
+    def __init__(self):
+        super().__init__(PLAYER_X, GROUND_Y - PLAYER_HEIGHT, PLAYER_WIDTH, PLAYER_HEIGHT)
+        self.velocity_y = 0
+        self.jumping = False
+        self.double_jump_available = True
+        self.invincible = False
+        self.invincible_until = 0  # Frame the invincibility wears off, ended by the scheduler
+        self.lives = 5
+        self.store_previous()
+
+    def update(self, dt=1.0):
+        # Gravity
+        self.velocity_y += GRAVITY * dt
+        self.y += self.velocity_y * dt
+
+        # Check if on ground
+        if self.bottom >= GROUND_Y:
+            self.y = GROUND_Y - self.height
+            self.velocity_y = 0
+            self.jumping = False
+            self.double_jump_available = True
+
+    def jump(self):
+        if not self.jumping:
+            self.velocity_y = JUMP_VELOCITY
+            self.jumping = True
+        elif self.double_jump_available:
+            self.velocity_y = DOUBLE_JUMP_VELOCITY
+            self.double_jump_available = False
+
+class StormMeter:
+    """How close the storm is to the player, 0 to 100"""
+    def __init__(self, rules=DEFAULT_RULES):
+        self.progress = 0
+        self.danger_zone = 85  # Changed from 80 to 85 for more warning time
+        self.gain = rules.storm_gain
+        self.recovery = rules.storm_recovery
+
+    def update(self, player_speed, storm_speed, dt=1.0):
+        # Calculate progress based on player vs storm speed
+        speed_diff = storm_speed - player_speed
+
+        # Increase progress if storm is faster, decrease if player is faster
+        if speed_diff > 0:
+            self.progress += speed_diff * self.gain * dt
+        else:
+            self.progress = max(0, self.progress + speed_diff * self.recovery * dt)
+
+        # Cap progress at 100
+        self.progress = min(100, self.progress)
+
+class ScrollingBody(Body):
+    """Entity that scrolls left at a depth-dependent speed"""
+    def __init__(self, speed, game_speed):
+        super().__init__()
+        self.speed = speed + game_speed
+        self.z_position = 0  # Depth position (0 = closest, 1 = farthest/horizon)
+
+    def scroll(self, dt):
+        # Closer objects move faster
+        self.x -= self.speed * depth_scale(self.z_position) * dt
+
+class ObstacleState(ScrollingBody):
+    kind = "obstacle"
+
+    def __init__(self, speed, game_speed, obstacle_type, rng):
+        super().__init__(speed, game_speed)
+        self.obstacle_type = obstacle_type
+
+        if obstacle_type == "standard":
+            self.original_width = rng.randint(30, 50)
+            self.original_height = rng.randint(30, 60)
+            self.z_position = rng.uniform(0.1, 0.5)
+            scale = depth_scale(self.z_position)
+            self.width = int(self.original_width * scale)
+            self.height = int(self.original_height * scale)
+            self.x = SCREEN_WIDTH
+            self.y = depth_ground_y(self.z_position) - self.height
+
+        elif obstacle_type == "flying":
+            self.original_width = rng.randint(40, 60)
+            self.original_height = rng.randint(20, 40)
+            self.z_position = rng.uniform(0.2, 0.7)
+            scale = depth_scale(self.z_position)
+            self.width = int(self.original_width * scale)
+            self.height = int(self.original_height * scale)
+            height_offset = rng.randint(50, 150)
+            self.x = SCREEN_WIDTH
+            self.y = depth_ground_y(self.z_position) - height_offset * scale - self.height
+            self.y_movement = rng.choice([-1, 1])
+            self.y_range = rng.randint(10, 30) * scale  # Scale movement range too
+            self.original_y = self.y
+
+        elif obstacle_type == "boulder":
+            self.original_width = self.original_height = rng.randint(40, 60)
+            self.z_position = rng.uniform(0.1, 0.4)
+            scale = depth_scale(self.z_position)
+            self.size = int(self.original_width * scale)
+            self.width = self.height = self.size
+            self.x = SCREEN_WIDTH
+            self.y = depth_ground_y(self.z_position) - self.size
+            self.rotation = 0
+            self.rotation_speed = rng.uniform(2, 5)
+
+    def update(self, time_ms, dt=1.0):
+        self.scroll(dt)
+
+        # Special movement patterns based on obstacle type
+        if self.obstacle_type == "flying":
+            # Oscillating up and down movement
+            self.y = self.original_y + self.y_range * math.sin(time_ms * 0.005)
+
+        elif self.obstacle_type == "boulder":
+            # Rotating triangle, the bounding box grows with the rotation
+            self.rotation += self.rotation_speed * dt
+            if self.rotation >= 360:
+                self.rotation = 0
+            self.resize_about_center(*rotated_size(self.size, self.size, self.rotation))
+
+        if self.right < 0:
+            self.kill()
+
+class PowerUpState(ScrollingBody):
+    kind = "powerup"
+
+    def __init__(self, speed, game_speed, rng):
+        super().__init__(speed, game_speed)
+        self.z_position = rng.uniform(0.2, 0.6)
+        scale = depth_scale(self.z_position)
+        self.size = int(25 * scale)
+        self.width = self.height = self.size
+        height_offset = rng.randint(0, 100) * scale
+        self.x = SCREEN_WIDTH
+        self.y = depth_ground_y(self.z_position) - height_offset - self.size
+        self.type = rng.choice(['invincibility', 'score_boost', 'extra_life'])
+
+    def update(self, time_ms, dt=1.0):
+        self.scroll(dt)
+        if self.right < 0:
+            self.kill()
+
+class CoinState(ScrollingBody):
+    kind = "coin"
+
+    def __init__(self, speed, game_speed, rng):
+        super().__init__(speed, game_speed)
+        self.z_position = rng.uniform(0.2, 0.7)
+        scale = depth_scale(self.z_position)
+        self.original_size = int(15 * scale)
+        self.width = self.height = self.original_size
+        height_offset = rng.randint(20, 120) * scale
+        self.x = SCREEN_WIDTH
+        self.y = depth_ground_y(self.z_position) - height_offset - self.original_size
+        self.value = 1
+
+        # Animation
+        self.animation_frame = 0
+        self.animation_speed = 0.2
+
+    def animation_pose(self):
+        """Current (size, angle) of the pulse/rotate animation"""
+        scale_factor = 1.0 + 0.1 * math.sin(self.animation_frame)
+        angle = self.animation_frame * 10 % 360
+        return int(self.original_size * scale_factor), angle
+
+    def update(self, time_ms, dt=1.0):
+        self.scroll(dt)
+
+        # Simple animation - make the coin "pulse" and rotate
+        self.animation_frame += self.animation_speed * dt
+        size, angle = self.animation_pose()
+        if size > 0:  # Prevent zero size
+            self.resize_about_center(*rotated_size(size, size, angle))
+
+        if self.right < 0:
+            self.kill()
+
+class LevelChunk:
+    """
+    A stretch of upcoming content, built in one go from its own seed: every
+    obstacle, power-up and coin, with the time (in frames since the reset)
+    it enters the screen. Rebuilding from the same header gives the same
+    chunk, so snapshots only keep the headers.
+    """
+    def __init__(self, seed, start, game_speed, difficulty_level, rules):
+        self.seed = seed
+        self.start = start
+        self.game_speed = game_speed
+        self.difficulty_level = difficulty_level
+        self.end = start + rules.chunk_frames
+        rng = random.Random(seed)
+
+        # Same average rates as rolling the chance every interval, but
+        # spread one per stretch so content neither clumps nor dries up
+        obstacle_types = ["standard"]
+        if difficulty_level >= 2:
+            obstacle_types.append("flying")
+        if difficulty_level >= 3:
+            obstacle_types.append("boulder")
+        interval = max(rules.obstacle_min_interval,
+                       rules.obstacle_interval // (game_speed * (1 + (difficulty_level * rules.obstacle_level_factor))))
+        placements = [(time, ObstacleState(5, game_speed, rng.choice(obstacle_types), rng))
+                      for time in self.times(rng, interval / rules.obstacle_chance, rules.chunk_frames)]
+        interval = rules.powerup_interval // game_speed
+        placements += [(time, PowerUpState(5, game_speed, rng))
+                       for time in self.times(rng, interval / rules.powerup_chance, rules.chunk_frames)]
+        interval = rules.coin_interval // game_speed
+        placements += [(time, CoinState(5, game_speed, rng))
+                       for time in self.times(rng, interval / rules.coin_chance, rules.chunk_frames)]
+        placements.sort(key=lambda placement: placement[0])
+        self.placements = placements
+
+    def times(self, rng, spacing, length):
+        """One time in the middle half of each spacing-long stretch, the last partial one by chance"""
+        spacing = max(1.0, spacing)
+        strata = int(length // spacing)
+        times = [self.start + (n + rng.uniform(0.25, 0.75)) * spacing for n in range(strata)]
+        remainder = length - strata * spacing
+        if rng.random() < remainder / spacing:
+            times.append(self.start + strata * spacing + rng.uniform(0.25, 0.75) * remainder)
+        return times
+
+    def header(self):
+        return self.seed, self.start, self.game_speed, self.difficulty_level
+
+    def entities(self):
+        return [entity for _, entity in self.placements]
+
+class LevelStream:
+    """Level chunks generated ahead of play; spawning just walks a cursor through them"""
+    def __init__(self, rules=DEFAULT_RULES):
+        self.rules = rules
+        self.chunks = []
+        self.cursor = 0  # Placements of the first chunk already spawned
+
+    def ahead(self, time):
+        """Frames of content generated past time"""
+        return self.chunks[-1].end - time if self.chunks else 0
+
+    def extend(self, seed, game_speed, difficulty_level):
+        start = self.chunks[-1].end if self.chunks else 0
+        chunk = LevelChunk(seed, start, game_speed, difficulty_level, self.rules)
+        self.chunks.append(chunk)
+        return chunk
+
+    def due(self, time):
+        """Entities whose time has come, in order"""
+        entities = []
+        chunks = self.chunks
+        while chunks:
+            placements = chunks[0].placements
+            while self.cursor < len(placements) and placements[self.cursor][0] <= time:
+                entities.append(placements[self.cursor][1])
+                self.cursor += 1
+            if self.cursor < len(placements) or chunks[0].end > time:
+                break
+            del chunks[0]  # Used up
+            self.cursor = 0
+        return entities
+
+    def state(self):
+        return tuple(chunk.header() for chunk in self.chunks), self.cursor
+
+    def restore(self, state):
+        headers, self.cursor = state
+        self.chunks = [LevelChunk(*header, self.rules) for header in headers]
+
+def copy_body(body):
+    """Detached copy of a body's attributes, for snapshots"""
+    return type(body), dict(body.__dict__)
+
+def rebuild_body(saved):
+    body_class, attributes = saved
+    body = body_class.__new__(body_class)
+    body.__dict__.update(attributes)
+    return body
+
+class Simulation:
+    """The Storm Runner 3D game rules, without any rendering"""
+    # Scalar state captured by snapshot()
+    STATE_FIELDS = ("game_state", "high_score", "high_coins", "tick", "score",
+                    "coins_collected", "game_speed", "difficulty_level", "frame", "score_carry")
+
+    def __init__(self, seed=None, step_rate=STEP_RATE, rules=DEFAULT_RULES):
+        # Only the gameplay stream drives the rules; renderers draw their
+        # cosmetic noise from the other streams without disturbing it
+        self.streams = RandomStreams(seed)
+        self.rng = self.streams.gameplay
+        self.rules = rules
+        self.step_rate = step_rate
+        self.dt = FPS / step_rate  # Step length in 60 FPS frames
+        self.step_ms = 1000.0 / step_rate
+        # What the player can clear, for fair spawns
+        self.reach = jump_reach(jump_velocity=JUMP_VELOCITY, double_jump_velocity=DOUBLE_JUMP_VELOCITY,
+                                gravity=GRAVITY, ground_y=GROUND_Y, player_x=PLAYER_X,
+                                player_width=PLAYER_WIDTH, player_height=PLAYER_HEIGHT, dt=self.dt)
+        self.listeners = []
+        self.game_state = "title"  # title, playing, game_over, paused
+        self.high_score = 0
+        self.high_coins = 0
+        self.tick = 0  # Calls to step() since creation, whatever the game state
+        self.reset(start=False)
+
+    def add_listener(self, listener):
+        """Register listener(event, data) for "spawn", "despawn", "reset", "input" and "chunk" events"""
+        self.listeners.append(listener)
+
+    def notify(self, event, data=None):
+        for listener in self.listeners:
+            listener(event, data)
+
+    def reset(self, start=True, seed=None):
+        if seed is not None:
+            self.streams.seed(seed)
+        self.player = PlayerState()
+        self.storm = StormMeter(self.rules)
+        self.entities = []  # Obstacles, powerups and coins in spawn order
+        self.score = 0
+        self.coins_collected = 0
+        self.game_speed = 1
+        self.stream = LevelStream(self.rules)  # Upcoming obstacles, powerups and coins
+        self.difficulty_level = 1
+        self.frame = 0  # Steps taken since the reset
+        self.scheduler = Scheduler()  # Countdowns in playing steps, so pausing freezes them
+        self.score_carry = 0.0  # Fraction of a frame not yet scored
+        if start:
+            self.game_state = "playing"
+        self.notify("reset")
+
+    # Snapshots
+    def snapshot(self):
+        """Plain-data copy of the full game state, including the gameplay RNG"""
+        return (tuple(getattr(self, name) for name in self.STATE_FIELDS),
+                copy_body(self.player),
+                dict(self.storm.__dict__),
+                [copy_body(entity) for entity in self.entities],
+                self.rng.getstate(),
+                self.stream.state())
+
+    def restore(self, snapshot):
+        """Return to a snapshot; renderers rebuild through reset and spawn events"""
+        fields, player, storm, entities, rng_state, stream = snapshot
+        for name, value in zip(self.STATE_FIELDS, fields):
+            setattr(self, name, value)
+        self.player = rebuild_body(player)
+        self.storm = StormMeter(self.rules)
+        self.storm.__dict__.update(storm)
+        self.entities = [rebuild_body(entity) for entity in entities]
+        self.rng.setstate(rng_state)
+        self.stream = LevelStream(self.rules)
+        self.stream.restore(stream)
+        self.reschedule()
+        self.notify("reset")
+        for chunk in self.stream.chunks:
+            self.notify("chunk", chunk)
+        for entity in self.entities:
+            self.notify("spawn", entity)
+
+    # Input
+    def apply_input(self, code):
+        """Apply one recorded or live INPUT_* code"""
+        if code == INPUT_JUMP:
+            self.jump()
+        elif code == INPUT_PAUSE:
+            self.toggle_pause()
+        elif code == INPUT_RESTART:
+            self.start()
+        self.notify("input", code)
+
+    def jump(self):
+        if self.game_state == "playing":
+            self.player.jump()
+
+    def toggle_pause(self):
+        if self.game_state == "playing":
+            self.game_state = "paused"
+        elif self.game_state == "paused":
+            self.game_state = "playing"
+
+    def start(self):
+        if self.game_state in ("title", "game_over"):
+            self.reset()
+
+    # Queries
+    def obstacles(self):
+        return [entity for entity in self.entities if entity.kind == "obstacle"]
+
+    def powerups(self):
+        return [entity for entity in self.entities if entity.kind == "powerup"]
+
+    def coins(self):
+        return [entity for entity in self.entities if entity.kind == "coin"]
+
+    def spawn(self, entity):
+        entity.store_previous()
+        self.entities.append(entity)
+        self.notify("spawn", entity)
+
+    def obstacle_window(self, obstacle):
+        """Reachability window of an obstacle, bounded over its whole motion"""
+        left, width, top, height = obstacle.x, obstacle.width, obstacle.y, obstacle.height
+        if obstacle.obstacle_type == "flying":
+            top = obstacle.original_y - obstacle.y_range
+            height += 2 * obstacle.y_range
+        elif obstacle.obstacle_type == "boulder":
+            # Its box swells as it turns; a rotating square never exceeds its diagonal
+            reach = obstacle.size * math.sqrt(2)
+            left += (width - reach) / 2
+            top += (height - reach) / 2
+            width = height = reach
+        return self.reach.window(left, width, top, top + height,
+                                 obstacle.speed * depth_scale(obstacle.z_position))
+
+    def spawn_possible(self, obstacle):
+        """Whether the player can still get past everything once obstacle is added"""
+        window = self.obstacle_window(obstacle)
+        if window is None:
+            return True
+        windows = [window]
+        for entity in self.entities:
+            if entity.kind == "obstacle" and entity.alive:
+                window = self.obstacle_window(entity)
+                if window is not None:
+                    windows.append(window)
+        return self.reach.pattern_possible(windows)
+
+    def make_invincible(self, duration):
+        """Invincible for duration frames; the scheduler ends it"""
+        player = self.player
+        player.invincible = True
+        player.invincible_until = self.frame + math.ceil(duration / self.dt)
+        self.scheduler.schedule_at(player.invincible_until, self.end_invincibility)
+
+    def end_invincibility(self):
+        # A later pickup may have extended it; only the latest deadline counts
+        if self.frame >= self.player.invincible_until:
+            self.player.invincible = False
+
+    def lose_life(self):
+        """Take a hit unless invincible; True when it was the last life"""
+        player = self.player
+        if player.invincible:
+            return False
+        player.lives -= 1
+        self.make_invincible(180)  # Changed from 120 to 180 for longer invincibility after hit
+        return player.lives <= 0
+
+    def reschedule(self):
+        """Rebuild the scheduler from restored state"""
+        self.scheduler = Scheduler(self.frame)
+        if self.player.invincible:
+            self.scheduler.schedule_at(self.player.invincible_until, self.end_invincibility)
+
+    def end_game(self):
+        self.game_state = "game_over"
+        if self.score > self.high_score:
+            self.high_score = self.score
+        if self.coins_collected > self.high_coins:
+            self.high_coins = self.coins_collected
+
+    def step(self):
+        """Advance the game by one fixed step of dt frames"""
+        self.tick += 1
+        if self.game_state != "playing":
+            return
+        self.frame += 1
+        self.scheduler.advance()
+        dt = self.dt
+        time_ms = self.frame * self.step_ms
+        player = self.player
+        rng = self.rng
+        rules = self.rules
+
+        # Update the player and every entity
+        player.store_previous()
+        player.update(dt)
+        for entity in self.entities:
+            entity.store_previous()
+            entity.update(time_ms, dt)
+
+        # Check for difficulty increase
+        new_level = 1 + self.score // rules.level_score
+        if new_level > self.difficulty_level:
+            self.difficulty_level = new_level
+            self.game_speed += rules.level_speed_step
+        else:
+            # Smaller continuous speed increase
+            self.game_speed += rules.speed_creep * dt
+
+        # Update storm progress
+        storm_speed = self.game_speed * rules.storm_multiplier
+        player_speed = self.game_speed
+        if not player.jumping:  # Player is slower when not jumping
+            player_speed *= 0.9
+        self.storm.update(player_speed, storm_speed, dt)
+
+        # Check if storm caught up with player
+        if self.storm.progress >= 100:
+            if self.lose_life():
+                self.end_game()
+            else:
+                # Reset storm progress after taking damage
+                self.storm.progress = rules.storm_reset
+
+        # Keep the level generated one to two chunks ahead, at the
+        # difficulty of the moment; each chunk draws one seed from the stream
+        time = self.frame * dt
+        stream = self.stream
+        while stream.ahead(time) <= rules.chunk_frames:
+            self.notify("chunk", stream.extend(rng.getrandbits(32), self.game_speed, self.difficulty_level))
+
+        # Spawn whatever has come due
+        for entity in stream.due(time):
+            if entity.kind != "obstacle" or self.spawn_possible(entity):  # Never a pattern no jump gets through
+                self.spawn(entity)
+
+        # Check for collisions with obstacles
+        if not player.invincible and self.game_state == "playing":
+            for entity in self.entities:
+                if entity.alive and entity.kind == "obstacle" and player.collides(entity):
+                    if self.lose_life():
+                        self.end_game()
+                    break
+
+        # Check for collisions with powerups and coins
+        for entity in self.entities:
+            if not entity.alive or entity.kind == "obstacle" or not player.collides(entity):
+                continue
+            entity.kill()
+            if entity.kind == "powerup":
+                if entity.type == 'invincibility':
+                    self.make_invincible(240)  # Changed from 180 to 240 for longer invincibility
+                elif entity.type == 'score_boost':
+                    self.score += 100
+                elif entity.type == 'extra_life' and player.lives < 5:
+                    player.lives += 1
+            else:
+                self.coins_collected += entity.value
+                self.score += 10 * entity.value
+
+        # Drop entities that scrolled off screen or were collected
+        if any(not entity.alive for entity in self.entities):
+            survivors = []
+            for entity in self.entities:
+                if entity.alive:
+                    survivors.append(entity)
+                else:
+                    self.notify("despawn", entity)
+            self.entities = survivors
+
+        # Update score - one point per 60 FPS frame survived
+        self.score_carry += dt
+        whole_frames = int(self.score_carry)
+        self.score += whole_frames
+        self.score_carry -= whole_frames
+
+def run_headless(steps, seed=None, jump_every=90, step_rate=STEP_RATE):
+    """Soak-test helper: play for a number of steps with a metronome jumper"""
+    simulation = Simulation(seed, step_rate)
+    simulation.start()
+    for step in range(steps):
+        if simulation.game_state == "game_over":
+            simulation.start()
+        if jump_every and step % jump_every == 0:
+            simulation.jump()
+        simulation.step()
+    return simulation
+
+if __name__ == "__main__":
+    import sys
+    import time
+
+    steps = int(sys.argv[1]) if len(sys.argv) > 1 else 100000
+    start_time = time.perf_counter()
+    simulation = run_headless(steps, seed=0)
+    elapsed = time.perf_counter() - start_time
+    print(f"Simulated {steps} steps in {elapsed:.2f}s ({steps / elapsed:.0f} steps/s)")
+    print(f"Score: {simulation.score} | Level: {simulation.difficulty_level} | High score: {simulation.high_score}")
@@ -0,0 +1,75 @@
+import threading
+import time
+from multiprocessing import Pipe
+import pytest
+from difficulty_tuner import build_grid, build_jobs, run_chunk
+from sim_cluster import Coordinator, cluster_authkey, start_local_workers
+
+def wait_for(condition, timeout=30):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline, "timed out"
+        time.sleep(0.01)
+
+def test_lost_worker_job_is_requeued():
+    jobs = build_jobs(build_grid([]), 32, "metronome", None, 6000, 8)
+    coordinator = Coordinator(jobs, ("127.0.0.1", 0), job_timeout=60)
+    workers = start_local_workers(coordinator.address, 2)
+    outcome = {}
+    runner = threading.Thread(target=lambda: outcome.setdefault("results", coordinator.run()), daemon=True)
+    runner.start()
+
+    # Both workers have taken a job and neither has finished it yet
+    wait_for(lambda: coordinator.pending.qsize() == len(jobs) - 2)
+    assert not coordinator.results
+    workers[0].kill()
+
+    runner.join(120)
+    assert not runner.is_alive()
+    assert coordinator.requeued == 1
+    assert sorted(stats.lost for stats in coordinator.workers) == [False, True]
+    assert sorted(coordinator.results) == list(range(len(jobs)))
+    assert outcome["results"] == [run_chunk(job)[1] for job in jobs]
+    for worker in workers:
+        worker.join(10)
+
+def test_late_result_wins_over_requeued_copy():
+    jobs = build_jobs(build_grid([]), 8, "metronome", None, 600, 4)[:2]
+    coordinator = Coordinator(jobs, ("127.0.0.1", 0), job_timeout=0.1)
+    slow, slow_worker = Pipe()
+    fast, fast_worker = Pipe()
+    threading.Thread(target=coordinator.serve, args=(slow,), daemon=True).start()
+    slow_worker.send(("hello", "slow"))
+    _, first_id, first_job = slow_worker.recv()
+
+    # The slow worker misses the timeout, its job is queued again, then it answers anyway
+    wait_for(lambda: coordinator.requeued == 1)
+    slow_worker.send(("result", first_id, run_chunk(first_job)[1], 1.0))
+    _, second_id, second_job = slow_worker.recv()
+
+    # The next worker gets the re-queued copy, which is already done and skipped
+    threading.Thread(target=coordinator.serve, args=(fast,), daemon=True).start()
+    fast_worker.send(("hello", "fast"))
+    wait_for(lambda: coordinator.pending.empty())
+    slow_worker.send(("result", second_id, run_chunk(second_job)[1], 1.0))
+
+    assert slow_worker.recv() == ("stop",)
+    assert fast_worker.recv() == ("stop",)
+    coordinator.listener.close()
+    assert coordinator.requeued == 1
+    assert [(stats.name, stats.jobs, stats.lost) for stats in coordinator.workers] == [
+        ("slow", 2, False), ("fast", 0, False)]
+    assert [coordinator.results[job_id] for job_id in range(len(jobs))] == [run_chunk(job)[1] for job in jobs]
+
+def test_empty_sweep_returns_at_once():
+    assert Coordinator([], ("127.0.0.1", 0)).run() == []
+
+def test_remote_addresses_need_a_key(monkeypatch):
+    monkeypatch.delenv("STORM_CLUSTER_KEY", raising=False)
+    assert cluster_authkey("127.0.0.1") == cluster_authkey("localhost")
+    with pytest.raises(ValueError):
+        cluster_authkey("0.0.0.0")
+    with pytest.raises(ValueError):
+        Coordinator([], ("0.0.0.0", 0))
+    monkeypatch.setenv("STORM_CLUSTER_KEY", "secret")
+    assert cluster_authkey("0.0.0.0") == b"secret"
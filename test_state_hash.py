@@ -0,0 +1,28 @@
+from state_hash import HashWriter, read_hashes
+from storm_simulation import Simulation
+
+def play(simulation, steps, writer):
+    for step in range(steps):
+        if step % 90 == 0:
+            simulation.jump()
+        simulation.step()
+        writer.record(simulation)
+
+def test_seek_back_after_flush(tmp_path):
+    # A replay seek goes back to an earlier tick after the buffer was written out
+    simulation = Simulation(3)
+    simulation.start()
+    writer = HashWriter(tmp_path / "run.hashes")
+    play(simulation, 600, writer)
+    snapshot = simulation.snapshot()
+    play(simulation, 600, writer)
+    writer.flush()
+    assert not writer.buffer
+
+    simulation.restore(snapshot)
+    play(simulation, 900, writer)
+    writer.close()
+
+    ticks = [tick for tick, _ in read_hashes(tmp_path / "run.hashes")]
+    assert ticks == list(range(1, ticks[-1] + 1))
+    assert ticks[-1] == 1500
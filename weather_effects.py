@@ -1,5 +1,6 @@
 import pygame
-import random
+from rng_streams import cosmetic
+from scheduler import Scheduler
 import math
 
 class RainDrop:
@@ -9,11 +10,11 @@ class RainDrop:
         self.reset()
         
     def reset(self):
-        self.x = random.randint(0, self.screen_width)
-        self.y = random.randint(-100, -10)
-        self.speed = random.randint(5, 15)
-        self.length = random.randint(5, 15)
-        self.thickness = random.randint(1, 2)
+        self.x = cosmetic.randint(0, self.screen_width)
+        self.y = cosmetic.randint(-100, -10)
+        self.speed = cosmetic.randint(5, 15)
+        self.length = cosmetic.randint(5, 15)
+        self.thickness = cosmetic.randint(1, 2)
         self.color = (200, 230, 255)  # Light blue
         
     def update(self, game_speed=1.0):
@@ -29,61 +30,65 @@ class RainDrop:
         pygame.draw.line(surface, self.color, (self.x, self.y), (end_x, end_y), self.thickness)
 
 class Lightning:
-    def __init__(self, screen_width, screen_height):
+    def __init__(self, screen_width, screen_height, scheduler=None):
         self.screen_width = screen_width
         self.screen_height = screen_height
         self.active = False
         self.duration = 0
         self.flash_alpha = 0
         self.branches = []
-        self.next_strike = random.randint(300, 1000)  # Frames until next lightning
+        # Strikes and fades are scheduled; update() advances the clock unless the owner shares its own
+        self.scheduler = scheduler if scheduler is not None else Scheduler()
+        self.owns_scheduler = scheduler is None
+        self.next_strike = self.scheduler.schedule(cosmetic.randint(300, 1000), self.trigger)
         
     def update(self):
-        if not self.active:
-            self.next_strike -= 1
-            if self.next_strike <= 0:
-                self.trigger()
-        else:
-            self.duration -= 1
-            if self.duration <= 0:
-                self.active = False
-                self.next_strike = random.randint(300, 1000)
+        if self.owns_scheduler:
+            self.scheduler.advance()
                 
-            # Flash effect fading
-            if self.duration < 5:
-                self.flash_alpha = max(0, self.flash_alpha - 51)  # Fade out
+    def fade(self):
+        self.flash_alpha = max(0, self.flash_alpha - 51)  # Fade out
+        
+    def end(self):
+        self.active = False
+        self.next_strike = self.scheduler.schedule(cosmetic.randint(300, 1000), self.trigger)
                 
     def trigger(self):
         self.active = True
-        self.duration = random.randint(10, 20)
+        self.duration = cosmetic.randint(10, 20)
         self.flash_alpha = 100
         
+        # Flash effect fading over the last frames
+        for delay in range(self.duration - 4, self.duration):
+            self.scheduler.schedule(delay, self.fade)
+        self.scheduler.schedule(self.duration, self.end)
+        
         # Create lightning branches
         self.branches = []
-        start_x = random.randint(0, self.screen_width)
+        start_x = cosmetic.randint(0, self.screen_width)
         
         # Main branch
         points = [(start_x, 0)]
         x, y = start_x, 0
         
         while y < self.screen_height * 0.7:
-            x += random.randint(-15, 15)
-            y += random.randint(10, 30)
+            x += cosmetic.randint(-15, 15)
+            y += cosmetic.randint(10, 30)
             points.append((x, y))
             
         self.branches.append(points)
         
         # Add some smaller branches
-        for _ in range(random.randint(1, 3)):
+        for _ in range(cosmetic.randint(1, 3)):
             if len(points) > 2:
                 # Start from a random point on the main branch
-                branch_start = random.randint(1, len(points) - 2)
+                branch_start = cosmetic.randint(1, len(points) - 2)
                 branch_points = [points[branch_start]]
                 
                 bx, by = points[branch_start]
-                for _ in range(random.randint(2, 5)):
-                    bx += random.randint(-20, 20)
-                    by += random.randint(10, 20)
+                for _ in range(cosmetic.randint(2, 5)):
+                    bx += cosmetic.randint(-20, 20)
+                    by += cosmetic.randint(10, 20)
                     branch_points.append((bx, by))
                     
                 self.branches.append(branch_points)